@@ -0,0 +1,46 @@
+"""向量化批量引擎性能测试：每秒局数（对比NewGame逐局运行）
+
+用法: python benchmarks/bench_batch_engine.py [批量局数] [逐局局数]
+需要安装numpy。
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.batch_engine import BatchEngine
+from src.events import NullSink
+from src.game import NewGame
+
+
+STRATEGIES = ["conservative", "aggressive", "smart"]
+
+
+def _object_games_per_second(games, player_count):
+    start = time.perf_counter()
+    for seed in range(games):
+        game = NewGame(player_count, sink=NullSink(), rng=random.Random(seed))
+        game.setup_game(human_players=0, ai_strategies=STRATEGIES)
+        game.play_game()
+    return games / (time.perf_counter() - start)
+
+
+def _batch_games_per_second(games, player_count):
+    start = time.perf_counter()
+    BatchEngine(player_count, STRATEGIES, games, seed=0).run()
+    return games / (time.perf_counter() - start)
+
+
+def main():
+    batch_games = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    object_games = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    for player_count in (2, 3, 6):
+        single = _object_games_per_second(object_games, player_count)
+        batch = _batch_games_per_second(batch_games, player_count)
+        print(f"{player_count}人: 逐局 {single:8.0f} 局/秒，批量 {batch:8.0f} 局/秒 ({batch / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
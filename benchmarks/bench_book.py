@@ -0,0 +1,69 @@
+"""开局库：生成耗时、查询延迟，以及在没见过的发牌上庄家用库与不用库的得分差
+
+用法: python benchmarks/bench_book.py [收集局面的发牌次数] [每种候选的模拟局数] [评估副数]
+评估用另一个种子的发牌（与生成时不重叠），同一副牌分别让庄家（smart）用库和不用库各打一局，
+其余座位都是不用库的smart，报告庄家配对得分差的置信区间和库的命中率。
+"""
+
+import sys
+import os
+import random
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.aggregator import RunningStats
+from src.book import OpeningBook, build_book
+from src.events import NullSink
+from src.game import NewGame
+from src.player import AIPlayer
+from src.simulator import game_seed
+
+
+def _dealer_score(seed, book):
+    game = NewGame(3, sink=NullSink(), seed=seed)
+    players = [AIPlayer(f"AI{seat + 1}", "smart", sink=NullSink(), rng=game.rng, book=book if seat == 0 else None)
+               for seat in range(3)]
+    game.setup_game(players=players)
+    hit = book is not None and book.lookup(players[0].hand.counts) is not None
+    game.play_game()
+    return game.scores[0], hit
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    deals = int(sys.argv[3]) if len(sys.argv) > 3 else 3000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "book.bin")
+        start = time.perf_counter()
+        counts = build_book(path, 3, "smart", games, samples, seed=1)
+        print(f"生成: {games} 次发牌，{counts['opening_records']} 条开局、{counts['response_records']} 条压牌，"
+              f"{time.perf_counter() - start:.1f} 秒，文件 {os.path.getsize(path) / 1e3:.0f} KB")
+
+        start = time.perf_counter()
+        book = OpeningBook(path)
+        book.lookup([1] * 6 + [0] * 9)
+        print(f"首次查询（打开并映射）: {(time.perf_counter() - start) * 1e6:.0f} 微秒")
+        rng = random.Random(0)
+        keys = [key for key, _ in book.entries()]
+        queries = [[(key >> (8 + 3 * r)) & 7 for r in range(15)] for key in rng.choices(keys, k=20000)]
+        start = time.perf_counter()
+        for counts in queries:
+            book.lookup(counts)
+        print(f"查询: 平均 {(time.perf_counter() - start) / len(queries) * 1e6:.2f} 微秒")
+
+        diff, hits = RunningStats(), 0
+        for index in range(deals):
+            seed = game_seed(2, index)
+            with_book, hit = _dealer_score(seed, book)
+            without, _ = _dealer_score(seed, None)
+            diff.add(with_book - without)
+            hits += hit
+        print(f"评估 {deals} 副牌: 开局命中 {hits / deals:.1%}，庄家得分差（用库 - 不用库）"
+              f"{diff.mean:+.3f} ± {diff.half_width():.3f}")
+        book.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""对局轨迹数据集：导出速度、磁盘占用、流式读取速度，以及峰值内存与局数无关
+
+用法: python benchmarks/bench_dataset.py [局数] [每个分片的行数]
+在当前进程中导出（workers=1），峰值内存用tracemalloc统计；
+先导出局数的1/10作对照，两次的峰值应当相近（只取决于分片大小）。
+"""
+
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dataset import export_games, iter_batches
+
+
+STRATEGIES = ["conservative", "aggressive", "smart"]
+
+
+def _export(path, games, shard_rows, compress):
+    tracemalloc.start()
+    start = time.perf_counter()
+    manifest = export_games(path, 3, STRATEGIES, games, seed=1, workers=1, chunk_size=500,
+                            shard_rows=shard_rows, compress=compress)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return manifest, elapsed, peak, size
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    shard_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1 << 18
+    with tempfile.TemporaryDirectory() as directory:
+        for compress in (True, False):
+            label = "压缩.npz" if compress else "内存映射.npy"
+            for count in (games // 10, games):
+                path = os.path.join(directory, f"{label}-{count}")
+                manifest, elapsed, peak, size = _export(path, count, shard_rows, compress)
+                print(f"{label} {count} 局 / {manifest['rows']} 行: {count / elapsed:.0f} 局/秒，"
+                      f"峰值内存 {peak / 1e6:.1f} MB，磁盘 {size / 1e6:.1f} MB（{size / manifest['rows']:.1f} 字节/行）")
+
+            start = time.perf_counter()
+            rows = sum(len(batch["action"]) for batch in iter_batches(path))
+            elapsed = time.perf_counter() - start
+            print(f"{label} 流式读取全部列: {rows / elapsed / 1e6:.1f} M行/秒")
+
+
+if __name__ == "__main__":
+    main()
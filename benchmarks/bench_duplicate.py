@@ -0,0 +1,49 @@
+"""复式模拟的方差缩减：达到同样置信区间宽度需要的局数，复式 vs 普通对局
+
+用法: python benchmarks/bench_duplicate.py [副数] [玩家数]
+普通对局每局随机发牌、座位轮换，估计量为同一局中两种策略的得分差；
+复式每副牌打玩家数局，估计量为这副牌上两种策略平均得分的差。
+所需局数之比 = 普通对局每局差的方差 / (玩家数 × 复式每副差的方差)。
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.aggregator import PairedStats
+from src.simulator import duplicate, game_seed, lineup, play_single_game, rotations
+
+
+STRATEGIES = ["conservative", "aggressive", "smart"]
+
+
+def main():
+    deals = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    player_count = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    seats = lineup(player_count, STRATEGIES)
+    lineups = rotations(seats)
+
+    start = time.perf_counter()
+    summary = duplicate(player_count, seats, deals, seed=1, workers=1)
+    elapsed = time.perf_counter() - start
+
+    independent = {pair: PairedStats() for pair in summary.pairs}
+    for game_index in range(summary.games):
+        order = lineups[game_index % player_count]
+        scores = play_single_game(player_count, order, game_seed(2, game_index)).scores
+        for (a, b), stats in independent.items():
+            mean_a = sum(s for name, s in zip(order, scores) if name == a) / order.count(a)
+            mean_b = sum(s for name, s in zip(order, scores) if name == b) / order.count(b)
+            stats.add(mean_a - mean_b)
+
+    print(f"{player_count}人局，复式 {summary.deals} 副牌 / {summary.games} 局，{summary.games / elapsed:.0f} 局/秒")
+    for pair, stats in summary.pairs.items():
+        ratio = independent[pair].variance / (player_count * stats.variance)
+        print(f"  {pair[0]} - {pair[1]}: 差 {stats.mean:+.3f}，"
+              f"普通对局每局方差 {independent[pair].variance:.2f}，复式每副方差 {stats.variance:.2f}，"
+              f"所需局数少 {ratio:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""残局求解器性能测试：每秒搜索节点数和置换表命中率
+
+用法: python benchmarks/bench_endgame.py [每种规模的残局数]
+随机发出牌堆已抽完的残局（各家手牌已知），逐个求解当前座位每种出牌的得分。
+"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card_mask import CARD_RANK, NUM_RANKS
+from src.endgame import EndgameSolver
+from src.game_state import GameState
+
+
+def _random_endgame(rng, player_count, cards):
+    deck = list(range(54))
+    rng.shuffle(deck)
+    hands = []
+    for _ in range(player_count):
+        counts = [0] * NUM_RANKS
+        for _ in range(cards):
+            counts[CARD_RANK[deck.pop()]] += 1
+        hands.append(counts)
+    return GameState(hands, [], dealer=rng.randrange(player_count))
+
+
+def main():
+    positions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rng = random.Random(0)
+    for player_count, cards in ((2, 5), (2, 7), (3, 4), (3, 5)):
+        solver = EndgameSolver(max_nodes=None)
+        for _ in range(positions):
+            solver.solve(_random_endgame(rng, player_count, cards))
+        stats = solver.stats()
+        print(f"{player_count}人 x {cards}张: {stats['nodes_per_second']:8.0f} 节点/秒，"
+              f"平均 {stats['nodes'] / positions:8.0f} 节点/局，"
+              f"置换表命中率 {stats['hit_rate']:.1%}，淘汰 {stats['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""强化学习环境性能测试：每秒步数（单个环境 / 多进程向量化环境）
+
+用法: python benchmarks/bench_env.py [步数] [环境数]
+动作从合法动作中随机选择。需要安装numpy。
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.env import DengYanEnv, VectorEnv
+
+
+def _single_env_steps_per_second(steps):
+    rng = np.random.default_rng(0)
+    env = DengYanEnv(3)
+    _, info = env.reset(0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        action = rng.choice(np.flatnonzero(info["action_mask"]))
+        _, _, terminated, _, info = env.step(action)
+        if terminated:
+            _, info = env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def _vector_env_steps_per_second(steps, num_envs, workers):
+    rng = np.random.default_rng(0)
+    with VectorEnv(num_envs, workers=workers, player_count=3) as envs:
+        _, masks = envs.reset(seed=0)
+        start = time.perf_counter()
+        for _ in range(steps // num_envs):
+            actions = [rng.choice(np.flatnonzero(mask)) for mask in masks]
+            _, _, _, _, masks, _ = envs.step(actions)
+        return steps // num_envs * num_envs / (time.perf_counter() - start)
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    num_envs = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    print(f"单个环境:               {_single_env_steps_per_second(steps):8.0f} 步/秒")
+    print(f"{num_envs}个环境（当前进程）:   {_vector_env_steps_per_second(steps, num_envs, 0):8.0f} 步/秒")
+    workers = min(num_envs, os.cpu_count() or 1)
+    print(f"{num_envs}个环境（{workers}个进程）:  {_vector_env_steps_per_second(steps, num_envs, workers):8.0f} 步/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""二进制事件日志性能测试：记录日志的开销、日志大小、重放速度
+
+用法: python benchmarks/bench_event_log.py [局数]
+"""
+
+import sys
+import os
+import io
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.event_log import BinaryLogSink, read_games, replay
+from src.events import NullSink
+from src.game import NewGame
+
+
+def _games_per_second(make_sink, games):
+    start = time.perf_counter()
+    for seed in range(games):
+        game = NewGame(3, sink=make_sink(), seed=seed)
+        game.setup_game(human_players=0)
+        game.play_game()
+    return games / (time.perf_counter() - start)
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    buffer = io.BytesIO()
+    sink = BinaryLogSink(buffer)
+    headless = _games_per_second(NullSink, games)
+    logged = _games_per_second(lambda: sink, games)
+    data = buffer.getvalue()
+
+    start = time.perf_counter()
+    states = 0
+    for record in read_games(io.BytesIO(data)):
+        for _ in replay(record):
+            states += 1
+    replayed = games / (time.perf_counter() - start)
+
+    print(f"无日志:   {headless:8.0f} 局/秒")
+    print(f"二进制日志: {logged:8.0f} 局/秒 (开销 {headless / logged - 1:.1%})，平均 {len(data) / games:.0f} 字节/局")
+    print(f"读取并重放: {replayed:8.0f} 局/秒（{states / games:.0f} 个局面/局）")
+
+
+if __name__ == "__main__":
+    main()
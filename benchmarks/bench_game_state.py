@@ -0,0 +1,57 @@
+"""展开一步的开销：深拷贝NewGame、复制GameState、GameState的apply/undo
+
+用法: python benchmarks/bench_game_state.py [局数]
+对每局开局时的每一种合法出牌各展开一次并回退，比较三种方式每秒能展开多少次。
+"""
+
+import copy
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card_mask import CARD_RANK, card_to_index
+from src.events import NullSink
+from src.game import NewGame
+from src.game_state import GameState
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(0)
+    positions = []
+    for _ in range(games):
+        game = NewGame(3, sink=NullSink(), rng=random.Random(rng.random()))
+        game.setup_game(human_players=0, ai_strategies=["smart"])
+        deck = [CARD_RANK[card_to_index(card)] for card in game.deck]
+        state = GameState([player.hand.counts for player in game.players], deck, game.dealer_index)
+        positions.append((game, state, state.legal_moves()))
+    expansions = sum(len(moves) for _, _, moves in positions)
+
+    start = time.perf_counter()
+    for game, _, moves in positions:
+        for _ in moves:
+            copy.deepcopy(game)
+    deepcopy_rate = expansions / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _, state, moves in positions:
+        for move in moves:
+            state.copy().apply(move)
+    copy_rate = expansions / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _, state, moves in positions:
+        for move in moves:
+            state.apply(move)
+            state.undo()
+    undo_rate = expansions / (time.perf_counter() - start)
+
+    print(f"深拷贝NewGame:     {deepcopy_rate:10.0f} 次/秒")
+    print(f"复制GameState:     {copy_rate:10.0f} 次/秒")
+    print(f"apply/undo:        {undo_rate:10.0f} 次/秒 (比深拷贝快 {undo_rate / deepcopy_rate:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
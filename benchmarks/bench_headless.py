@@ -0,0 +1,39 @@
+"""无界面模式性能测试：AI对战每秒局数（有/无控制台输出，以及开启分阶段性能统计）
+
+用法: python benchmarks/bench_headless.py [局数]
+控制台输出写到os.devnull，只计入格式化和写入的开销，不计终端渲染。
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.events import ConsoleSink, NullSink
+from src.game import NewGame
+from src.metrics import GameMetrics
+
+
+def _games_per_second(make_sink, games, player_count=3, make_metrics=lambda: None):
+    start = time.perf_counter()
+    for seed in range(games):
+        game = NewGame(player_count, sink=make_sink(), rng=random.Random(seed), metrics=make_metrics())
+        game.setup_game(human_players=0)
+        game.play_game()
+    return games / (time.perf_counter() - start)
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        console = _games_per_second(lambda: ConsoleSink(devnull), games)
+    headless = _games_per_second(NullSink, games)
+    profiled = _games_per_second(NullSink, games, make_metrics=GameMetrics)
+    print(f"控制台输出: {console:8.1f} 局/秒")
+    print(f"无界面模式: {headless:8.1f} 局/秒 ({headless / console:.1f}x)")
+    print(f"性能统计:   {profiled:8.1f} 局/秒 (开销 {headless / profiled - 1:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""信息集MCTS性能测试：每秒模拟对局数（rollouts/s）和每步耗时
+
+用法: python benchmarks/bench_mcts.py [每步迭代次数] [局数]
+每局由一个MCTS AI对两个smart AI，统计MCTS每一步的搜索。
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.events import NullSink
+from src.game import NewGame
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    games = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    move_times, total_iterations = [], 0
+
+    for seed in range(games):
+        game = NewGame(3, sink=NullSink(), rng=random.Random(seed))
+        game.setup_game(human_players=0, ai_strategies=["mcts", "smart"])
+        player = game.players[0]
+        player.iterations = iterations
+        search = player.search
+
+        def timed_search():
+            nonlocal total_iterations
+            start = time.perf_counter()
+            move = search()
+            move_times.append(time.perf_counter() - start)
+            total_iterations += player.last_search_stats["iterations"]
+            return move
+
+        player.search = timed_search
+        game.play_game()
+
+    move_times.sort()
+    total = sum(move_times)
+    print(f"每步 {iterations} 次迭代，共 {len(move_times)} 步")
+    print(f"模拟对局: {total_iterations / total:8.0f} 次/秒")
+    print(f"每步耗时: 平均 {total / len(move_times) * 1000:.1f} ms，"
+          f"p99 {move_times[int(len(move_times) * 0.99)] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
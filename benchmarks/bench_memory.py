@@ -0,0 +1,68 @@
+"""内存和对象数：批量模拟的峰值内存，保留大量对局/牌型时的内存和Card实例数
+
+用法: python benchmarks/bench_memory.py [模拟局数]
+峰值内存用tracemalloc统计（只计Python分配的内存），速度单独不开tracemalloc测。
+"""
+
+import gc
+import sys
+import os
+import random
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card import Card, create_deck
+from src.events import NullSink
+from src.game import NewGame
+from src.pattern_analyzer import PatternAnalyzer
+from src.simulator import simulate
+
+
+def _traced(func):
+    """运行func，返回(结果, 运行后仍占用的字节数, 峰值字节数)"""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def _dealt_games(count):
+    games = []
+    for seed in range(count):
+        game = NewGame(3, sink=NullSink(), rng=random.Random(seed))
+        game.setup_game(human_players=0)
+        games.append(game)
+    return games
+
+
+def _patterns(count):
+    rng = random.Random(0)
+    deck = create_deck()
+    return [PatternAnalyzer.find_all_patterns(rng.sample(deck, 17)) for _ in range(count)]
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    start = time.perf_counter()
+    simulate(3, ["conservative", "aggressive", "smart"], games, seed=0, workers=1)
+    rate = games / (time.perf_counter() - start)
+    _, _, peak = _traced(lambda: simulate(3, ["conservative", "aggressive", "smart"], games, seed=0, workers=1))
+    print(f"模拟 {games} 局（单进程）: {rate:8.1f} 局/秒，峰值内存 {peak / 1024:8.0f} KB")
+
+    kept, current, _ = _traced(lambda: _dealt_games(1000))
+    cards = sum(1 for obj in gc.get_objects() if isinstance(obj, Card))
+    print(f"保留1000局发好牌的对局: {current / 1024:8.0f} KB，Card实例 {cards} 个")
+    del kept
+
+    patterns, current, _ = _traced(lambda: _patterns(1000))
+    total = sum(len(found) for found in patterns)
+    print(f"保留1000手17张牌的所有牌型（{total} 个Pattern）: {current / 1024:8.0f} KB，"
+          f"每个 {current / total:.0f} 字节")
+
+
+if __name__ == "__main__":
+    main()
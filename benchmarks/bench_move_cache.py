@@ -0,0 +1,50 @@
+"""出牌缓存的效果：开/关缓存时的整局速度和MCTS速度，以及命中率和内存占用
+
+用法: python benchmarks/bench_move_cache.py [局数]
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.events import NullSink
+from src.game import NewGame
+from src.move_cache import MOVE_CACHE
+
+
+def _headless(games):
+    start = time.perf_counter()
+    for seed in range(games):
+        game = NewGame(3 + seed % 3, sink=NullSink(), seed=seed)
+        game.setup_game(human_players=0, ai_strategies=["conservative", "aggressive", "smart"])
+        game.play_game()
+    return games / (time.perf_counter() - start)
+
+
+def _mcts(games):
+    start = time.perf_counter()
+    for seed in range(games):
+        game = NewGame(3, sink=NullSink(), rng=random.Random(seed))
+        game.setup_game(human_players=0, ai_strategies=["mcts", "smart"])
+        game.players[0].iterations = 50
+        game.play_game()
+    return games / (time.perf_counter() - start)
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    for name, run, count in (("整局对战", _headless, games), ("MCTS(50次迭代)", _mcts, max(1, games // 50))):
+        MOVE_CACHE.enabled = False
+        off = run(count)
+        MOVE_CACHE.enabled = True
+        MOVE_CACHE.clear()
+        on = run(count)
+        stats = MOVE_CACHE.stats()
+        print(f"{name}: 关闭缓存 {off:8.1f} 局/秒，开启缓存 {on:8.1f} 局/秒 ({on / off:.2f}x)；"
+              f"命中率 {stats['hit_rate']:.1%}，{stats['entries']} 条，约 {stats['memory_bytes'] / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
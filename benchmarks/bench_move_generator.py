@@ -0,0 +1,140 @@
+"""出牌生成器性能对比：单遍直方图生成器/定向应答生成 vs 旧的嵌套循环实现
+
+用法: python benchmarks/bench_move_generator.py
+"""
+
+import sys
+import os
+import random
+import timeit
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card import create_deck
+from src.pattern_analyzer import PatternAnalyzer, Pattern, PatternType
+from src.player import AIPlayer
+
+
+# ---------------------------------------------------------------------------
+# 旧实现（仅用于对比）
+# ---------------------------------------------------------------------------
+
+def legacy_ai_generate_all_patterns(hand):
+    """旧版AIPlayer._generate_all_patterns：i/j/k/l嵌套循环"""
+    patterns = []
+    for card in hand:
+        if card.can_be_single():
+            patterns.append([card])
+    n = len(hand)
+    for i in range(n):
+        for j in range(i + 1, n):
+            if hand[i].rank == hand[j].rank:
+                patterns.append([hand[i], hand[j]])
+    for i in range(n):
+        for j in range(i + 1, n):
+            for k in range(j + 1, n):
+                if hand[i].rank == hand[j].rank == hand[k].rank:
+                    patterns.append([hand[i], hand[j], hand[k]])
+    for i in range(n):
+        for j in range(i + 1, n):
+            for k in range(j + 1, n):
+                for l in range(k + 1, n):
+                    if hand[i].rank == hand[j].rank == hand[k].rank == hand[l].rank:
+                        patterns.append([hand[i], hand[j], hand[k], hand[l]])
+    patterns.extend(_legacy_runs(hand, 1, 5))
+    patterns.extend(_legacy_runs(hand, 2, 3))
+    jokers = [card for card in hand if card.rank.name in ['SMALL_JOKER', 'BIG_JOKER']]
+    if len(jokers) == 2:
+        patterns.append(jokers)
+    return patterns
+
+
+def _legacy_runs(hand, width, min_length):
+    groups = {}
+    for card in hand:
+        if card.can_be_in_straight():
+            groups.setdefault(card.rank, []).append(card)
+    ranks = sorted((r for r, cards in groups.items() if len(cards) >= width), key=lambda r: r.rank_value)
+    runs = []
+    for start in range(len(ranks)):
+        for length in range(min_length, len(ranks) - start + 1):
+            run = ranks[start:start + length]
+            if all(run[i].rank_value == run[i - 1].rank_value + 1 for i in range(1, len(run))):
+                cards = []
+                for rank in run:
+                    cards.extend(groups[rank][:width])
+                runs.append(cards)
+    return runs
+
+
+def legacy_ai_find_beating_patterns(hand, last_pattern):
+    """旧版AIPlayer._find_beating_patterns：逐个候选重新analyze_cards"""
+    plays = []
+    for cards in legacy_ai_generate_all_patterns(hand):
+        pattern = PatternAnalyzer._analyze_cards_slow(cards)
+        if pattern and pattern.can_beat(last_pattern):
+            plays.append(cards)
+    return plays
+
+
+def legacy_find_all_patterns(hand):
+    """旧版PatternAnalyzer.find_all_patterns"""
+    patterns = []
+    hand = sorted(hand)
+    for card in hand:
+        pattern = PatternAnalyzer._analyze_cards_slow([card])
+        if pattern.pattern_type != PatternType.INVALID:
+            patterns.append(pattern)
+    groups = {}
+    for card in hand:
+        groups.setdefault(card.rank, []).append(card)
+    for count, pattern_type in ((2, PatternType.PAIR), (3, PatternType.BOMB), (4, PatternType.HYDROGEN_BOMB)):
+        for rank, cards in groups.items():
+            if len(cards) >= count:
+                patterns.append(Pattern(cards[:count], pattern_type, rank))
+    for cards in _legacy_runs(hand, 1, 3):
+        patterns.append(Pattern(cards, PatternType.STRAIGHT, cards[-1].rank))
+    for cards in _legacy_runs(hand, 2, 2):
+        patterns.append(Pattern(cards, PatternType.STRAIGHT_PAIRS, cards[-1].rank))
+    return patterns
+
+
+# ---------------------------------------------------------------------------
+
+def _hands(size, count=50, seed=0):
+    rng = random.Random(seed)
+    deck = create_deck()
+    return [sorted(rng.sample(deck, size)) for _ in range(count)]
+
+
+def _time(func, hands, repeat=5):
+    best = min(timeit.repeat(lambda: [func(h) for h in hands], number=1, repeat=repeat))
+    return best / len(hands) * 1e6
+
+
+def main():
+    last_pattern = PatternAnalyzer.analyze_cards(create_deck()[3:4])  # 单牌6
+    print(f"{'手牌':>4} | {'用例':<24} | {'旧实现(us)':>10} | {'新实现(us)':>10} | {'加速':>6}")
+    for size in (5, 17, 40):
+        hands = _hands(size)
+        ais = []
+        for hand in hands:
+            ai = AIPlayer("bench", "smart")
+            ai.add_cards(hand)
+            ais.append(ai)
+        cases = [
+            ("AI._generate_all_patterns", lambda h: legacy_ai_generate_all_patterns(list(h.hand)),
+             lambda h: h._generate_all_patterns(), ais),
+            ("AI._find_beating_patterns", lambda h: legacy_ai_find_beating_patterns(list(h.hand), last_pattern),
+             lambda h: h._find_beating_patterns(last_pattern), ais),
+            ("find_all_patterns", legacy_find_all_patterns, PatternAnalyzer.find_all_patterns, hands),
+            ("find_valid_plays", lambda h: [p for p in legacy_find_all_patterns(h) if p.can_beat(last_pattern)],
+             lambda h: PatternAnalyzer.find_valid_plays(h, last_pattern), hands),
+        ]
+        for name, old, new, inputs in cases:
+            old_us = _time(old, inputs)
+            new_us = _time(new, inputs)
+            print(f"{size:>4} | {name:<24} | {old_us:>10.1f} | {new_us:>10.1f} | {old_us / new_us:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""多桌服务器压力测试：并发客户端各开一张私人桌与AI对打，统计出牌延迟
+
+用法: python benchmarks/bench_server.py [并发客户端数] [每个客户端的局数] [--connect HOST:PORT]
+不给--connect时在本进程里启动一个服务器。出牌延迟指从发出出牌到收到自己这手牌的事件为止，
+包括服务器校验、推进对局和广播事件的时间。
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card_mask import CARD_RANK, NUM_RANKS
+from src.move_generator import generate_moves
+from src.pattern_analyzer import PatternType
+from src.server import GameServer
+from src.strategy import choose_move
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def _client(host, port, games, players, latencies):
+    """按smart策略打games局，记录每手的出牌延迟"""
+    reader, writer = await asyncio.open_connection(host, port)
+    for _ in range(games):
+        writer.write(json.dumps({"op": "join", "players": players, "strategies": ["smart"]}).encode() + b"\n")
+        name, sent = None, None
+        while True:
+            message = json.loads(await reader.readline())
+            kind = message["type"]
+            if kind == "joined":
+                name = message["name"]
+            elif kind == "turn":
+                hand = message["hand"]
+                counts = [0] * NUM_RANKS
+                for index in hand:
+                    counts[CARD_RANK[index]] += 1
+                move = choose_move(counts, tuple(message["last"]) if message["last"] else None, "smart")
+                if move is not None and move.pattern_type == PatternType.INVALID and generate_moves(counts):
+                    move = generate_moves(counts)[0]  # 有合法牌型时王不能单出
+                if move is None:
+                    request = {"op": "pass"}
+                else:
+                    cards = []
+                    for rank_idx in move.ranks:
+                        cards += [index for index in hand if CARD_RANK[index] == rank_idx][:move.width]
+                    request = {"op": "play", "cards": cards}
+                sent = time.perf_counter()
+                writer.write(json.dumps(request).encode() + b"\n")
+            elif kind == "event" and message["event"] in ("play", "pass") and message["player"] == name:
+                if sent is not None:
+                    latencies.append(time.perf_counter() - sent)
+                    sent = None
+            elif kind == "error":
+                raise RuntimeError(message["message"])
+            elif kind == "game_over":
+                break
+    writer.close()
+
+
+async def _run(clients, games, players, connect):
+    server = None
+    if connect:
+        host, port = connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        server = GameServer(port=0)
+        host, port = server.host, await server.start()
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, games, players, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        await server.close()
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多桌服务器压力测试")
+    parser.add_argument("clients", type=int, nargs="?", default=500)
+    parser.add_argument("games", type=int, nargs="?", default=4)
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--connect", default=None, metavar="HOST:PORT")
+    args = parser.parse_args()
+
+    latencies, elapsed = asyncio.run(_run(args.clients, args.games, args.players, args.connect))
+    total = args.clients * args.games
+    print(f"{args.clients} 张桌同时进行，共 {total} 局，{elapsed:.1f} 秒 ({total / elapsed:.0f} 局/秒)")
+    print(f"出牌延迟: p50 {_percentile(latencies, 0.5) * 1000:.2f} ms，"
+          f"p99 {_percentile(latencies, 0.99) * 1000:.2f} ms（{len(latencies)} 手）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""性能测试套件：牌型分析、出牌生成、牌型比较和整局对战，结果输出为JSON
+
+用法:
+    python benchmarks/bench_suite.py [--quick] [--output 结果.json] [--filter 名字片段]
+    python benchmarks/bench_suite.py [--quick] --compare 基线.json [--threshold 0.25]
+
+手牌语料用固定种子生成（1~40张），每项记录平均每次调用的微秒数（越小越好），
+整局对战按玩家人数2~6分别计时。常规用例都关闭出牌缓存（MOVE_CACHE）计时，
+缓存的效果由单独的cold_cache（每次调用前清空）和warm_cache（计时前先把语料跑一遍）用例给出。--compare把本次结果与保存的基线逐项比较，
+慢了超过threshold的用例再复测一遍，仍然慢的记为退步，有退步时以状态码1退出；
+基线中有而本次没有运行的用例记为缺失。基线和本次必须都是（或都不是）--quick。
+报告里还有一个纯Python校准用例的耗时，比较时先按它折算机器快慢，
+机器整体变快或变慢不会被当成退步或提升。
+"""
+
+import argparse
+import functools
+import json
+import platform
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card import create_deck
+from src.events import NullSink
+from src.game import NewGame
+from src.move_cache import MOVE_CACHE
+from src.pattern_analyzer import PatternAnalyzer
+from src.player import AIPlayer
+
+
+SUITE_VERSION = 2
+HAND_SIZES = (1, 2, 3, 5, 8, 12, 17, 25, 40)
+PLAYER_COUNTS = (2, 3, 4, 5, 6)
+CORPUS_SEED = 20240601
+
+# 压牌用例的上家出牌：单牌6、对9、5张顺子、炸弹J
+_LAST_CARDS = ((3,), (6, 19), (0, 1, 2, 3, 4), (8, 21, 34))
+
+
+def hand_corpus(size, count, seed=CORPUS_SEED):
+    """固定种子的手牌语料"""
+    rng = random.Random(seed * 100 + size)
+    deck = create_deck()
+    return [sorted(rng.sample(deck, size)) for _ in range(count)]
+
+
+def _per_call_us(func, inputs, min_time):
+    """对inputs逐个调用func，至少跑min_time秒（语料不够时重复），返回平均每次调用的微秒数"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for item in inputs:
+            func(item)
+        calls += len(inputs)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / calls * 1e6
+
+
+def _calibration_workload(seed):
+    """校准用例：排序、字典和整数运算（与本项目代码无关）"""
+    rng = random.Random(seed)
+    values = [rng.random() for _ in range(200)]
+    values.sort()
+    table = {}
+    for i, value in enumerate(values):
+        table[i % 17] = table.get(i % 17, 0) + int(value * 1000)
+    return sum(table.values())
+
+
+def _hand_cases(count):
+    """(名字, 函数, 输入)：每种手牌规模一组"""
+    deck = create_deck()
+    lasts = [PatternAnalyzer.analyze_cards([deck[i] for i in cards]) for cards in _LAST_CARDS]
+    for size in HAND_SIZES:
+        hands = hand_corpus(size, count)
+        with_last = [(hand, lasts[i % len(lasts)]) for i, hand in enumerate(hands)]
+        ais = []
+        for hand in hands:
+            ai = AIPlayer("bench", "smart", sink=NullSink())
+            ai.add_cards(hand)
+            ais.append(ai)
+        patterns = [pattern for hand in hands for pattern in PatternAnalyzer.find_all_patterns(hand)][:count]
+        pairs = [(patterns[i], patterns[(i * 7 + 3) % len(patterns)]) for i in range(len(patterns))]
+        yield f"analyze_cards/{size}", PatternAnalyzer.analyze_cards, hands
+        yield f"find_all_patterns/{size}", PatternAnalyzer.find_all_patterns, hands
+        yield f"find_valid_plays/{size}", lambda item: PatternAnalyzer.find_valid_plays(*item), with_last
+        yield f"ai_generate_all_patterns/{size}", lambda ai: ai._generate_all_patterns(), ais
+        if pairs:
+            yield f"can_beat/{size}", lambda pair: pair[0].can_beat(pair[1]), pairs
+
+
+def _play(seed_and_count):
+    seed, player_count = seed_and_count
+    game = NewGame(player_count, sink=NullSink(), seed=seed)
+    game.setup_game(human_players=0, ai_strategies=["conservative", "aggressive", "smart"])
+    game.play_game()
+
+
+def _cached(func, cold):
+    """打开出牌缓存调用func；cold时每次调用前清空缓存"""
+    def run(item):
+        MOVE_CACHE.enabled = True
+        if cold:
+            MOVE_CACHE.clear()
+        try:
+            func(item)
+        finally:
+            MOVE_CACHE.enabled = False
+    return run
+
+
+def _prime(func, inputs):
+    """清空出牌缓存后把语料跑一遍"""
+    MOVE_CACHE.clear()
+    for item in inputs:
+        func(item)
+
+
+def _cache_cases(count, games):
+    """(名字, 函数, 输入, 计时前的准备)：出牌缓存冷启动和预热后的对照"""
+    ais = []
+    for hand in hand_corpus(17, count):
+        ai = AIPlayer("bench", "smart", sink=NullSink())
+        ai.add_cards(hand)
+        ais.append(ai)
+    seeds = [(CORPUS_SEED + i, 3) for i in range(games)]
+    templates = (("ai_generate_all_patterns_{}_cache/17", lambda ai: ai._generate_all_patterns(), ais),
+                 ("headless_game_{}_cache/3p", _play, seeds))
+    for template, func, inputs in templates:
+        yield template.format("cold"), _cached(func, cold=True), inputs, None
+        warm = _cached(func, cold=False)
+        yield template.format("warm"), warm, inputs, functools.partial(_prime, warm, inputs)
+
+
+def _suite(quick=False, name_filter=None):
+    """(用例列表, 重复轮数, 每项每轮至少计时的秒数)，第一项是校准用例"""
+    count, repeat, games, min_time = (50, 5, 30, 0.02) if quick else (200, 7, 150, 0.05)
+    cases = [("calibration", _calibration_workload, range(20), None)]
+    cases += [case + (None,) for case in _hand_cases(count) if not name_filter or name_filter in case[0]]
+    for player_count in PLAYER_COUNTS:
+        name = f"headless_game/{player_count}p"
+        if not name_filter or name_filter in name:
+            cases.append((name, _play, [(CORPUS_SEED + i, player_count) for i in range(games)], None))
+    cases += [case for case in _cache_cases(count, games) if not name_filter or name_filter in case[0]]
+    return cases, repeat, min_time
+
+
+def _measure(cases, repeat, min_time, best):
+    """所有用例轮流各跑一遍、共repeat轮，best中每项保留最快的一轮
+
+    计时期间关闭出牌缓存，否则重复跑同一份语料量到的只是缓存命中；缓存用例自己打开它。
+    """
+    enabled = MOVE_CACHE.enabled
+    MOVE_CACHE.enabled = False
+    try:
+        for _ in range(repeat):
+            for name, func, inputs, prepare in cases:
+                if prepare is not None:
+                    prepare()
+                best[name] = min(best.get(name, float("inf")), _per_call_us(func, inputs, min_time))
+    finally:
+        MOVE_CACHE.enabled = enabled
+        MOVE_CACHE.clear()
+
+
+def run_suite(quick=False, name_filter=None):
+    """运行所有用例，返回({用例名: 每次调用的微秒数}, 校准用例的微秒数)
+
+    每项取repeat轮中最快的一轮，机器速度的短时波动对各项影响相同。
+    """
+    cases, repeat, min_time = _suite(quick, name_filter)
+    best = {}
+    _measure(cases, repeat, min_time, best)
+    calibration = round(best.pop("calibration"), 3)
+    results = {name: round(value, 3) for name, value in best.items()}
+    for name, value in results.items():
+        print(f"{name:<40} {value:>12.2f} us", file=sys.stderr)
+    return results, calibration
+
+
+def remeasure(results, calibration, names, quick=False):
+    """对names中的用例连同校准用例再跑一遍完整的轮数，results中保留更快的结果
+
+    单次计时偶尔整段落在机器变慢的时候，被判为退步的用例复测后仍然慢才算数。
+    复测的耗时按同时测得的校准用例换算到第一次运行时的机器速度。
+    """
+    cases, repeat, min_time = _suite(quick)
+    best = {}
+    _measure([case for case in cases if case[0] == "calibration" or case[0] in names], repeat, min_time, best)
+    scale = calibration / best.pop("calibration")
+    for name in names:
+        results[name] = round(min(results[name], best[name] * scale), 3)
+
+
+def compare(results, baseline, threshold, speed=1.0):
+    """逐项与基线比较，返回(名字, 基线, 本次, 比值, 状态)列表
+
+    speed为本次机器相对基线的快慢（校准用例耗时之比），比值按它折算。
+    基线中有、本次没有运行的用例记为缺失（本次为None）。
+    """
+    rows = []
+    for name, value in results.items():
+        old = baseline.get(name)
+        if old is None:
+            rows.append((name, None, value, None, "新增"))
+            continue
+        ratio = value / old / speed if old else float("inf")
+        if ratio > 1 + threshold:
+            status = "退步"
+        elif ratio < 1 - threshold:
+            status = "提升"
+        else:
+            status = ""
+        rows.append((name, old, value, ratio, status))
+    rows += [(name, old, None, None, "缺失") for name, old in baseline.items() if name not in results]
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="性能测试套件")
+    parser.add_argument("--quick", action="store_true", help="缩小语料和重复次数，快速跑一遍")
+    parser.add_argument("--output", default=None, help="把结果写到JSON文件（默认打印到标准输出）")
+    parser.add_argument("--filter", default=None, help="只运行名字包含该片段的用例")
+    parser.add_argument("--compare", default=None, metavar="BASELINE", help="与保存的基线JSON比较")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="判定退步/提升的相对变化（默认0.25，--quick时0.5）")
+    args = parser.parse_args()
+    if args.threshold is None:
+        args.threshold = 0.5 if args.quick else 0.25  # quick的计时短，同一份代码两次也常差30%以上
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("quick", False) != args.quick:
+            # 语料大小和对局数不同，每次调用的耗时不可比
+            sys.exit(f"基线的quick={baseline.get('quick', False)}，与本次的quick={args.quick}不同，不能比较")
+        if baseline.get("version") != SUITE_VERSION:
+            print(f"基线版本{baseline.get('version')}与当前套件版本{SUITE_VERSION}不同，用例可能不一致")
+
+    results, calibration = run_suite(args.quick, args.filter)
+    if baseline is not None:
+        speed = calibration / baseline["calibration_us"] if baseline.get("calibration_us") else 1.0
+        slow = [row[0] for row in compare(results, baseline["results"], args.threshold, speed) if row[4] == "退步"]
+        if slow:
+            print(f"复测 {len(slow)} 项疑似退步的用例", file=sys.stderr)
+            remeasure(results, calibration, slow, args.quick)
+
+    report = {
+        "version": SUITE_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "unit": "us_per_call",
+        "calibration_us": calibration,
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    elif baseline is None:
+        print(text)
+
+    if baseline is not None:
+        rows = compare(results, baseline["results"], args.threshold, speed)
+        if args.filter:
+            rows = [row for row in rows if row[4] != "缺失" or args.filter in row[0]]
+        print(f"校准用例耗时为基线的 {speed:.2f} 倍，比值已按此折算")
+        print(f"{'用例':<40} {'基线(us)':>12} {'本次(us)':>12} {'比值':>7}")
+        for name, old, value, ratio, status in rows:
+            old_text = f"{old:12.2f}" if old is not None else f"{'-':>12}"
+            value_text = f"{value:12.2f}" if value is not None else f"{'-':>12}"
+            ratio_text = f"{ratio:7.2f}" if ratio is not None else f"{'-':>7}"
+            print(f"{name:<40} {old_text} {value_text} {ratio_text}  {status}")
+        regressions = [row for row in rows if row[4] == "退步"]
+        missing = [row for row in rows if row[4] == "缺失"]
+        print(f"{len(regressions)} 项退步（阈值 {args.threshold:.0%}）"
+              + (f"，基线中有 {len(missing)} 项本次没有运行" if missing else ""))
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
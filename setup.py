@@ -36,6 +36,9 @@ setup(
             "black>=21.0",
             "flake8>=3.8",
         ],
+        "fast": [
+            "numpy>=1.20",  # 向量化批量对局引擎、强化学习环境、轨迹数据集导出
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+新玩法游戏 - AI对战批量模拟入口
+
+示例: python simulate.py -p 3 -s conservative,aggressive,smart -n 100000 --seed 42
+"""
+
+from src.simulator import main
+
+
+if __name__ == "__main__":
+    main()
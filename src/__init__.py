@@ -3,8 +3,14 @@
 """
 
 from .card import Card, Suit, Rank, create_deck
+from .card_mask import card_to_index, index_to_card, cards_to_mask, mask_to_cards, create_int_deck
 from .pattern_analyzer import PatternAnalyzer, Pattern, PatternType
+from .hand import Hand
 from .player import Player, HumanPlayer, AIPlayer
+from .game_state import GameState
+from .mcts import MCTSPlayer
+from .endgame import EndgameSolver
+from .events import GameEvent, EventSink, NullSink, LogSink, ConsoleSink
 from .game import NewGame
 
 __version__ = "2.0.0"
@@ -13,7 +19,9 @@ __description__ = "新玩法扑克游戏Python实现"
 
 __all__ = [
     "Card", "Suit", "Rank", "create_deck",
+    "card_to_index", "index_to_card", "cards_to_mask", "mask_to_cards", "create_int_deck",
     "PatternAnalyzer", "Pattern", "PatternType",
-    "Player", "HumanPlayer", "AIPlayer", 
+    "Hand", "Player", "HumanPlayer", "AIPlayer", "MCTSPlayer", "GameState", "EndgameSolver",
+    "GameEvent", "EventSink", "NullSink", "LogSink", "ConsoleSink",
     "NewGame"
 ]
\ No newline at end of file
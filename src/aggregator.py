@@ -0,0 +1,285 @@
+"""新玩法游戏 - 流式统计
+逐局累加模拟结果，内存占用与局数无关，部分汇总可以跨进程合并。
+
+RunningStats：整数取值的在线均值/方差；PairedStats：浮点数（配对差）的在线均值/方差；Histogram：整数取值的直方图（超过上限的计入溢出桶）；
+QuantileSketch：相对误差有界的分位数草图（DDSketch），桶数有上限；
+GameAggregator：一个座位数下的整局统计（轮数、春天、胜者牌型倍率、各座位得分）。
+"""
+
+import math
+from statistics import NormalDist
+from typing import Dict, List, Optional
+
+
+class RunningStats:
+    """在线均值和方差，可以合并
+
+    只保存个数、和与平方和。输入为整数时求和是精确的，
+    结果与累加、合并的顺序无关（多进程分块汇总后完全一致）。
+    浮点数用平方和求方差会有严重的相消误差，改用PairedStats。
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0
+        self.total_sq = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.n += 1
+        self.total += value
+        self.total_sq += value * value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "RunningStats"):
+        """合并另一组"""
+        self.n += other.n
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else 0.0
+
+    @property
+    def variance(self) -> float:
+        """样本方差"""
+        if self.n < 2:
+            return math.inf
+        return max(self.n * self.total_sq - self.total * self.total, 0) / (self.n * (self.n - 1))
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        """均值置信区间的半宽（正态近似）"""
+        if self.n < 2:
+            return math.inf
+        return NormalDist().inv_cdf((1 + confidence) / 2) * math.sqrt(self.variance / self.n)
+
+    def to_dict(self) -> dict:
+        return {"n": self.n, "mean": self.mean, "std": math.sqrt(self.variance) if self.n > 1 else 0.0,
+                "min": self.min if self.n else None, "max": self.max if self.n else None}
+
+
+class PairedStats:
+    """浮点数的在线均值和方差（Welford），可以合并（Chan等人的并行公式）"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "PairedStats"):
+        """合并另一组"""
+        if not other.n:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+
+    @property
+    def variance(self) -> float:
+        """样本方差"""
+        return self.m2 / (self.n - 1) if self.n > 1 else math.inf
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        """均值置信区间的半宽（正态近似）"""
+        if self.n < 2:
+            return math.inf
+        return NormalDist().inv_cdf((1 + confidence) / 2) * math.sqrt(self.variance / self.n)
+
+
+class Histogram:
+    """0..limit-1的整数直方图，不小于limit的取值计入溢出桶"""
+
+    def __init__(self, limit: int = 256):
+        self.counts: List[int] = [0] * (limit + 1)
+
+    @property
+    def limit(self) -> int:
+        return len(self.counts) - 1
+
+    def add(self, value: int):
+        self.counts[min(max(value, 0), self.limit)] += 1
+
+    def merge(self, other: "Histogram"):
+        if other.limit != self.limit:
+            raise ValueError("直方图的上限不同，不能合并")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def quantile(self, fraction: float) -> Optional[int]:
+        """分位数（落在溢出桶时返回limit）"""
+        total = sum(self.counts)
+        if not total:
+            return None
+        target = fraction * total
+        seen = 0
+        for value, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return value
+        return self.limit
+
+    def to_dict(self) -> dict:
+        """只保留非空的桶，溢出桶的键为">=上限"。"""
+        result = {str(value): count for value, count in enumerate(self.counts[:-1]) if count}
+        if self.counts[-1]:
+            result[f">={self.limit}"] = self.counts[-1]
+        return result
+
+
+class QuantileSketch:
+    """正数的分位数草图（DDSketch）
+
+    取值x落在第ceil(log_gamma(x))个桶，gamma = (1+accuracy)/(1-accuracy)，
+    报告的分位数相对误差不超过accuracy。桶数超过max_buckets时把最小的两个桶合并，
+    只有低分位数会损失精度。0和负数单独计数。
+    """
+
+    def __init__(self, accuracy: float = 0.01, max_buckets: int = 1024):
+        self.accuracy = accuracy
+        self.max_buckets = max_buckets
+        self._log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+        self.buckets: Dict[int, int] = {}
+        self.non_positive = 0
+        self.n = 0
+
+    def add(self, value: float):
+        self.n += 1
+        if value <= 0:
+            self.non_positive += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.accuracy != self.accuracy:
+            raise ValueError("草图的精度不同，不能合并")
+        self.n += other.n
+        self.non_positive += other.non_positive
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        if not self.n:
+            return None
+        target = fraction * (self.n - 1)
+        seen = self.non_positive
+        if seen > target:
+            return 0.0
+        gamma = math.exp(self._log_gamma)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > target:
+                return 2 * gamma ** index / (gamma + 1)
+        return 2 * gamma ** max(self.buckets) / (gamma + 1)
+
+
+class GameAggregator:
+    """一个座位数下的整局统计
+
+    每局计入：轮数（均值/方差和直方图）、春天的人数、胜者最后一手的牌型倍率、
+    各座位的得分（_calculate_score的结果）和全桌扣分总数的分位数草图。
+    """
+
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, player_count: int):
+        self.player_count = player_count
+        self.games = 0
+        self.rounds = RunningStats()
+        self.rounds_histogram = Histogram()
+        self.spring_games = 0    # 至少一人春天的局数
+        self.spring_players = 0  # 春天的人次
+        self.multipliers: Dict[int, int] = {}  # 胜者牌型倍率 -> 局数
+        self.finishes: Dict[str, int] = {}     # 胜者最后一手的牌型 -> 局数
+        self.seat_scores = [RunningStats() for _ in range(player_count)]
+        self.score_totals = [0] * player_count
+        self.penalty = QuantileSketch()  # 每局全桌扣分总数
+
+    def add(self, rounds: int, scores: List[int], springs: int = 0, multiplier: int = 1,
+            finish: Optional[str] = None):
+        """计入一局"""
+        self.games += 1
+        self.rounds.add(rounds)
+        self.rounds_histogram.add(rounds)
+        if springs:
+            self.spring_games += 1
+            self.spring_players += springs
+        self.multipliers[multiplier] = self.multipliers.get(multiplier, 0) + 1
+        if finish is not None:
+            self.finishes[finish] = self.finishes.get(finish, 0) + 1
+        for seat, score in enumerate(scores):
+            self.seat_scores[seat].add(score)
+            self.score_totals[seat] += score
+        self.penalty.add(-sum(scores))
+
+    def merge(self, other: "GameAggregator"):
+        """合并另一份统计"""
+        self.games += other.games
+        self.rounds.merge(other.rounds)
+        self.rounds_histogram.merge(other.rounds_histogram)
+        self.spring_games += other.spring_games
+        self.spring_players += other.spring_players
+        for multiplier, count in other.multipliers.items():
+            self.multipliers[multiplier] = self.multipliers.get(multiplier, 0) + count
+        for finish, count in other.finishes.items():
+            self.finishes[finish] = self.finishes.get(finish, 0) + count
+        for seat in range(self.player_count):
+            self.seat_scores[seat].merge(other.seat_scores[seat])
+            self.score_totals[seat] += other.score_totals[seat]
+        self.penalty.merge(other.penalty)
+
+    def to_dict(self) -> dict:
+        """导出为可序列化的字典"""
+        games = self.games or 1
+        return {
+            "games": self.games,
+            "rounds": dict(self.rounds.to_dict(),
+                           quantiles={str(q): self.rounds_histogram.quantile(q) for q in self.QUANTILES},
+                           histogram=self.rounds_histogram.to_dict()),
+            "spring_rate": self.spring_games / games,
+            "spring_players_per_game": self.spring_players / games,
+            "multiplier_rates": {str(m): count / games for m, count in sorted(self.multipliers.items())},
+            "finishes": dict(sorted(self.finishes.items(), key=lambda item: -item[1])),
+            "seat_scores": [dict(stats.to_dict(), total=total)
+                            for stats, total in zip(self.seat_scores, self.score_totals)],
+            "penalty_quantiles": {str(q): self.penalty.quantile(q) for q in self.QUANTILES},
+        }
+
+    def report(self) -> List[str]:
+        """文字报告"""
+        if not self.games:
+            return ["没有对局"]
+        games = self.games
+        rounds = self.rounds_histogram
+        lines = [
+            f"轮数: 平均 {self.rounds.mean:.1f} ± {math.sqrt(self.rounds.variance) if self.rounds.n > 1 else 0:.1f}，"
+            f"p50 {rounds.quantile(0.5)}，p90 {rounds.quantile(0.9)}，p99 {rounds.quantile(0.99)}，"
+            f"最多 {self.rounds.max:.0f}",
+            f"春天: {self.spring_games / games:.2%} 的对局，平均每局 {self.spring_players / games:.3f} 人",
+            "胜者牌型倍率: " + "，".join(f"x{m} {count / games:.2%}" for m, count in sorted(self.multipliers.items())),
+            f"全桌扣分: p50 {self.penalty.quantile(0.5):.1f}，p90 {self.penalty.quantile(0.9):.1f}，"
+            f"p99 {self.penalty.quantile(0.99):.1f}",
+        ]
+        return lines
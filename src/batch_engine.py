@@ -0,0 +1,277 @@
+"""新玩法游戏 - NumPy向量化批量对局引擎
+成千上万局AI对战同步推进：所有对局的手牌是(局数 × 座位 × 15)的牌点计数数组，
+牌堆是(局数 × 54)的牌点索引数组，每一步让所有未结束的对局各走一手。
+
+出牌用编号表示（MOVE_LIST的下标，按每个牌点的张数分组），合法性和策略都预先做成按编号索引的表：
+可出 = 手牌计数 ≥ 出牌所需计数 且 能压过上家；
+conservative/aggressive/smart 都化成"在合法出牌里取排序键最小者"。
+规则与NewGame._play_round一致，同一副牌的结果与GameState/NewGame相同。
+
+需要安装numpy（pip install dengyan-poker[fast]）。
+"""
+
+from typing import List, NamedTuple, Optional, Sequence
+from .card_mask import CARD_RANK, NUM_CARDS, NUM_RANKS, SMALL_JOKER_INDEX, BIG_JOKER_INDEX
+from .move_generator import Move, generate_moves, generate_responses_to_key
+from .pattern_analyzer import PatternType
+from .rules import DEALER_CARDS, HAND_CARDS, SPRING_CARDS, pattern_multiplier
+
+try:
+    import numpy as np
+except ImportError:  # numpy是可选依赖
+    np = None
+
+
+_FULL_COUNTS = [4] * SMALL_JOKER_INDEX + [1, 1]
+
+_GENERATED = generate_moves(_FULL_COUNTS)  # generate_moves的顺序，决定同分时的先后
+_JUNK_MOVES = [Move(PatternType.INVALID, SMALL_JOKER_INDEX, 1, 1), Move(PatternType.INVALID, BIG_JOKER_INDEX, 1, 1)]
+
+# 所有出牌（含只能在无牌可出时首出的单张王），按每个牌点的张数分组排列
+MOVE_LIST: List[Move] = sorted(_GENERATED + _JUNK_MOVES, key=lambda move: move.width)
+NUM_MOVES = len(MOVE_LIST)
+LEAD = NUM_MOVES  # 上家出牌为LEAD表示本轮首出
+PASS = -1
+
+STRATEGY_IDS = {"conservative": 0, "aggressive": 1, "smart": 2}
+_NO_KEY = 1 << 30  # 排序键：不可选
+
+
+class _Tables:
+    """按出牌编号索引的预计算表"""
+
+    def __init__(self):
+        moves = MOVE_LIST
+        index = {move: i for i, move in enumerate(moves)}
+        self.counts = np.zeros((NUM_MOVES, NUM_RANKS), dtype=np.int8)
+        for i, move in enumerate(moves):
+            for rank_idx in move.ranks:
+                self.counts[i, rank_idx] = move.width
+        self.size = np.array([move.size for move in moves], dtype=np.int16)
+        self.rank_sum = np.array([move.rank_sum for move in moves], dtype=np.int32)
+        self.multiplier = np.array([pattern_multiplier(move.pattern_type) for move in moves], dtype=np.int16)
+        # 可出判断：手牌中"≥w张的牌点"位掩码包含出牌涉及的所有牌点，按w分组广播
+        self.rank_bits = (1 << np.arange(NUM_RANKS)).astype(np.float64)
+        self.width_groups = []
+        for width in range(1, 5):
+            members = [i for i, move in enumerate(moves) if move.width == width]
+            required = np.array([sum(1 << r for r in moves[i].ranks) for i in members], dtype=np.int32)
+            self.width_groups.append((width, required))
+        self.junk = np.zeros(NUM_RANKS, dtype=np.int64)
+        for move in _JUNK_MOVES:
+            self.junk[move.main] = index[move]
+
+        # order[last, m]：m在"能压过last的出牌"列表中的位置，不能压过时为-1
+        order = np.full((NUM_MOVES + 1, NUM_MOVES), -1, dtype=np.int32)
+        for position, move in enumerate(_GENERATED):
+            order[LEAD, index[move]] = position
+        for last, move in enumerate(moves):
+            for position, response in enumerate(generate_responses_to_key(_FULL_COUNTS, move.key)):
+                order[last, index[response]] = position
+        self.order = order
+        self.allowed = order >= 0
+
+        # 排序键（越小越优先），形状为(策略, 上家出牌, 出牌)
+        width = NUM_MOVES
+        keys = np.full((3, NUM_MOVES + 1, NUM_MOVES), _NO_KEY, dtype=np.int32)
+        respond = self.allowed[:LEAD]
+        keys[0, :LEAD] = np.where(respond, self.rank_sum * width + order[:LEAD], _NO_KEY)
+        keys[1, :LEAD] = np.where(respond, -self.rank_sum * width + order[:LEAD], _NO_KEY)
+        keys[2, :LEAD] = keys[0, :LEAD]  # smart取中位数，排序方式与conservative相同
+        # 首出：conservative/smart出最小的单牌，其次最小的对子；aggressive出张数最多、牌点和最大的
+        for position, move in enumerate(_GENERATED):
+            i = index[move]
+            if move.length == 1 and move.width <= 2 and move.main < SMALL_JOKER_INDEX:
+                keys[0, LEAD, i] = keys[2, LEAD, i] = (move.width - 1) * NUM_RANKS + move.main
+            keys[1, LEAD, i] = (-move.size * 1000 - move.rank_sum) * width + position
+        self.keys = keys
+
+
+_tables: Optional[_Tables] = None
+
+
+def _get_tables() -> _Tables:
+    global _tables
+    if np is None:
+        raise ImportError("批量对局引擎需要numpy：pip install dengyan-poker[fast]")
+    if _tables is None:
+        _tables = _Tables()
+    return _tables
+
+
+class BatchResult(NamedTuple):
+    """批量对局结果（numpy数组）"""
+    winners: "np.ndarray"  # (局数,) 获胜座位
+    scores: "np.ndarray"   # (局数, 座位) 得分（负分为扣分）
+    rounds: "np.ndarray"   # (局数,) 轮数
+
+
+class BatchEngine:
+    """向量化批量对局
+
+    decks为(局数 × 54)的牌点索引数组（牌堆顶在末尾，与NewGame.deck一致）；
+    不给时用seed随机洗牌。庄家固定为0号座位。
+    """
+
+    def __init__(self, player_count: int, strategies: Sequence[str], games: int = 0,
+                 seed: Optional[int] = None, decks=None):
+        tables = _get_tables()
+        if not 2 <= player_count <= 6:
+            raise ValueError("玩家数量必须在2-6之间")
+        for strategy in strategies:
+            if strategy not in STRATEGY_IDS:
+                raise ValueError(f"未知的AI策略: {strategy}")
+        self.tables = tables
+        self.player_count = player_count
+        self.seat_strategies = np.array([STRATEGY_IDS[strategies[i % len(strategies)]]
+                                         for i in range(player_count)], dtype=np.int64)
+        if decks is None:
+            decks = self.shuffled_decks(games, seed)
+        self.decks = np.asarray(decks, dtype=np.int8)
+        self.games = len(self.decks)
+
+        n = self.games
+        self.hands = np.zeros((n, player_count, NUM_RANKS), dtype=np.int8)
+        self.sizes = np.zeros((n, player_count), dtype=np.int16)
+        self.top = np.full(n, self.decks.shape[1], dtype=np.int64)  # 牌堆剩余张数
+        self.dealer = 0
+        self.current = np.zeros(n, dtype=np.int64)
+        self.last = np.full(n, LEAD, dtype=np.int64)
+        self.passes = np.zeros(n, dtype=np.int64)
+        self.round_winner = np.full(n, -1, dtype=np.int64)
+        self.winner = np.full(n, -1, dtype=np.int64)
+        self.round_count = np.zeros(n, dtype=np.int64)
+        self._deal()
+
+    @staticmethod
+    def shuffled_decks(games: int, seed: Optional[int] = None):
+        """批量洗牌，返回(局数 × 54)的牌点索引数组"""
+        if np is None:
+            _get_tables()
+        rng = np.random.default_rng(seed)
+        order = rng.permuted(np.tile(np.arange(NUM_CARDS), (games, 1)), axis=1)
+        return np.asarray(CARD_RANK, dtype=np.int8)[order]
+
+    def _deal(self):
+        """发牌 - 庄家6张，其他人5张（从牌堆顶依次发）"""
+        rank_ids = np.arange(NUM_RANKS)
+        for seat in [self.dealer] + [i for i in range(self.player_count) if i != self.dealer]:
+            count = DEALER_CARDS if seat == self.dealer else HAND_CARDS
+            cards = self.decks[:, self.top[0] - count:self.top[0]]
+            self.hands[:, seat] = (cards[:, :, None] == rank_ids).sum(axis=1)
+            self.sizes[:, seat] = count
+            self.top -= count
+        self.current[:] = self.dealer
+
+    @property
+    def active(self):
+        """未结束的对局编号"""
+        return np.flatnonzero(self.winner < 0)
+
+    def choose(self, games, seats):
+        """games中的对局由seats座位按各自策略选择出牌，返回出牌编号（PASS为跳过）"""
+        tables = self.tables
+        counts = self.hands[games, seats]
+        last = self.last[games]
+        strategy = self.seat_strategies[seats]
+
+        groups = []
+        for width, required in tables.width_groups:
+            bits = ((counts >= width).astype(np.float64) @ tables.rank_bits).astype(np.int32)
+            groups.append((bits[:, None] & required) == required)
+        available = np.concatenate(groups, axis=1)
+        keys = tables.keys[strategy, last]
+        keys[~available] = _NO_KEY
+        choice = keys.argmin(axis=1)
+
+        # smart压牌：手牌多于3张时取排序后的中位数，否则同aggressive
+        smart = (strategy == 2) & (last != LEAD)
+        if smart.any():
+            rows = np.flatnonzero(smart)
+            few = self.sizes[games[rows], seats[rows]] <= 3
+            aggressive_keys = np.where(available[rows], tables.keys[1, last[rows]], _NO_KEY)
+            sorted_keys = np.sort(keys[rows], axis=1)
+            legal_count = (sorted_keys < _NO_KEY).sum(axis=1)
+            median = sorted_keys[np.arange(len(rows)), legal_count // 2]
+            median_choice = (keys[rows] == median[:, None]).argmax(axis=1)
+            choice[rows] = np.where(few, aggressive_keys.argmin(axis=1), median_choice)
+
+        chosen_key = keys[np.arange(len(games)), choice]
+        none = chosen_key >= _NO_KEY
+        lead = last == LEAD
+        choice = np.where(none & ~lead, PASS, choice)
+        # 首出且没有单牌/对子可选（手里只剩王）：出最小的一张牌
+        stuck = none & lead
+        if stuck.any():
+            lowest = (counts[stuck] > 0).argmax(axis=1)
+            choice[stuck] = tables.junk[lowest]
+        return choice
+
+    def step(self) -> int:
+        """所有未结束的对局各走一手，返回仍未结束的对局数"""
+        games = self.active
+        if len(games) == 0:
+            return 0
+        tables = self.tables
+        seats = self.current[games]
+        moves = self.choose(games, seats)
+
+        played = moves != PASS
+        play_games, play_seats, play_moves = games[played], seats[played], moves[played]
+        self.hands[play_games, play_seats] -= tables.counts[play_moves]
+        self.sizes[play_games, play_seats] -= tables.size[play_moves]
+        self.last[play_games] = play_moves
+        self.round_winner[play_games] = play_seats
+        self.passes[play_games] = 0
+        won = self.sizes[play_games, play_seats] == 0
+        self.winner[play_games[won]] = play_seats[won]
+        self.round_count[play_games[won]] += 1
+
+        self.passes[games[~played]] += 1
+        ongoing = games[self.winner[games] < 0]
+        self.current[ongoing] = (self.current[ongoing] - 1) % self.player_count
+        ended = ongoing[self.passes[ongoing] >= self.player_count - 1]
+        if len(ended):
+            self._end_round(ended)
+        return int((self.winner < 0).sum())
+
+    def _draw(self, games, seats):
+        """games中的对局，seats座位从牌堆顶补一张牌"""
+        cards = self.decks[games, self.top[games] - 1]
+        self.hands[games, seats, cards] += 1
+        self.sizes[games, seats] += 1
+        self.top[games] -= 1
+
+    def _end_round(self, games):
+        """轮次结束：补牌，由最后出牌者（无人出牌时为庄家）开始新一轮"""
+        winners = self.round_winner[games]
+        has_deck = self.top[games] > 0
+        someone = has_deck & (winners >= 0)
+        if someone.any():
+            g, s = games[someone], winners[someone]
+            can = self.sizes[g, s] > 0
+            self._draw(g[can], s[can])
+        nobody = games[has_deck & (winners < 0)]
+        for seat in range(self.player_count):
+            if len(nobody) == 0:
+                break
+            can = (self.sizes[nobody, seat] > 0) & (self.top[nobody] > 0)
+            self._draw(nobody[can], np.full(can.sum(), seat))
+        self.last[games] = LEAD
+        self.current[games] = np.where(winners >= 0, winners, self.dealer)
+        self.passes[games] = 0
+        self.round_winner[games] = -1
+        self.round_count[games] += 1
+
+    def run(self) -> BatchResult:
+        """把所有对局打完"""
+        while self.step():
+            pass
+        return BatchResult(self.winner.copy(), self.scores(), self.round_count.copy())
+
+    def scores(self):
+        """每局每个座位的得分，与NewGame._calculate_score一致"""
+        sizes = self.sizes.astype(np.int64)
+        multiplier = np.where(self.winner >= 0, self.tables.multiplier[np.minimum(self.last, NUM_MOVES - 1)], 1)
+        penalty = sizes * np.where(sizes == SPRING_CARDS, 2, 1) * multiplier[:, None]
+        return -penalty
@@ -0,0 +1,285 @@
+"""新玩法游戏 - 开局库
+离线用自我对弈为庄家的第一手和紧接着的第一次压牌选出期望得分最高的出牌：
+
+    开局  键为庄家开局6张牌的牌点直方图
+    压牌  键为下家开局5张牌的牌点直方图 + 庄家第一手（env.LAST_INDEX）
+
+局面先从大量发牌中按出现次数收集（压牌局面里庄家按已选好的开局出牌），每个局面的
+每种候选出牌在同一批随机补全的发牌上各打samples局（之后所有座位都按strategy出牌），
+取该座位平均得分最高者；与strategy本来的选择同分时保留原选择。
+
+库文件是按键排序的定长记录表，打开时只做内存映射，查询是记录上的二分查找，
+AIPlayer可以在第一次查询时才加载。记录：键(uint64) 出牌(int16，ACTIONS下标) 期望得分 原选择的期望得分。
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .card_mask import CARD_RANK, NUM_RANKS, SMALL_JOKER_INDEX, pack_counts, shuffled_int_deck, unpack_counts
+from .env import ACTION_INDEX, ACTIONS, LAST_INDEX
+from .game_state import GameState
+from .move_cache import cached_responses
+from .move_generator import Move
+from .rules import DEALER_CARDS, HAND_CARDS, deal_order, next_seat
+from .simulator import _chunk_results, game_seed, seed_arg
+from .strategy import choose_lead, choose_response, lead_moves
+
+
+MAGIC = b"DYOB"
+FORMAT_VERSION = 1
+LEAD = 0xFF  # 键的低8位：开局记录为LEAD，压牌记录为庄家第一手的LAST_INDEX
+
+_HEADER = struct.Struct("<4sBBHI")  # 标记 版本 人数 每个候选的局数 记录数
+_RECORD = struct.Struct("<Qhff")    # 键 出牌 期望得分 原选择的期望得分
+_KEY = struct.Struct("<Q")
+
+_FULL_RANKS = [rank_idx for rank_idx in range(NUM_RANKS) for _ in range(4 if rank_idx < SMALL_JOKER_INDEX else 1)]
+
+
+def book_key(counts: Sequence[int], last_key: Optional[Tuple[str, int, int]] = None) -> int:
+    """局面 -> 库中的键；last_key为None表示开局"""
+    return pack_counts(counts) << 8 | (LEAD if last_key is None else LAST_INDEX[last_key])
+
+
+class BookEntry(NamedTuple):
+    """库中的一条记录"""
+    move: Optional[Move]  # None表示跳过
+    value: float          # 期望得分
+    baseline: float       # 策略本来的选择的期望得分
+
+
+class OpeningBook:
+    """内存映射的开局库
+
+    构造时不读文件，第一次查询（或访问player_count等属性）时才打开并映射。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._view: Optional[mmap.mmap] = None
+        self._player_count = 0
+        self._samples = 0
+        self._count = 0
+
+    def _open(self):
+        self._file = open(self.path, "rb")
+        self._view = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._player_count, self._samples, self._count = _HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"不是支持的开局库文件: {self.path}")
+
+    @property
+    def player_count(self) -> int:
+        if self._view is None:
+            self._open()
+        return self._player_count
+
+    @property
+    def samples(self) -> int:
+        if self._view is None:
+            self._open()
+        return self._samples
+
+    def __len__(self) -> int:
+        if self._view is None:
+            self._open()
+        return self._count
+
+    def lookup(self, counts: Sequence[int], last_key: Optional[Tuple[str, int, int]] = None) -> Optional[BookEntry]:
+        """查询开局（last_key为None）或对庄家第一手的压牌，库中没有时返回None"""
+        if self._view is None:
+            self._open()
+        if last_key is not None and last_key not in LAST_INDEX:
+            return None
+        key = book_key(counts, last_key)
+        view = self._view
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if _KEY.unpack_from(view, _HEADER.size + mid * _RECORD.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._count:
+            return None
+        found, action, value, baseline = _RECORD.unpack_from(view, _HEADER.size + lo * _RECORD.size)
+        if found != key:
+            return None
+        return BookEntry(ACTIONS[action], value, baseline)
+
+    def entries(self) -> Iterator[Tuple[int, BookEntry]]:
+        """按键的顺序遍历所有记录"""
+        for i in range(len(self)):
+            key, action, value, baseline = _RECORD.unpack_from(self._view, _HEADER.size + i * _RECORD.size)
+            yield key, BookEntry(ACTIONS[action], value, baseline)
+
+    def close(self):
+        if self._view is not None:
+            self._view.close()
+            self._file.close()
+        self._view = self._file = None
+
+
+def write_book(path: str, player_count: int, samples: int, records: Sequence[Tuple[int, int, float, float]]):
+    """把(键, 出牌, 期望得分, 原选择的期望得分)按键排序写成库文件"""
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, player_count, samples, len(records)))
+        for record in sorted(records):
+            f.write(_RECORD.pack(*record))
+    os.replace(temp, path)
+
+
+def _deal(seed: int, player_count: int) -> List[List[int]]:
+    """按种子发牌（与同种子的NewGame相同），返回各座位的牌点直方图"""
+    deck = [CARD_RANK[i] for i in shuffled_int_deck(random.Random(seed))]
+    hands = [[0] * NUM_RANKS for _ in range(player_count)]
+    for seat in deal_order(player_count, 0):
+        hands[seat][deck.pop()] += 1
+    return hands
+
+
+def _sample_state(rng: random.Random, player_count: int, counts: Sequence[int],
+                  opening: Optional[Move]) -> GameState:
+    """随机补全一个局面
+
+    opening为None时庄家持有counts；否则庄家已出opening、轮到持有counts的下家压牌。
+    """
+    responder = 0 if opening is None else next_seat(0, player_count)
+    hands = [[0] * NUM_RANKS for _ in range(player_count)]
+    hands[responder] = list(counts)
+    if opening is not None:
+        for rank_idx in opening.ranks:
+            hands[0][rank_idx] += opening.width
+    rest = list(_FULL_RANKS)
+    for hand in hands:
+        for rank_idx, count in enumerate(hand):
+            for _ in range(count):
+                rest.remove(rank_idx)
+    rng.shuffle(rest)
+    for seat in deal_order(player_count, 0):
+        if seat != responder and sum(hands[seat]) < (DEALER_CARDS if seat == 0 else HAND_CARDS):
+            hands[seat][rest.pop()] += 1
+    state = GameState(hands, rest, 0)
+    if opening is not None:
+        state.apply(opening)
+    return state
+
+
+def _evaluate(player_count: int, strategy: str, samples: int, seed: int,
+              counts: Sequence[int], last_action: int) -> Optional[Tuple[int, int, float, float]]:
+    """一个局面的各候选出牌在相同的samples个补全上的平均得分，返回库记录（只有一种选择时为None）"""
+    opening = None if last_action == LEAD else ACTIONS[last_action]
+    if opening is None:
+        baseline = choose_lead(counts, strategy)
+        candidates: List[Optional[Move]] = list(lead_moves(counts))
+    else:
+        baseline = choose_response(counts, opening.key, strategy)
+        candidates = list(cached_responses(counts, opening.key)) + [None]
+    if len(candidates) < 2:
+        return None
+    candidates.remove(baseline)
+    candidates.insert(0, baseline)  # 同分时保留原选择
+
+    key = pack_counts(counts) << 8 | last_action
+    rng = random.Random(f"{seed}:{key}")
+    strategies = [strategy] * player_count
+    totals = [0] * len(candidates)
+    for _ in range(samples):
+        base = _sample_state(rng, player_count, counts, opening)
+        seat = base.current
+        for i, move in enumerate(candidates):
+            state = base.copy()
+            state.apply(move)
+            totals[i] += state.play_out(strategies)[seat]
+    best = max(range(len(candidates)), key=lambda i: totals[i])
+    return key, ACTION_INDEX[candidates[best]], totals[best] / samples, totals[0] / samples
+
+
+def _evaluate_chunk(player_count: int, strategy: str, samples: int, seed: int,
+                    situations: Sequence[Tuple[int, int]]) -> List[Tuple[int, int, float, float]]:
+    """在工作进程中评估一块局面（(打包的直方图, 庄家第一手)）"""
+    records = []
+    for packed, last_action in situations:
+        record = _evaluate(player_count, strategy, samples, seed, unpack_counts(packed), last_action)
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def build_book(path: str, player_count: int = 3, strategy: str = "smart", games: int = 10000,
+               samples: int = 64, min_visits: int = 1, seed: int = 0, workers: Optional[int] = None,
+               chunk_size: int = 64) -> Dict[str, int]:
+    """用games次发牌收集局面，出现不少于min_visits次的局面逐个评估，写出库文件
+
+    先评估开局；再按库中的开局（库里没有时按strategy）收集并评估第一次压牌。
+    返回各类局面和记录的数量。
+    """
+    if strategy not in ("conservative", "aggressive", "smart"):
+        raise ValueError(f"开局库只支持conservative/aggressive/smart策略: {strategy}")
+    workers = workers or os.cpu_count() or 1
+
+    def evaluate(situations: Counter) -> List[Tuple[int, int, float, float]]:
+        chosen = sorted(situation for situation, visits in situations.items() if visits >= min_visits)
+        tasks = [(player_count, strategy, samples, seed, chosen[start:start + chunk_size])
+                 for start in range(0, len(chosen), chunk_size)]
+        records = []
+        for chunk in _chunk_results(_evaluate_chunk, tasks, workers):
+            records.extend(chunk)
+        return records
+
+    deals = [game_seed(seed, i) for i in range(games)]
+    openings = Counter((pack_counts(_deal(deal, player_count)[0]), LEAD) for deal in deals)
+    opening_records = evaluate(openings)
+    book = {key >> 8: ACTIONS[action] for key, action, _, _ in opening_records}
+
+    responder = next_seat(0, player_count)
+    responses = Counter()
+    for deal in deals:
+        hands = _deal(deal, player_count)
+        opening = book.get(pack_counts(hands[0])) or choose_lead(hands[0], strategy)
+        if opening.key in LAST_INDEX and cached_responses(hands[responder], opening.key):
+            responses[pack_counts(hands[responder]), LAST_INDEX[opening.key]] += 1
+    response_records = evaluate(responses)
+
+    write_book(path, player_count, samples, opening_records + response_records)
+    return {"openings": len(openings), "opening_records": len(opening_records),
+            "responses": len(responses), "response_records": len(response_records)}
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="用自我对弈生成开局库")
+    parser.add_argument("output", help="库文件路径")
+    parser.add_argument("-p", "--players", type=int, default=3, help="玩家数量 (2-6)")
+    parser.add_argument("--strategy", default="smart", help="评估时所有座位使用的AI策略")
+    parser.add_argument("-n", "--games", type=int, default=10000, help="用来收集局面的发牌次数")
+    parser.add_argument("--samples", type=int, default=64, help="每种候选出牌的模拟局数")
+    parser.add_argument("--min-visits", type=int, default=1, help="局面至少出现的次数")
+    parser.add_argument("--seed", type=seed_arg, default=0, help="随机种子")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="进程数（默认全部核心）")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts = build_book(args.output, args.players, args.strategy, args.games, args.samples,
+                        args.min_visits, args.seed, args.workers)
+    book = OpeningBook(args.output)
+    gains = [entry.value - entry.baseline for _, entry in book.entries()]
+    print(f"开局局面 {counts['openings']} 个，写入 {counts['opening_records']} 条；"
+          f"压牌局面 {counts['responses']} 个，写入 {counts['response_records']} 条；"
+          f"用时 {time.perf_counter() - start:.1f} 秒")
+    if gains:
+        print(f"与{args.strategy}原选择相比，平均每条记录的期望得分提高 {sum(gains) / len(gains):.3f}")
+    book.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@
 
 from enum import Enum
 import random
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 
 class Suit(Enum):
@@ -67,11 +67,47 @@ class Rank(Enum):
 
 
 class Card:
-    """扑克牌类"""
+    """扑克牌类
+
+    享元：同一花色和牌点只有一个实例，Card(suit, rank)返回预先建好的对象，
+    创建后不可修改。排序键（牌点）、哈希和整数编号在建立时算好。
+    """
+    
+    __slots__ = ("suit", "rank", "rank_value", "index", "_hash")
+    _instances: Dict[Tuple[Suit, Rank], "Card"] = {}
+    
+    def __new__(cls, suit: Suit, rank: Rank):
+        card = cls._instances.get((suit, rank))
+        if card is None:
+            raise ValueError(f"无效的牌: {suit} {rank}")
+        return card
+    
+    @classmethod
+    def _create(cls, suit: Suit, rank: Rank, index: int) -> "Card":
+        card = object.__new__(cls)
+        set_slot = object.__setattr__
+        set_slot(card, "suit", suit)
+        set_slot(card, "rank", rank)
+        set_slot(card, "rank_value", rank.rank_value)
+        set_slot(card, "index", index)  # 与create_deck()顺序一致的编号，王不区分花色
+        set_slot(card, "_hash", hash((suit, rank)))
+        cls._instances[(suit, rank)] = card
+        return card
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Card不可修改")
+    
+    def __delattr__(self, name):
+        raise AttributeError("Card不可修改")
     
-    def __init__(self, suit: Suit, rank: Rank):
-        self.suit = suit
-        self.rank = rank
+    def __reduce__(self):
+        return (Card, (self.suit, self.rank))
+    
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo):
+        return self
     
     def __str__(self):
         if self.rank in [Rank.SMALL_JOKER, Rank.BIG_JOKER]:
@@ -84,43 +120,43 @@ class Card:
     def __lt__(self, other):
         if not isinstance(other, Card):
             return NotImplemented
-        return self.rank < other.rank
+        return self.rank_value < other.rank_value
     
     def __le__(self, other):
         if not isinstance(other, Card):
             return NotImplemented
-        return self.rank <= other.rank
+        return self.rank_value <= other.rank_value
     
     def __gt__(self, other):
         if not isinstance(other, Card):
             return NotImplemented
-        return self.rank > other.rank
+        return self.rank_value > other.rank_value
     
     def __ge__(self, other):
         if not isinstance(other, Card):
             return NotImplemented
-        return self.rank >= other.rank
+        return self.rank_value >= other.rank_value
     
     def __eq__(self, other):
         if not isinstance(other, Card):
             return NotImplemented
-        return self.rank == other.rank and self.suit == other.suit
+        return self is other
     
     def __hash__(self):
-        return hash((self.suit, self.rank))
+        return self._hash
     
     def can_be_single(self):
         """判断是否可以单出"""
-        return self.rank.can_be_single()
+        return self.rank_value < 16
     
     def can_be_in_straight(self):
         """判断是否可以参与顺子"""
-        return self.rank.can_be_in_straight()
+        return self.rank_value < 15
     
     @property
     def is_joker(self):
         """是否为王"""
-        return self.rank in [Rank.SMALL_JOKER, Rank.BIG_JOKER]
+        return self.rank_value >= 16
     
     @property
     def is_two(self):
@@ -128,6 +164,20 @@ class Card:
         return self.rank == Rank.TWO
 
 
+def _create_cards():
+    """建立所有花色和牌点组合的实例（王有四种花色写法，编号相同）"""
+    for i, suit in enumerate(Suit):
+        for rank in Rank:
+            if rank.rank_value >= 16:
+                index = 52 if rank == Rank.SMALL_JOKER else 53
+            else:
+                index = i * 13 + rank.rank_value - 3
+            Card._create(suit, rank, index)
+
+
+_create_cards()
+
+
 class CardType(Enum):
     """牌型枚举"""
     SINGLE = "单张"
@@ -205,7 +255,7 @@ class CardPattern:
 
 
 def create_deck() -> List[Card]:
-    """创建一副54张牌"""
+    """创建一副54张牌（每次返回新的列表，牌是共享的实例）"""
     deck = []
     
     # 添加普通牌（52张）
@@ -0,0 +1,121 @@
+"""新玩法游戏 - 牌的整数/位掩码编码
+热路径使用的紧凑表示：每张牌是0..53的整数，手牌是一个64位掩码，
+再配合15格的牌点计数向量。Card对象只在显示层构建。
+"""
+
+import random
+from typing import Iterable, List, Tuple
+from .card import Card, Rank, create_deck
+
+
+NUM_CARDS = 54   # 一副牌的张数
+NUM_RANKS = 15   # 牌点数量（3..2、小王、大王）
+
+# 牌点按rank_value升序排列，牌点索引 = rank_value - 3
+RANKS: Tuple[Rank, ...] = tuple(sorted(Rank, key=lambda r: r.rank_value))
+SMALL_JOKER_INDEX = 13  # 小王的牌点索引
+BIG_JOKER_INDEX = 14    # 大王的牌点索引
+TWO_INDEX = 12          # 2的牌点索引
+
+# 牌的整数编号与create_deck()的顺序一致：create_deck()[i] 对应编号 i
+_DECK: Tuple[Card, ...] = tuple(create_deck())
+
+# 编号 -> 牌点索引
+CARD_RANK: Tuple[int, ...] = tuple(card.rank.rank_value - 3 for card in _DECK)
+
+# 牌点索引 -> 该牌点所有牌的掩码
+RANK_MASKS: Tuple[int, ...] = tuple(
+    sum(1 << i for i, r in enumerate(CARD_RANK) if r == rank_idx)
+    for rank_idx in range(NUM_RANKS)
+)
+
+FULL_DECK_MASK = (1 << NUM_CARDS) - 1
+COUNT_BITS = 3  # 打包牌点计数向量时每个牌点占的位数
+
+
+def rank_index(rank: Rank) -> int:
+    """牌点 -> 牌点索引（0..14）"""
+    return rank.rank_value - 3
+
+
+def card_to_index(card: Card) -> int:
+    """牌 -> 整数编号（王的花色不参与编码）"""
+    return card.index
+
+
+def index_to_card(index: int) -> Card:
+    """整数编号 -> 牌（共享实例）"""
+    return _DECK[index]
+
+
+def create_int_deck() -> List[int]:
+    """创建一副整数编码的牌，顺序与create_deck()一致"""
+    return list(range(NUM_CARDS))
+
+
+def shuffled_int_deck(rng: random.Random) -> List[int]:
+    """用给定的随机数生成器洗一副整数编码的牌"""
+    deck = create_int_deck()
+    rng.shuffle(deck)
+    return deck
+
+
+def cards_to_mask(cards: Iterable[Card]) -> int:
+    """牌组 -> 掩码"""
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.index
+    return mask
+
+
+def mask_to_indices(mask: int) -> List[int]:
+    """掩码 -> 编号列表（按编号升序）"""
+    indices = []
+    while mask:
+        low = mask & -mask
+        indices.append(low.bit_length() - 1)
+        mask ^= low
+    return indices
+
+
+def mask_to_cards(mask: int) -> List[Card]:
+    """掩码 -> 牌组（按牌点排序，用于显示）"""
+    indices = sorted(mask_to_indices(mask), key=lambda i: (CARD_RANK[i], i))
+    return [index_to_card(i) for i in indices]
+
+
+def mask_size(mask: int) -> int:
+    """掩码中的牌数"""
+    return bin(mask).count("1")
+
+
+def mask_rank_counts(mask: int) -> List[int]:
+    """掩码 -> 15格牌点计数向量"""
+    counts = [0] * NUM_RANKS
+    while mask:
+        low = mask & -mask
+        counts[CARD_RANK[low.bit_length() - 1]] += 1
+        mask ^= low
+    return counts
+
+
+def rank_counts(cards: Iterable[Card]) -> List[int]:
+    """牌组 -> 15格牌点计数向量"""
+    counts = [0] * NUM_RANKS
+    for card in cards:
+        counts[card.rank_value - 3] += 1
+    return counts
+
+
+def pack_counts(counts: Iterable[int]) -> int:
+    """牌点计数向量 -> 整数（每个牌点COUNT_BITS位，共45位）"""
+    packed = 0
+    for rank_idx, count in enumerate(counts):
+        packed |= count << (COUNT_BITS * rank_idx)
+    return packed
+
+
+def unpack_counts(packed: int) -> List[int]:
+    """pack_counts的逆变换"""
+    mask = (1 << COUNT_BITS) - 1
+    return [(packed >> (COUNT_BITS * rank_idx)) & mask for rank_idx in range(NUM_RANKS)]
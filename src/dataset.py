@@ -0,0 +1,312 @@
+"""新玩法游戏 - 对局轨迹的列式数据集导出
+把大量AI对局的每一次出牌决策记成一行（局面, 合法出牌, 实际出牌, 最终得分），
+按列写成NumPy分片，供离线训练策略。每局的发牌与同种子的NewGame（simulator.play_single_game）相同，
+用GameState按AIPlayer的策略打完，结果也与NewGame一致。
+
+每行的列（编码都是紧凑的整数）：
+
+    game     uint32  第几局（种子为game_seed(seed, game)）
+    seat     int8    出牌的座位
+    hand     uint64  自己的牌点直方图，每个牌点3位（card_mask.pack_counts/unpack_hands）
+    sizes    int8×6  各家手牌数，从自己开始按出牌顺序排列，不足补0
+    last     int16   上家出牌（env.LAST_INDEX，ACTIONS中第一个同键出牌的下标），-1表示首出
+    leader   int8    上家相对自己的位置，首出时为-1
+    passes   int8    本轮连续跳过人数
+    deck     int8    牌堆张数
+    action   int16   实际出牌（env.ACTIONS的下标，PASS_ACTION为跳过）
+    score    int16   该座位本局的最终得分
+
+合法出牌是变长的，按CSR存成两列：legal（int16，ACTIONS下标）和legal_offsets
+（int64，每个分片rows+1个，第i行的合法出牌为legal[offsets[i]:offsets[i+1]]）。
+
+数据集是一个目录：manifest.json记录列、分片和生成参数；每个分片默认是一个压缩的.npz，
+compress=False时每列一个.npy，读取时按内存映射打开。写入和读取都按分片流式进行，
+内存占用只与分片大小有关，与局数无关。需要安装numpy（pip install dengyan-poker[fast]）。
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from .card_mask import CARD_RANK, COUNT_BITS, NUM_RANKS, pack_counts, shuffled_int_deck
+from .env import ACTION_INDEX, LAST_INDEX, NUM_ACTIONS, PASS_ACTION
+from .game_state import GameState, MAX_PLAYERS
+from .rules import deal_order
+from .simulator import _chunk_results, game_seed, lineup, seed_arg
+from .strategy import choose_move
+
+try:
+    import numpy as np
+except ImportError:  # numpy是可选依赖
+    np = None
+
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+# 列名 -> (array类型码, numpy类型, 每行的宽度)；legal和legal_offsets单独处理
+COLUMNS = {
+    "game": ("I", "uint32", 1),
+    "seat": ("b", "int8", 1),
+    "hand": ("Q", "uint64", 1),
+    "sizes": ("b", "int8", MAX_PLAYERS),
+    "last": ("h", "int16", 1),
+    "leader": ("b", "int8", 1),
+    "passes": ("b", "int8", 1),
+    "deck": ("b", "int8", 1),
+    "action": ("h", "int16", 1),
+    "score": ("h", "int16", 1),
+}
+LEGAL_COLUMNS = ("legal", "legal_offsets")
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("数据集导出需要numpy：pip install dengyan-poker[fast]")
+
+
+def unpack_hands(packed: "np.ndarray") -> "np.ndarray":
+    """hand列 -> (行数 × 15)的牌点直方图"""
+    shifts = np.arange(NUM_RANKS, dtype=np.uint64) * np.uint64(COUNT_BITS)
+    return ((np.asarray(packed, dtype=np.uint64)[:, None] >> shifts) & np.uint64(7)).astype(np.int8)
+
+
+class _Rows:
+    """一批行，各列用array缓存（紧凑、可以跨进程传递）"""
+
+    def __init__(self):
+        self.columns = {name: array(code) for name, (code, _, _) in COLUMNS.items()}
+        self.legal = array("h")
+        self.legal_counts = array("H")
+        self.games = 0
+
+    def __len__(self) -> int:
+        return len(self.columns["game"])
+
+    def extend(self, other: "_Rows"):
+        for name, column in self.columns.items():
+            column.extend(other.columns[name])
+        self.legal.extend(other.legal)
+        self.legal_counts.extend(other.legal_counts)
+        self.games += other.games
+
+
+def record_game(rows: _Rows, player_count: int, strategies: Sequence[str], seed: int, game_index: int):
+    """打一局（发牌与同种子的NewGame相同），把每一次出牌决策追加到rows"""
+    rng = random.Random(game_seed(seed, game_index))
+    deck = [CARD_RANK[i] for i in shuffled_int_deck(rng)]
+    hands = [[0] * NUM_RANKS for _ in range(player_count)]
+    for seat in deal_order(player_count, 0):
+        hands[seat][deck.pop()] += 1
+    state = GameState(hands, deck, 0)
+
+    columns = rows.columns
+    start = len(rows)
+    seats = columns["seat"]
+    padding = [0] * (MAX_PLAYERS - player_count)
+    while not state.is_terminal:
+        seat = state.current
+        legal = [ACTION_INDEX[move] for move in state.legal_moves()]
+        move = choose_move(state.hands[seat], state.last, strategies[seat])
+        columns["game"].append(game_index)
+        seats.append(seat)
+        columns["hand"].append(pack_counts(state.hands[seat]))
+        columns["sizes"].extend(state.sizes[seat:] + state.sizes[:seat] + padding)
+        if state.last is None:
+            columns["last"].append(-1)
+            columns["leader"].append(-1)
+        else:
+            columns["last"].append(LAST_INDEX[state.last])
+            columns["leader"].append((state.round_winner - seat) % player_count)
+        columns["passes"].append(state.passes)
+        columns["deck"].append(state.deck_size)
+        columns["action"].append(ACTION_INDEX[move])
+        rows.legal.extend(legal)
+        rows.legal_counts.append(len(legal))
+        state.apply(move)
+
+    scores = state.scores()
+    columns["score"].extend(scores[seats[i]] for i in range(start, len(rows)))
+    rows.games += 1
+
+
+def _record_chunk(player_count: int, strategies: Sequence[str], seed: int, start: int, stop: int) -> _Rows:
+    """在工作进程中记录一块对局"""
+    rows = _Rows()
+    for game_index in range(start, stop):
+        record_game(rows, player_count, strategies, seed, game_index)
+    return rows
+
+
+class DatasetWriter:
+    """按分片写数据集
+
+    add追加一批行，缓存的行数达到shard_rows时写出一个分片（分片只在批次之间切开，
+    大小约为shard_rows）；close写出剩余的行和manifest.json。
+    """
+
+    def __init__(self, path: str, compress: bool = True, shard_rows: int = 1 << 20,
+                 metadata: Optional[dict] = None):
+        _require_numpy()
+        self.path = path
+        self.compress = compress
+        self.shard_rows = shard_rows
+        self.metadata = dict(metadata or {})
+        self.shards: List[dict] = []
+        self.rows = 0
+        self.games = 0
+        self._buffer = _Rows()
+        os.makedirs(path, exist_ok=True)
+
+    def add(self, rows: _Rows):
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.shard_rows:
+            self.flush()
+
+    def flush(self):
+        """把缓存的行写成一个分片"""
+        buffer = self._buffer
+        count = len(buffer)
+        if not count:
+            return
+        arrays = {}
+        for name, (_, dtype, width) in COLUMNS.items():
+            data = np.frombuffer(buffer.columns[name], dtype=dtype)
+            arrays[name] = data.reshape(count, width) if width > 1 else data
+        arrays["legal"] = np.frombuffer(buffer.legal, dtype=np.int16)
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.frombuffer(buffer.legal_counts, dtype=np.uint16), out=offsets[1:])
+        arrays["legal_offsets"] = offsets
+
+        name = f"shard-{len(self.shards):05d}"
+        if self.compress:
+            np.savez_compressed(os.path.join(self.path, name + ".npz"), **arrays)
+        else:
+            for column, data in arrays.items():
+                np.save(os.path.join(self.path, f"{name}.{column}.npy"), data)
+        self.shards.append({"name": name, "rows": count, "games": buffer.games})
+        self.rows += count
+        self.games += buffer.games
+        self._buffer = _Rows()
+
+    def close(self) -> dict:
+        """写出剩余的行和manifest.json，返回manifest"""
+        self.flush()
+        manifest = {
+            "version": FORMAT_VERSION,
+            "format": "npz" if self.compress else "npy",
+            "rows": self.rows,
+            "games": self.games,
+            "num_actions": NUM_ACTIONS,
+            "pass_action": PASS_ACTION,
+            "columns": {name: {"dtype": dtype, "width": width} for name, (_, dtype, width) in COLUMNS.items()},
+            "shards": self.shards,
+            "metadata": self.metadata,
+        }
+        temp = os.path.join(self.path, MANIFEST + ".tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(temp, os.path.join(self.path, MANIFEST))
+        return manifest
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_games(path: str, player_count: int, strategies: Sequence[str], games: int, seed: int = 0,
+                 workers: Optional[int] = None, chunk_size: int = 500, shard_rows: int = 1 << 20,
+                 compress: bool = True) -> dict:
+    """模拟games局AI对战并导出为数据集，返回manifest
+
+    对局分块在进程池中记录，同时最多2×workers块在途，写入端只缓存一个分片，
+    内存占用与局数无关。结果只取决于参数和种子，与进程数、分块大小无关。
+    """
+    _require_numpy()
+    strategies = lineup(player_count, strategies)
+    if "mcts" in strategies:
+        raise ValueError("数据集导出只支持conservative/aggressive/smart策略")
+    workers = workers or os.cpu_count() or 1
+    tasks = [(player_count, strategies, seed, start, min(start + chunk_size, games))
+             for start in range(0, games, chunk_size)]
+    metadata = {"player_count": player_count, "strategies": strategies, "seed": seed}
+    with DatasetWriter(path, compress, shard_rows, metadata) as writer:
+        for rows in _chunk_results(_record_chunk, tasks, workers):
+            writer.add(rows)
+    return read_manifest(path)
+
+
+def read_manifest(path: str) -> dict:
+    with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"不支持的数据集版本: {manifest.get('version')}")
+    return manifest
+
+
+def _open_shard(path: str, manifest: dict, shard: dict, names: Sequence[str]) -> Dict[str, "np.ndarray"]:
+    """打开一个分片：.npz按列解压，.npy按内存映射打开"""
+    if manifest["format"] == "npz":
+        with np.load(os.path.join(path, shard["name"] + ".npz")) as data:
+            return {name: data[name] for name in names}
+    return {name: np.load(os.path.join(path, f"{shard['name']}.{name}.npy"), mmap_mode="r") for name in names}
+
+
+def iter_batches(path: str, batch_rows: int = 65536,
+                 columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, "np.ndarray"]]:
+    """逐批读取数据集，每批最多batch_rows行，产出列名 -> 数组
+
+    columns为要读取的列（默认全部）；包含legal时，批内的legal_offsets从0开始。
+    一次只打开一个分片，.npy分片按内存映射读取，只有用到的部分会进入内存。
+    """
+    _require_numpy()
+    manifest = read_manifest(path)
+    names = list(columns) if columns is not None else list(manifest["columns"]) + list(LEGAL_COLUMNS)
+    for name in names:
+        if name not in manifest["columns"] and name not in LEGAL_COLUMNS:
+            raise ValueError(f"未知的列: {name}")
+    wants_legal = any(name in LEGAL_COLUMNS for name in names)
+    plain = [name for name in names if name not in LEGAL_COLUMNS]
+    for shard in manifest["shards"]:
+        data = _open_shard(path, manifest, shard, plain + (list(LEGAL_COLUMNS) if wants_legal else []))
+        for start in range(0, shard["rows"], batch_rows):
+            stop = min(start + batch_rows, shard["rows"])
+            batch = {name: np.asarray(data[name][start:stop]) for name in plain}
+            if wants_legal:
+                offsets = np.asarray(data["legal_offsets"][start:stop + 1])
+                batch["legal"] = np.asarray(data["legal"][offsets[0]:offsets[-1]])
+                batch["legal_offsets"] = offsets - offsets[0]
+            yield batch
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="导出AI对局轨迹数据集")
+    parser.add_argument("output", help="输出目录")
+    parser.add_argument("-p", "--players", type=int, default=3, help="玩家数量 (2-6)")
+    parser.add_argument("-s", "--strategies", default="conservative,aggressive,smart",
+                        help="按座位排列的AI策略，逗号分隔")
+    parser.add_argument("-n", "--games", type=int, default=1000, help="对局数")
+    parser.add_argument("--seed", type=seed_arg, default=0, help="随机种子")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="进程数（默认全部核心）")
+    parser.add_argument("--chunk-size", type=int, default=500, help="每个任务包含的对局数")
+    parser.add_argument("--shard-rows", type=int, default=1 << 20, help="每个分片约多少行")
+    parser.add_argument("--no-compress", action="store_true", help="每列写成可内存映射的.npy")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    manifest = export_games(args.output, args.players, args.strategies.split(","), args.games, args.seed,
+                            args.workers, args.chunk_size, args.shard_rows, not args.no_compress)
+    elapsed = time.perf_counter() - start
+    print(f"共 {manifest['games']} 局、{manifest['rows']} 行，{len(manifest['shards'])} 个分片，"
+          f"用时 {elapsed:.1f} 秒（{manifest['games'] / elapsed:.0f} 局/秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""新玩法游戏 - 残局精确求解
+牌堆抽完后不再有随机因素，已知各家手牌时残局是完全信息博弈。
+多人局按"偏执"假设归约成两方零和：求解的座位最大化自己的得分，
+其余座位联合最小化它，在GameState上用apply/undo做带置换表的alpha-beta搜索。
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+from .game_state import GameState
+from .move_generator import Move
+
+
+EXACT, LOWER, UPPER = 0, 1, 2  # 置换表中数值的类型：精确值、下界、上界
+
+
+class SearchLimitExceeded(Exception):
+    """搜索节点数超过上限"""
+
+
+class TranspositionTable:
+    """有容量上限的置换表，满了以后淘汰最久未使用的条目"""
+
+    def __init__(self, max_entries: int = 200000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[int, int]]" = OrderedDict()
+        self.probes = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[int, int]]:
+        """查表，返回(数值, 类型)"""
+        self.probes += 1
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: Hashable, value: int, flag: int):
+        """写入一个条目"""
+        entries = self._entries
+        entries[key] = (value, flag)
+        entries.move_to_end(key)
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def state_key(state: GameState, seat: int) -> Hashable:
+    """置换表的键：求解的座位加上GameState.key()（手牌的Zobrist哈希和本轮状态）"""
+    return (seat,) + state.key()
+
+
+def _move_order(move: Optional[Move]) -> int:
+    """张数多的先搜，跳过最后"""
+    return -move.size if move is not None else 0
+
+
+class EndgameSolver:
+    """残局求解器（牌堆必须为空）
+
+    max_nodes限制单次求解的节点数，超过时抛出SearchLimitExceeded；
+    置换表在多次求解之间保留。
+    """
+
+    def __init__(self, max_entries: int = 200000, max_nodes: Optional[int] = 50000):
+        self.table = TranspositionTable(max_entries)
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.elapsed = 0.0
+        self._seat = 0
+        self._limit = 0
+
+    def best_move(self, state: GameState) -> Tuple[Optional[Move], int]:
+        """当前座位的最佳出牌及其得分"""
+        values = self.solve(state)
+        move = max(values, key=values.get)
+        return move, values[move]
+
+    def solve(self, state: GameState) -> Dict[Optional[Move], int]:
+        """当前座位每种出牌的精确得分（在最优应对下）"""
+        if state.deck_size:
+            raise ValueError("牌堆不为空，不能精确求解")
+        self._seat = state.current
+        self._limit = self.nodes + self.max_nodes if self.max_nodes is not None else None
+        start = time.perf_counter()
+        depth = state.depth
+        try:
+            values = {}
+            for move in sorted(state.legal_moves(), key=_move_order):
+                state.apply(move)
+                values[move] = self._search(state, -(1 << 30), 1 << 30)
+                state.undo()
+            return values
+        finally:
+            while state.depth > depth:  # 超出节点上限时回退到求解前的局面
+                state.undo()
+            self.elapsed += time.perf_counter() - start
+
+    def _search(self, state: GameState, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if self._limit is not None and self.nodes > self._limit:
+            raise SearchLimitExceeded()
+        seat = self._seat
+        if state.winner >= 0:
+            return state.scores()[seat]
+
+        key = state_key(state, seat)
+        entry = self.table.get(key)
+        if entry is not None:
+            value, flag = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        alpha0, beta0 = alpha, beta
+        maximizing = state.current == seat
+        best = -(1 << 30) if maximizing else 1 << 30
+        for move in sorted(state.legal_moves(), key=_move_order):
+            state.apply(move)
+            value = self._search(state, alpha, beta)
+            state.undo()
+            if maximizing:
+                if value > best:
+                    best = value
+                alpha = max(alpha, value)
+            else:
+                if value < best:
+                    best = value
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if best <= alpha0:
+            flag = UPPER
+        elif best >= beta0:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, best, flag)
+        return best
+
+    def stats(self) -> Dict[str, float]:
+        """累计的搜索统计"""
+        return {
+            "nodes": self.nodes,
+            "elapsed": self.elapsed,
+            "nodes_per_second": self.nodes / self.elapsed if self.elapsed > 0 else 0.0,
+            "table_size": len(self.table),
+            "hit_rate": self.table.hit_rate,
+            "evictions": self.table.evictions,
+        }
@@ -0,0 +1,255 @@
+"""新玩法游戏 - 强化学习环境
+Gym风格的reset/step接口：学习的策略坐一个座位，其余座位由AIPlayer的策略出牌。
+对局用GameState推进（与NewGame._play_round规则一致、发牌方式相同），
+观察是定长的整数向量，动作是ACTIONS的下标，并给出合法动作掩码。
+
+VectorEnv把N个环境分到若干工作进程中同步推进。
+需要安装numpy（pip install dengyan-poker[fast]）。
+"""
+
+import multiprocessing
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+from .card_mask import CARD_RANK, NUM_RANKS, SMALL_JOKER_INDEX, BIG_JOKER_INDEX, shuffled_int_deck
+from .game_state import GameState
+from .move_generator import Move, generate_moves
+from .pattern_analyzer import PATTERN_TYPE_IDS, PatternType
+from .rules import deal_order
+
+try:
+    import numpy as np
+except ImportError:  # numpy是可选依赖
+    np = None
+
+
+_FULL_COUNTS = [4] * SMALL_JOKER_INDEX + [1, 1]
+
+# 动作：所有出牌（generate_moves的顺序）、只能在无牌可出时首出的单张王，最后是跳过
+ACTIONS: List[Optional[Move]] = generate_moves(_FULL_COUNTS) + [
+    Move(PatternType.INVALID, SMALL_JOKER_INDEX, 1, 1),
+    Move(PatternType.INVALID, BIG_JOKER_INDEX, 1, 1),
+    None,
+]
+ACTION_INDEX: Dict[Optional[Move], int] = {move: i for i, move in enumerate(ACTIONS)}
+NUM_ACTIONS = len(ACTIONS)
+PASS_ACTION = NUM_ACTIONS - 1
+
+# 上家出牌的键 -> ACTIONS中第一个同键出牌的下标（压牌只看键）
+LAST_INDEX: Dict[Tuple[str, int, int], int] = {}
+for _index, _move in enumerate(ACTIONS):
+    if _move is not None:
+        LAST_INDEX.setdefault(_move.key, _index)
+del _index, _move
+
+MAX_OPPONENTS = 5
+# 观察向量：自己的牌点直方图(15) + 对手手牌数(5，按出牌顺序，不足补0)
+#          + 上家出牌(是否首出, 牌型编号, 主牌点, 张数, 上家相对位置)
+#          + 本轮连续跳过人数 + 牌堆张数
+OBS_SIZE = NUM_RANKS + MAX_OPPONENTS + 5 + 2
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("强化学习环境需要numpy：pip install dengyan-poker[fast]")
+
+
+class DengYanEnv:
+    """单个环境
+
+    reset(seed) -> (观察, info)；step(动作) -> (观察, 奖励, 结束, 截断, info)。
+    info["action_mask"]为合法动作掩码；奖励只在对局结束时给出，等于该座位的得分。
+    """
+
+    def __init__(self, player_count: int = 3, seat: int = 0, opponents: Sequence[str] = ("smart",)):
+        _require_numpy()
+        if not 2 <= player_count <= 6:
+            raise ValueError("玩家数量必须在2-6之间")
+        if not 0 <= seat < player_count:
+            raise ValueError(f"座位必须在0-{player_count - 1}之间")
+        self.player_count = player_count
+        self.seat = seat
+        others = [s for s in range(player_count) if s != seat]
+        self.strategies = {s: opponents[i % len(opponents)] for i, s in enumerate(others)}
+        self.rng = random.Random()
+        self.state: Optional[GameState] = None
+
+    def reset(self, seed: Optional[int] = None) -> Tuple["np.ndarray", dict]:
+        """重新发牌，推进到轮到自己出牌
+
+        对手在自己出第一手之前就出完的牌局没有可学的决策，直接用同一个随机数生成器重新发牌。
+        """
+        if seed is not None:
+            self.rng = random.Random(seed)
+        while True:
+            deck = [CARD_RANK[i] for i in shuffled_int_deck(self.rng)]
+            hands = [[0] * NUM_RANKS for _ in range(self.player_count)]
+            dealer = 0
+            for seat in deal_order(self.player_count, dealer):
+                hands[seat][deck.pop()] += 1
+            self.state = GameState(hands, deck, dealer)
+            self._advance()
+            if not self.state.is_terminal:
+                return self.observation(), self._info()
+
+    def step(self, action: int) -> Tuple["np.ndarray", float, bool, bool, dict]:
+        """自己出牌（ACTIONS的下标），推进到下一次轮到自己或对局结束"""
+        state = self.state
+        if state is None or state.is_terminal:
+            raise RuntimeError("对局已结束，请先调用reset")
+        move = ACTIONS[action]
+        if action not in self._legal_indices():
+            raise ValueError(f"非法动作: {move}")
+        state.apply(move)
+        self._advance()
+        terminated = state.is_terminal
+        reward = float(state.scores()[self.seat]) if terminated else 0.0
+        return self.observation(), reward, terminated, False, self._info()
+
+    def _advance(self):
+        """对手按各自策略出牌，直到轮到自己或对局结束"""
+        state = self.state
+        while not state.is_terminal and state.current != self.seat:
+            state.apply(state.policy_move(self.strategies[state.current]))
+
+    def _legal_indices(self) -> List[int]:
+        if self.state.is_terminal:
+            return []
+        return [ACTION_INDEX[move] for move in self.state.legal_moves()]
+
+    def action_mask(self) -> "np.ndarray":
+        """合法动作掩码"""
+        mask = np.zeros(NUM_ACTIONS, dtype=bool)
+        mask[self._legal_indices()] = True
+        return mask
+
+    def observation(self) -> "np.ndarray":
+        """定长观察向量"""
+        state = self.state
+        n = self.player_count
+        obs = np.zeros(OBS_SIZE, dtype=np.int16)
+        obs[:NUM_RANKS] = state.hands[self.seat]
+        for k in range(1, n):
+            obs[NUM_RANKS + k - 1] = state.sizes[(self.seat - k) % n]
+        offset = NUM_RANKS + MAX_OPPONENTS
+        if state.last is None:
+            obs[offset] = 1
+        else:
+            pattern_type, main, size = state.last
+            obs[offset + 1] = PATTERN_TYPE_IDS[pattern_type]
+            obs[offset + 2] = main
+            obs[offset + 3] = size
+            obs[offset + 4] = (self.seat - state.round_winner) % n
+        obs[offset + 5] = state.passes
+        obs[offset + 6] = state.deck_size
+        return obs
+
+    def _info(self) -> dict:
+        info = {"action_mask": self.action_mask()}
+        if self.state.is_terminal:
+            info["scores"] = self.state.scores()
+            info["winner"] = self.state.winner
+        return info
+
+
+def _worker(connection, env_kwargs: dict, count: int):
+    """工作进程：持有count个环境，按命令reset/step"""
+    envs = [DengYanEnv(**env_kwargs) for _ in range(count)]
+    try:
+        while True:
+            command, payload = connection.recv()
+            if command == "reset":
+                connection.send([env.reset(seed) for env, seed in zip(envs, payload)])
+            elif command == "step":
+                connection.send([_step_autoreset(env, action) for env, action in zip(envs, payload)])
+            elif command == "close":
+                break
+    finally:
+        connection.close()
+
+
+def _step_autoreset(env: DengYanEnv, action: int):
+    """走一步；对局结束时自动开新局，最后的观察放在info["final_observation"]"""
+    obs, reward, terminated, truncated, info = env.step(action)
+    if terminated or truncated:
+        final_obs, final_info = obs, info
+        obs, info = env.reset()
+        info["final_observation"] = final_obs
+        info["final_info"] = final_info
+    return obs, reward, terminated, truncated, info
+
+
+class VectorEnv:
+    """N个环境的向量化封装
+
+    workers为工作进程数（默认min(N, CPU核数)），为0时在当前进程中运行。
+    对局结束的环境自动开始新一局。
+    """
+
+    def __init__(self, num_envs: int, workers: Optional[int] = None, **env_kwargs):
+        _require_numpy()
+        self.num_envs = num_envs
+        if workers is None:
+            workers = min(num_envs, multiprocessing.cpu_count())
+        self.workers = workers
+        self._envs: List[DengYanEnv] = []
+        self._connections = []
+        self._processes = []
+        self._slices: List[Tuple[int, int]] = []
+        if workers == 0:
+            self._envs = [DengYanEnv(**env_kwargs) for _ in range(num_envs)]
+            return
+        context = multiprocessing.get_context()
+        for w in range(workers):
+            start, stop = num_envs * w // workers, num_envs * (w + 1) // workers
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, env_kwargs, stop - start), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+            self._slices.append((start, stop))
+
+    def _broadcast(self, command: str, payload: list) -> list:
+        if not self._connections:
+            if command == "reset":
+                return [env.reset(seed) for env, seed in zip(self._envs, payload)]
+            return [_step_autoreset(env, action) for env, action in zip(self._envs, payload)]
+        for connection, (start, stop) in zip(self._connections, self._slices):
+            connection.send((command, payload[start:stop]))
+        results = []
+        for connection in self._connections:
+            results.extend(connection.recv())
+        return results
+
+    def reset(self, seed: Optional[int] = None) -> Tuple["np.ndarray", "np.ndarray"]:
+        """重置所有环境，返回(观察, 合法动作掩码)"""
+        seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        results = self._broadcast("reset", seeds)
+        return (np.stack([obs for obs, _ in results]),
+                np.stack([info["action_mask"] for _, info in results]))
+
+    def step(self, actions: Sequence[int]):
+        """所有环境各走一步，返回(观察, 奖励, 结束, 截断, 合法动作掩码, infos)"""
+        results = self._broadcast("step", [int(a) for a in actions])
+        obs = np.stack([r[0] for r in results])
+        rewards = np.array([r[1] for r in results], dtype=np.float32)
+        terminated = np.array([r[2] for r in results])
+        truncated = np.array([r[3] for r in results])
+        infos = [r[4] for r in results]
+        masks = np.stack([info["action_mask"] for info in infos])
+        return obs, rewards, terminated, truncated, masks, infos
+
+    def close(self):
+        """关闭工作进程"""
+        for connection in self._connections:
+            connection.send(("close", None))
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections, self._processes = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
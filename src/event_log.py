@@ -0,0 +1,289 @@
+"""新玩法游戏 - 二进制事件日志与重放
+每局对局记成一串定长的二进制记录，只追加写入，可以边打边写到文件：
+
+    GAME    标记 版本 种子 人数 庄家 各家手牌掩码 牌堆张数 牌堆（牌堆顶在末尾）
+    PLAY    标记 座位 出牌掩码
+    PASS    标记 座位
+    REFILL  标记 座位 牌
+    END     标记 胜者 轮数 各家得分
+
+牌都用card_mask的整数编号，掩码占7个字节。一个文件里可以连续写很多局，
+读取时逐块解析，末尾不完整的对局也能读出来（没有END记录）。
+重放器按记录重建任意一步之后的局面。
+"""
+
+import argparse
+import struct
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from .card_mask import card_to_index, cards_to_mask, mask_size, mask_to_cards
+from .events import EventSink, GameEvent
+
+
+FORMAT_VERSION = 1
+
+TAG_GAME = 0x01
+TAG_PLAY = 0x02
+TAG_PASS = 0x03
+TAG_REFILL = 0x04
+TAG_END = 0x05
+
+_MASK_BYTES = 7  # 54张牌的掩码
+_NO_SEED = -(1 << 63)
+
+_GAME_HEAD = struct.Struct("<BBqBB")  # 标记 版本 种子 人数 庄家
+_SEAT = struct.Struct("<BB")          # 标记 座位
+_REFILL = struct.Struct("<BBB")       # 标记 座位 牌
+_END_HEAD = struct.Struct("<BbH")     # 标记 胜者 轮数
+_SCORE = struct.Struct("<h")
+
+
+def _mask_bytes(mask: int) -> bytes:
+    return mask.to_bytes(_MASK_BYTES, "little")
+
+
+class BinaryLogSink(EventSink):
+    """把对局写成二进制事件日志的事件接收器
+
+    同一个接收器可以连续记录多局（每局由SETUP开始、最后一条RESULT结束），
+    每局结束时flush一次。
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self._seats: Dict[str, int] = {}
+        self._scores: List[int] = []
+        self._results = 0
+        self._winner = -1
+        self._rounds = 0
+
+    def emit(self, event: str, **data):
+        handler = _HANDLERS.get(event)
+        if handler is not None:
+            handler(self, **data)
+
+    def _on_setup(self, player_count, dealer, players, seed=None, hands=(), deck_order=(), **_):
+        self._seats = {name: seat for seat, name in enumerate(players)}
+        self._scores = [0] * player_count
+        self._results = 0
+        if seed is not None and not _NO_SEED < seed < -_NO_SEED:
+            raise ValueError(f"事件日志只能记录有符号64位的种子: {seed}")
+        record = bytearray(_GAME_HEAD.pack(TAG_GAME, FORMAT_VERSION, _NO_SEED if seed is None else seed,
+                                           player_count, self._seats[dealer]))
+        for mask in hands:
+            record += _mask_bytes(mask)
+        record.append(len(deck_order))
+        record += bytes(deck_order)
+        self.stream.write(record)
+
+    def _on_play(self, player, pattern, mask=None, **_):
+        if mask is None:
+            mask = cards_to_mask(pattern.cards)
+        self.stream.write(_SEAT.pack(TAG_PLAY, self._seats[player]) + _mask_bytes(mask))
+
+    def _on_pass(self, player, **_):
+        self.stream.write(_SEAT.pack(TAG_PASS, self._seats[player]))
+
+    def _on_refill(self, player, card, **_):
+        self.stream.write(_REFILL.pack(TAG_REFILL, self._seats[player], card_to_index(card)))
+
+    def _on_game_over(self, winner, rounds=0, **_):
+        self._winner = self._seats[winner] if winner is not None else -1
+        self._rounds = rounds
+
+    def _on_result(self, player, score, **_):
+        self._scores[self._seats[player]] = score
+        self._results += 1
+        if self._results == len(self._scores):
+            record = bytearray(_END_HEAD.pack(TAG_END, self._winner, self._rounds))
+            for score in self._scores:
+                record += _SCORE.pack(score)
+            self.stream.write(record)
+            self.stream.flush()
+
+
+_HANDLERS = {
+    GameEvent.SETUP: BinaryLogSink._on_setup,
+    GameEvent.PLAY: BinaryLogSink._on_play,
+    GameEvent.PASS: BinaryLogSink._on_pass,
+    GameEvent.REFILL: BinaryLogSink._on_refill,
+    GameEvent.GAME_OVER: BinaryLogSink._on_game_over,
+    GameEvent.RESULT: BinaryLogSink._on_result,
+}
+
+
+class GameRecord(NamedTuple):
+    """一局的日志"""
+    seed: Optional[int]
+    dealer: int
+    hands: List[int]                      # 发牌后各家手牌掩码
+    deck: List[int]                       # 发牌后的牌堆（牌堆顶在末尾）
+    events: List[Tuple[int, int, int]]    # (标记, 座位, 掩码或牌)，PASS的第三项为0
+    winner: int                           # 没有END记录时为-1
+    rounds: int
+    scores: Optional[List[int]]           # 没有END记录（日志被截断）时为None
+
+    @property
+    def player_count(self) -> int:
+        return len(self.hands)
+
+    @property
+    def complete(self) -> bool:
+        return self.scores is not None
+
+
+def read_games(stream: BinaryIO, chunk_size: int = 1 << 16) -> Iterator[GameRecord]:
+    """逐局读取日志文件，只在内存中保留当前一块数据"""
+    buffer = b""
+    position = 0
+    game = None
+    eof = False
+    while True:
+        parsed = _parse_record(buffer, position, game) if position < len(buffer) else None
+        if parsed is None:
+            if eof:
+                break
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        record, position = parsed
+        if record[0] == TAG_GAME:
+            if game is not None:
+                yield _finish(game, None)
+            game = record
+        elif record[0] == TAG_END:
+            yield _finish(game, record)
+            game = None
+        elif game is None:
+            raise ValueError("日志损坏：事件记录前没有GAME记录")
+        else:
+            game[5].append(record)
+    if game is not None:
+        yield _finish(game, None)
+
+
+def _parse_record(buffer: bytes, position: int, game):
+    """解析position处的一条记录，数据不完整时返回None"""
+    tag = buffer[position]
+    if tag == TAG_PLAY:
+        end = position + _SEAT.size + _MASK_BYTES
+        if end > len(buffer):
+            return None
+        return (TAG_PLAY, buffer[position + 1],
+                int.from_bytes(buffer[position + 2:end], "little")), end
+    if tag == TAG_PASS:
+        end = position + _SEAT.size
+        if end > len(buffer):
+            return None
+        return (TAG_PASS, buffer[position + 1], 0), end
+    if tag == TAG_REFILL:
+        end = position + _REFILL.size
+        if end > len(buffer):
+            return None
+        return (TAG_REFILL, buffer[position + 1], buffer[position + 2]), end
+    if tag == TAG_GAME:
+        head_end = position + _GAME_HEAD.size
+        if head_end > len(buffer):
+            return None
+        _, version, seed, player_count, dealer = _GAME_HEAD.unpack_from(buffer, position)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"不支持的日志版本: {version}")
+        deck_at = head_end + player_count * _MASK_BYTES
+        if deck_at + 1 > len(buffer):
+            return None
+        end = deck_at + 1 + buffer[deck_at]
+        if end > len(buffer):
+            return None
+        hands = [int.from_bytes(buffer[head_end + i * _MASK_BYTES:head_end + (i + 1) * _MASK_BYTES], "little")
+                 for i in range(player_count)]
+        return (TAG_GAME, None if seed == _NO_SEED else seed, dealer, hands,
+                list(buffer[deck_at + 1:end]), []), end
+    if tag == TAG_END:
+        if game is None:
+            raise ValueError("日志损坏：END记录前没有GAME记录")
+        player_count = len(game[3])
+        end = position + _END_HEAD.size + player_count * _SCORE.size
+        if end > len(buffer):
+            return None
+        _, winner, rounds = _END_HEAD.unpack_from(buffer, position)
+        scores = [_SCORE.unpack_from(buffer, position + _END_HEAD.size + i * _SCORE.size)[0]
+                  for i in range(player_count)]
+        return (TAG_END, winner, rounds, scores), end
+    raise ValueError(f"日志损坏：未知的记录标记 {tag}")
+
+
+def _finish(game, end) -> GameRecord:
+    _, seed, dealer, hands, deck, events = game
+    if end is None:
+        return GameRecord(seed, dealer, hands, deck, events, -1, 0, None)
+    return GameRecord(seed, dealer, hands, deck, events, end[1], end[2], end[3])
+
+
+class ReplayState(NamedTuple):
+    """重放到某一步之后的局面"""
+    step: int                 # 已经重放的事件数
+    hands: Tuple[int, ...]    # 各家手牌掩码
+    deck_size: int
+    round_count: int          # 已结束的轮数
+    last_seat: int            # 本轮最后出牌的座位，本轮还没人出牌时为-1
+    last_mask: int            # 本轮最后出的牌
+    passes: int               # 本轮连续跳过人数
+
+
+def replay(game: GameRecord) -> Iterator[ReplayState]:
+    """依次给出发牌后以及每个事件之后的局面，并检查记录是否自洽"""
+    hands = list(game.hands)
+    deck = list(game.deck)
+    n = game.player_count
+    round_count, last_seat, last_mask, passes = 0, -1, 0, 0
+    yield ReplayState(0, tuple(hands), len(deck), round_count, last_seat, last_mask, passes)
+    for step, (tag, seat, value) in enumerate(game.events, start=1):
+        if tag == TAG_PLAY:
+            if hands[seat] & value != value:
+                raise ValueError(f"第{step}步：座位{seat}出了不在手中的牌")
+            hands[seat] &= ~value
+            last_seat, last_mask, passes = seat, value, 0
+        elif tag == TAG_PASS:
+            passes += 1
+        elif tag == TAG_REFILL:
+            if not deck or deck[-1] != value:
+                raise ValueError(f"第{step}步：补牌与牌堆顺序不符")
+            deck.pop()
+            hands[seat] |= 1 << value
+        if passes == n - 1:
+            round_count += 1
+            last_seat, last_mask, passes = -1, 0, 0
+        yield ReplayState(step, tuple(hands), len(deck), round_count, last_seat, last_mask, passes)
+
+
+def state_at(game: GameRecord, step: int) -> ReplayState:
+    """重放到第step个事件之后的局面"""
+    for state in replay(game):
+        if state.step == step:
+            return state
+    raise IndexError(f"这局只有{len(game.events)}个事件")
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口：列出日志中的对局，或逐步显示某一局"""
+    parser = argparse.ArgumentParser(description="查看二进制事件日志")
+    parser.add_argument("path", help="日志文件")
+    parser.add_argument("--game", type=int, default=None, metavar="INDEX", help="逐步显示第INDEX局")
+    args = parser.parse_args(argv)
+
+    with open(args.path, "rb") as stream:
+        for index, game in enumerate(read_games(stream)):
+            if args.game is None:
+                status = f"胜者座位{game.winner}，{game.rounds}轮，得分{game.scores}" if game.complete else "未结束"
+                print(f"第{index}局 种子{game.seed} {game.player_count}人 {len(game.events)}个事件 {status}")
+            elif index == args.game:
+                for state in replay(game):
+                    hands = " | ".join(" ".join(map(str, mask_to_cards(mask))) for mask in state.hands)
+                    print(f"[{state.step:3d}] 第{state.round_count + 1}轮 牌堆{state.deck_size:2d}张 "
+                          f"手牌{[mask_size(mask) for mask in state.hands]}: {hands}")
+                break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""新玩法游戏 - 游戏事件与输出
+游戏逻辑只负责发出事件，由可替换的事件接收器决定如何输出：
+- NullSink: 无输出（无界面批量模拟）
+- LogSink: 结构化日志（JSON行或内存记录）
+- ConsoleSink: 控制台输出（与原来的print完全一致）
+"""
+
+import json
+import sys
+from typing import Any, Dict, List, Optional, TextIO
+
+
+class GameEvent:
+    """游戏事件类型常量"""
+    SETUP = "setup"                    # 发牌完成
+    GAME_START = "game_start"          # 开始游戏
+    ROUND_START = "round_start"        # 新一轮开始
+    STATE = "state"                    # 当前局面
+    TURN_START = "turn_start"          # 轮到某位玩家
+    AI_THINKING = "ai_thinking"        # AI思考中
+    PLAY = "play"                      # 出牌
+    PASS = "pass"                      # 跳过
+    ALL_PASSED = "all_passed"          # 本轮无人出牌
+    REFILL = "refill"                  # 补牌
+    REFILL_SKIPPED = "refill_skipped"  # 已出完牌，无需补牌
+    DECK_EMPTY = "deck_empty"          # 牌堆抽完
+    GAME_OVER = "game_over"            # 游戏结束
+    SPRING = "spring"                  # 春天
+    MULTIPLIER = "multiplier"          # 胜利者牌型倍率
+    RESULT = "result"                  # 单个玩家的结算
+
+
+class EventSink:
+    """事件接收器基类"""
+
+    def emit(self, event: str, **data: Any):
+        """接收一个事件 - 子类需要实现"""
+        raise NotImplementedError
+
+
+class NullSink(EventSink):
+    """丢弃所有事件，用于全速模拟"""
+
+    def emit(self, event: str, **data: Any):
+        pass
+
+
+class LogSink(EventSink):
+    """结构化日志：每个事件记为一个字典，可选写成JSON行"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+        self.records: List[Dict[str, Any]] = []
+
+    def emit(self, event: str, **data: Any):
+        record = {"event": event}
+        record.update(data)
+        if self.stream is not None:
+            self.stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        else:
+            self.records.append(record)
+
+
+class ConsoleSink(EventSink):
+    """控制台输出"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+
+    def emit(self, event: str, **data: Any):
+        render = getattr(self, "_render_" + event, None)
+        if render is not None:
+            render(**data)
+
+    def _print(self, *lines: str):
+        stream = self.stream or sys.stdout
+        for line in lines:
+            print(line, file=stream)
+
+    def _render_setup(self, player_count, dealer, players, hand_sizes, **_):
+        self._print(f"游戏开始！{player_count}名玩家参与", f"庄家: {dealer}")
+        for name, size in zip(players, hand_sizes):
+            self._print(f"{name}: {size}张牌")
+
+    def _render_game_start(self, **_):
+        self._print("\n=== 游戏开始 ===")
+
+    def _render_round_start(self, round_number, **_):
+        self._print(f"\n--- 第{round_number}轮 ---")
+
+    def _render_state(self, players, hand_sizes, current, dealer, last_player, last_pattern, deck_size, **_):
+        self._print("\n当前状态:")
+        for i, (name, size) in enumerate(zip(players, hand_sizes)):
+            marker = " <- 当前玩家" if i == current else ""
+            dealer_marker = " (庄家)" if i == dealer else ""
+            self._print(f"  {name}: {size}张牌{dealer_marker}{marker}")
+        if last_pattern:
+            self._print(f"  上家出牌: {last_player} - {last_pattern}")
+        self._print(f"  牌堆剩余: {deck_size}张")
+
+    def _render_turn_start(self, player, **_):
+        self._print(f"\n{player} 的回合")
+
+    def _render_ai_thinking(self, player, **_):
+        self._print(f"\n{player} 思考中...")
+
+    def _render_play(self, player, pattern, **_):
+        self._print(f"{player} 出牌: {pattern}")
+
+    def _render_pass(self, player, **_):
+        self._print(f"{player} 跳过")
+
+    def _render_all_passed(self, **_):
+        self._print("本轮无人出牌，所有玩家补牌:")
+
+    def _render_refill(self, player, card, everyone=False, **_):
+        indent = "  " if everyone else ""
+        self._print(f"{indent}{player} 补牌: {card}")
+
+    def _render_refill_skipped(self, player, everyone=False, **_):
+        indent = "  " if everyone else ""
+        self._print(f"{indent}{player} 已出完牌，无需补牌")
+
+    def _render_deck_empty(self, **_):
+        self._print("牌堆已抽完，不再补牌")
+
+    def _render_game_over(self, winner, **_):
+        self._print("\n=== 游戏结束 ===")
+        if winner:
+            self._print(f"🎉 {winner} 获胜！")
+        self._print("\n最终结果:")
+
+    def _render_spring(self, player, **_):
+        self._print(f"  {player} 春天！扣分翻倍")
+
+    def _render_multiplier(self, pattern_type, multiplier, **_):
+        self._print(f"  胜利者使用{pattern_type}，扣分 x{multiplier}")
+
+    def _render_result(self, place, player, remaining, score, **_):
+        if remaining == 0:
+            self._print(f"  {place}. {player}: 胜利! 🏆 (扣分: 0)")
+        else:
+            self._print(f"  {place}. {player}: 剩余{remaining}张牌，扣分{abs(score)}")
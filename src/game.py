@@ -1,95 +1,151 @@
 """新玩法游戏 - 游戏主逻辑
 根据玩法.md重新实现"""
 
-from typing import List, Optional
-from .card import create_deck
+import random
+import time
+from typing import Generator, List, Optional
+from .card import Card, create_deck
+from .card_mask import cards_to_mask, index_to_card, shuffled_int_deck
+from .events import EventSink, ConsoleSink, GameEvent, NullSink
+from .metrics import GameMetrics, TimedSink
 from .player import Player, HumanPlayer, AIPlayer
 from .pattern_analyzer import PatternAnalyzer, Pattern
+from .rules import (SPRING_CARDS, deal_order, next_leader, next_seat, pattern_multiplier, penalty,
+                    refill_seats, round_over)
 
 
 class NewGame:
     """新玩法游戏类"""
     
-    def __init__(self, player_count: int = 3):
+    def __init__(self, player_count: int = 3, sink: Optional[EventSink] = None,
+                 rng: Optional[random.Random] = None, seed: Optional[int] = None,
+                 metrics: Optional[GameMetrics] = None):
         if not 2 <= player_count <= 6:
             raise ValueError("玩家数量必须在2-6之间")
         
         self.player_count = player_count
+        self.sink = sink if sink is not None else ConsoleSink()
+        self.metrics = metrics  # 分阶段性能统计，None为不统计
+        if metrics is not None and not isinstance(self.sink, NullSink):
+            self.sink = TimedSink(self.sink, metrics)  # 无输出时不计output阶段
+        self.seed = seed  # 未传入rng时用它创建随机数生成器，并记入事件日志
+        self.rng = rng if rng is not None else random.Random(seed)  # 本局专用的随机数生成器
         self.players: List[Player] = []
         self.deck = create_deck()
+        self.deck_order: List[int] = []  # 洗牌后的整数牌序（牌堆顶在末尾）
         self.current_player_index = 0
         self.dealer_index = 0  # 庄家索引
         self.last_pattern: Optional[Pattern] = None
         self.last_player_index = -1
+        self.consecutive_passes = 0  # 本轮连续跳过的人数
+        self.round_winner_index = -1  # 本轮最后出牌者
+        self.played_mask = 0  # 已经出过的牌（整数编码的掩码）
         self.game_over = False
         self.winner: Optional[Player] = None
         self.round_count = 0
         self.base_score = 1  # 底分
+        self.scores: List[int] = []  # 结算后每个座位的得分（负分为扣分）
     
-    def setup_game(self, human_players: int = 1):
-        """设置游戏"""
-        if not 1 <= human_players <= self.player_count:
-            raise ValueError(f"人类玩家数量必须在1-{self.player_count}之间")
+    def setup_game(self, human_players: int = 1, ai_strategies: Optional[List[str]] = None,
+                   endgame_cards: Optional[int] = None, players: Optional[List[Player]] = None):
+        """设置游戏
+        
+        ai_strategies按顺序分配给AI座位，不足时循环使用；
+        endgame_cards为AI改用残局求解器的剩余总牌数（None为不使用）；
+        传入players时按座位直接使用这些玩家（手牌须为空），忽略前面几个参数
+        """
+        if players is not None:
+            if len(players) != self.player_count:
+                raise ValueError(f"需要{self.player_count}个玩家，传入了{len(players)}个")
+            human_players = 0
+        elif not 0 <= human_players <= self.player_count:
+            raise ValueError(f"人类玩家数量必须在0-{self.player_count}之间")
         
         # 创建玩家
-        self.players = []
+        self.players = list(players) if players is not None else []
         for i in range(human_players):
             self.players.append(HumanPlayer(f"玩家{i+1}"))
         
-        ai_strategies = ["conservative", "aggressive", "smart"]
-        for i in range(self.player_count - human_players):
+        ai_strategies = ai_strategies or ["conservative", "aggressive", "smart"]
+        for i in range(self.player_count - len(self.players)):
             strategy = ai_strategies[i % len(ai_strategies)]
-            self.players.append(AIPlayer(f"AI{i+1}", strategy))
+            if strategy == "mcts":
+                from .mcts import MCTSPlayer
+                self.players.append(MCTSPlayer(f"AI{i+1}", sink=self.sink, rng=self.rng,
+                                               endgame_cards=endgame_cards))
+            else:
+                self.players.append(AIPlayer(f"AI{i+1}", strategy, sink=self.sink, rng=self.rng,
+                                             endgame_cards=endgame_cards))
         
-        # 洗牌发牌
-        import random
-        random.shuffle(self.deck)
+        # 洗牌发牌：打乱整数牌序，再映射成牌
+        self.deck_order = shuffled_int_deck(self.rng)
+        self.deck = [index_to_card(i) for i in self.deck_order]
         self._deal_cards()
         
         # 庄家先出牌
         self.current_player_index = self.dealer_index
         
-        print(f"游戏开始！{self.player_count}名玩家参与")
-        print(f"庄家: {self.players[self.dealer_index].name}")
-        for i, player in enumerate(self.players):
-            print(f"{player.name}: {len(player.hand)}张牌")
+        self.sink.emit(GameEvent.SETUP, player_count=self.player_count,
+                       dealer=self.players[self.dealer_index].name,
+                       players=[player.name for player in self.players],
+                       hand_sizes=[len(player.hand) for player in self.players],
+                       seed=self.seed, hands=[player.hand.mask for player in self.players],
+                       deck_order=self.deck_order[:len(self.deck)])
     
     def _deal_cards(self):
         """发牌 - 庄家6张，其他人5张"""
-        # 庄家6张
-        for _ in range(6):
+        start = time.perf_counter() if self.metrics is not None else 0.0
+        for seat in deal_order(self.player_count, self.dealer_index):
             if self.deck:
-                self.players[self.dealer_index].add_card(self.deck.pop())
-        
-        # 其他人5张
-        for i in range(self.player_count):
-            if i != self.dealer_index:
-                for _ in range(5):
-                    if self.deck:
-                        self.players[i].add_card(self.deck.pop())
+                self.players[seat].add_card(self.deck.pop())
+        if self.metrics is not None:
+            self.metrics.add_time("deal", time.perf_counter() - start)
     
     def play_game(self):
         """开始游戏"""
-        print("\n=== 游戏开始 ===")
+        turns = self.turns()
+        try:
+            player = next(turns)
+            while True:
+                player = turns.send(player.play_turn(self.last_pattern))
+        except StopIteration:
+            pass
+    
+    def turns(self) -> Generator[Player, Optional[List[Card]], None]:
+        """逐手推进整局的生成器
+        
+        每轮到一位玩家出牌就产出该玩家，由调用方通过send()传回出的牌（None为跳过）；
+        play_game直接调用play_turn，异步服务器则在等待网络输入时挂起。
+        """
+        self.sink.emit(GameEvent.GAME_START)
+        for seat, player in enumerate(self.players):
+            player.join(self, seat)
         
+        metrics = self.metrics
         while not self.game_over:
-            self._play_round()
+            if metrics is None:
+                yield from self._play_round()
+            else:
+                start = time.perf_counter()
+                yield from self._play_round()
+                metrics.add_time("round", time.perf_counter() - start)
             self.round_count += 1
         
         self._show_results()
     
-    def _play_round(self):
+    def _play_round(self) -> Generator[Player, Optional[List[Card]], None]:
         """进行一轮游戏"""
-        print(f"\n--- 第{self.round_count + 1}轮 ---")
+        metrics = self.metrics
+        self.sink.emit(GameEvent.ROUND_START, round_number=self.round_count + 1)
         
         # 显示当前状态
         self._show_game_state()
         
         # 玩家轮流出牌
-        consecutive_passes = 0
-        round_winner_index = -1
+        self.consecutive_passes = 0
+        self.round_winner_index = -1
         
-        while consecutive_passes < self.player_count - 1:
+        while not round_over(self.consecutive_passes, self.player_count):
             current_player = self.players[self.current_player_index]
             
             # 检查是否胜利（在回合开始时）
@@ -98,24 +154,29 @@ class NewGame:
                 self.winner = current_player
                 return
             
-            print(f"\n{current_player.name} 的回合")
+            self.sink.emit(GameEvent.TURN_START, player=current_player.name)
             
             # 玩家出牌
-            played_cards = current_player.play_turn(self.last_pattern)
+            played_cards = yield current_player
             
             if played_cards:
                 # 有效出牌
+                start = time.perf_counter() if metrics is not None else 0.0
                 pattern = PatternAnalyzer.analyze_cards(played_cards)
-                print(f"{current_player.name} 出牌: {pattern}")
+                if metrics is not None:
+                    metrics.add_time("analyze", time.perf_counter() - start)
+                played_mask = cards_to_mask(played_cards)
+                self.sink.emit(GameEvent.PLAY, player=current_player.name, pattern=pattern, mask=played_mask)
                 
                 self.last_pattern = pattern
                 self.last_player_index = self.current_player_index
-                round_winner_index = self.current_player_index
-                consecutive_passes = 0
+                self.round_winner_index = self.current_player_index
+                self.consecutive_passes = 0
                 
                 # 移除出的牌
                 for card in played_cards:
                     current_player.remove_card(card)
+                self.played_mask |= played_mask
                 
                 # 检查出牌后是否胜利
                 if len(current_player.hand) == 0:
@@ -125,98 +186,84 @@ class NewGame:
                 
             else:
                 # 跳过
-                print(f"{current_player.name} 跳过")
-                consecutive_passes += 1
+                self.sink.emit(GameEvent.PASS, player=current_player.name)
+                self.consecutive_passes += 1
             
             # 下一个玩家（逆时针）
-            self.current_player_index = (self.current_player_index - 1) % self.player_count
+            self.current_player_index = next_seat(self.current_player_index, self.player_count)
         
         # 轮次结束，补牌逻辑
+        round_winner_index = self.round_winner_index
+        start = time.perf_counter() if metrics is not None else 0.0
         if self.deck:
-            if round_winner_index != -1:
-                # 有人出牌的情况：只有最后出牌者补牌
-                winner = self.players[round_winner_index]
-                if len(winner.hand) > 0:
-                    new_card = self.deck.pop()
-                    winner.add_card(new_card)
-                    print(f"{winner.name} 补牌: {new_card}")
-                else:
-                    print(f"{winner.name} 已出完牌，无需补牌")
-            else:
-                # 没人出牌的情况（全部跳过）：所有玩家都补牌
-                print("本轮无人出牌，所有玩家补牌:")
-                for i, player in enumerate(self.players):
-                    if len(player.hand) > 0 and self.deck:
-                        new_card = self.deck.pop()
-                        player.add_card(new_card)
-                        print(f"  {player.name} 补牌: {new_card}")
-                    elif len(player.hand) == 0:
-                        print(f"  {player.name} 已出完牌，无需补牌")
+            # 有人出牌时只有最后出牌者补牌；全部跳过时所有玩家都补牌
+            everyone = round_winner_index == -1
+            if everyone:
+                self.sink.emit(GameEvent.ALL_PASSED)
+            sizes = [len(player.hand) for player in self.players]
+            for seat in (range(self.player_count) if everyone else [round_winner_index]):
+                if not sizes[seat]:
+                    self.sink.emit(GameEvent.REFILL_SKIPPED, player=self.players[seat].name, everyone=everyone)
+            for seat in refill_seats(round_winner_index, sizes, len(self.deck)):
+                new_card = self.deck.pop()
+                self.players[seat].add_card(new_card)
+                self.sink.emit(GameEvent.REFILL, player=self.players[seat].name, card=new_card, everyone=everyone)
+            if metrics is not None:
+                metrics.add_time("refill", time.perf_counter() - start)
         
         # 重新开始，最后出牌者先出
         self.last_pattern = None
-        self.current_player_index = round_winner_index if round_winner_index != -1 else self.dealer_index
+        self.current_player_index = next_leader(round_winner_index, self.dealer_index)
         
         # 检查牌堆是否抽完
         if not self.deck:
-            print("牌堆已抽完，不再补牌")
+            self.sink.emit(GameEvent.DECK_EMPTY)
     
     def _show_game_state(self):
         """显示游戏状态"""
-        print("\n当前状态:")
-        for i, player in enumerate(self.players):
-            marker = " <- 当前玩家" if i == self.current_player_index else ""
-            dealer_marker = " (庄家)" if i == self.dealer_index else ""
-            print(f"  {player.name}: {len(player.hand)}张牌{dealer_marker}{marker}")
-        
-        if self.last_pattern:
-            last_player = self.players[self.last_player_index]
-            print(f"  上家出牌: {last_player.name} - {self.last_pattern}")
-        
-        print(f"  牌堆剩余: {len(self.deck)}张")
+        last_player = self.players[self.last_player_index].name if self.last_pattern else None
+        self.sink.emit(GameEvent.STATE, players=[player.name for player in self.players],
+                       hand_sizes=[len(player.hand) for player in self.players],
+                       current=self.current_player_index, dealer=self.dealer_index,
+                       last_player=last_player, last_pattern=self.last_pattern, deck_size=len(self.deck))
     
     def _calculate_score(self, player: Player, winner_pattern: Optional[Pattern] = None) -> int:
         """计算积分（负分系统，积分代表扣的分数）"""
         remaining_cards = len(player.hand)
         
-        # 基础扣分
-        score = self.base_score * remaining_cards
-        
         # 春天倍率（剩余5张）
-        if remaining_cards == 5:
-            score *= 2
-            print(f"  {player.name} 春天！扣分翻倍")
+        if remaining_cards == SPRING_CARDS:
+            self.sink.emit(GameEvent.SPRING, player=player.name)
         
         # 胜利者牌型倍率
-        if winner_pattern:
-            multiplier = winner_pattern.get_multiplier()
-            if multiplier > 1:
-                score *= multiplier
-                print(f"  胜利者使用{winner_pattern.pattern_type}，扣分 x{multiplier}")
+        multiplier = pattern_multiplier(winner_pattern.pattern_type) if winner_pattern else 1
+        if multiplier > 1:
+            self.sink.emit(GameEvent.MULTIPLIER, pattern_type=winner_pattern.pattern_type,
+                           multiplier=multiplier)
         
         # 返回负分（扣分）
-        return -score
+        return penalty(remaining_cards, self.base_score, multiplier)
     
     def _show_results(self):
         """显示游戏结果"""
-        print("\n=== 游戏结束 ===")
-        if self.winner:
-            print(f"🎉 {self.winner.name} 获胜！")
+        start = time.perf_counter() if self.metrics is not None else 0.0
+        self.sink.emit(GameEvent.GAME_OVER, winner=self.winner.name if self.winner else None,
+                       rounds=self.round_count)
         
         # 计算积分
         winner_pattern = self.last_pattern if self.winner else None
         
-        print("\n最终结果:")
         # 按剩余牌数排序
-        sorted_players = sorted(self.players, key=lambda p: len(p.hand))
-        for i, player in enumerate(sorted_players):
-            rank = i + 1
+        self.scores = [0] * self.player_count
+        sorted_seats = sorted(range(self.player_count), key=lambda i: len(self.players[i].hand))
+        for place, seat in enumerate(sorted_seats, start=1):
+            player = self.players[seat]
             remaining = len(player.hand)
-            if remaining == 0:
-                print(f"  {rank}. {player.name}: 胜利! 🏆 (扣分: 0)")
-            else:
-                score = self._calculate_score(player, winner_pattern)
-                print(f"  {rank}. {player.name}: 剩余{remaining}张牌，扣分{abs(score)}")
+            score = self._calculate_score(player, winner_pattern) if remaining else 0
+            self.scores[seat] = score
+            self.sink.emit(GameEvent.RESULT, place=place, player=player.name, remaining=remaining, score=score)
+        if self.metrics is not None:
+            self.metrics.add_time("results", time.perf_counter() - start)
     
 
 
@@ -0,0 +1,221 @@
+"""新玩法游戏 - 紧凑的对局状态
+只用牌点直方图表示手牌、用洗好的牌点序列加一个下标表示牌堆，
+出牌与补牌都走rules里和NewGame共用的规则。apply/undo是O(1)的，
+还维护了一个增量的Zobrist哈希，供搜索类AI不复制状态地展开和回退。
+"""
+
+import random
+from typing import Hashable, List, Optional, Sequence, Tuple
+from .card_mask import CARD_RANK, FULL_DECK_MASK, NUM_RANKS, mask_to_indices
+from .move_generator import Move, pattern_key
+from .move_cache import cached_responses
+from .rules import next_leader, next_seat, pattern_multiplier, penalty, refill_seats, round_over
+from .strategy import choose_move, lead_moves
+
+
+MAX_PLAYERS = 6
+
+# Zobrist表：_ZOBRIST[座位][牌点][张数]，手牌哈希为各座位各牌点对应值的异或
+_zobrist_rng = random.Random(0x5EED)
+_ZOBRIST: Tuple[Tuple[Tuple[int, ...], ...], ...] = tuple(
+    tuple(tuple(_zobrist_rng.getrandbits(64) for _ in range(5)) for _ in range(NUM_RANKS))
+    for _ in range(MAX_PLAYERS)
+)
+del _zobrist_rng
+
+
+def _hands_hash(hands: Sequence[Sequence[int]]) -> int:
+    code = 0
+    for seat, counts in enumerate(hands):
+        table = _ZOBRIST[seat]
+        for rank_idx, count in enumerate(counts):
+            code ^= table[rank_idx][count]
+    return code
+
+
+class GameState:
+    """对局状态（不区分花色）
+
+    current为轮到出牌的座位，last为本轮上家出牌的键（None表示首出）；
+    deck_order为洗好的牌点索引序列（牌堆顶在末尾），牌堆是其中前deck_size张。
+    apply把每一步的撤销信息压栈，undo按相反顺序回退。
+    """
+
+    __slots__ = ("hands", "sizes", "deck_order", "deck_size", "dealer", "current", "last", "passes",
+                 "round_winner", "winner", "round_count", "base_score", "hand_hash", "_history")
+
+    def __init__(self, hands: Sequence[Sequence[int]], deck: Sequence[int], dealer: int = 0,
+                 current: Optional[int] = None, base_score: int = 1):
+        self.hands: List[List[int]] = [list(counts) for counts in hands]
+        self.sizes: List[int] = [sum(counts) for counts in hands]
+        self.deck_order: Tuple[int, ...] = tuple(deck)
+        self.deck_size = len(self.deck_order)
+        self.dealer = dealer
+        self.current = dealer if current is None else current
+        self.last: Optional[Tuple[str, int, int]] = None
+        self.passes = 0
+        self.round_winner = -1
+        self.winner = -1
+        self.round_count = 0
+        self.base_score = base_score
+        self.hand_hash = _hands_hash(self.hands)
+        self._history: List[tuple] = []
+
+    @property
+    def player_count(self) -> int:
+        return len(self.hands)
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.winner >= 0
+
+    @property
+    def deck(self) -> List[int]:
+        """牌堆中剩余的牌点索引（牌堆顶在末尾）"""
+        return list(self.deck_order[:self.deck_size])
+
+    @property
+    def depth(self) -> int:
+        """可以undo的步数"""
+        return len(self._history)
+
+    def key(self) -> Hashable:
+        """局面键：手牌哈希加轮次状态，廉价且可以作为字典的键"""
+        return (self.hand_hash, self.current, self.last, self.passes, self.round_winner, self.deck_size)
+
+    def copy(self) -> "GameState":
+        """复制状态（手牌深拷贝，牌堆序列共享；副本不能undo到复制之前）"""
+        state = GameState.__new__(GameState)
+        state.hands = [counts[:] for counts in self.hands]
+        state.sizes = self.sizes[:]
+        state.deck_order = self.deck_order
+        state.deck_size = self.deck_size
+        state.dealer = self.dealer
+        state.current = self.current
+        state.last = self.last
+        state.passes = self.passes
+        state.round_winner = self.round_winner
+        state.winner = self.winner
+        state.round_count = self.round_count
+        state.base_score = self.base_score
+        state.hand_hash = self.hand_hash
+        state._history = []
+        return state
+
+    def legal_moves(self) -> List[Optional[Move]]:
+        """当前座位所有可选的出牌，None表示跳过（首出不能跳过）"""
+        counts = self.hands[self.current]
+        if self.last is None:
+            return lead_moves(counts)
+        moves: List[Optional[Move]] = list(cached_responses(counts, self.last))
+        moves.append(None)
+        return moves
+
+    def policy_move(self, strategy: str) -> Optional[Move]:
+        """当前座位按AIPlayer的策略出牌"""
+        return choose_move(self.hands[self.current], self.last, strategy)
+
+    def apply(self, move: Optional[Move]):
+        """当前座位出牌（None为跳过），推进到下一个座位；一轮结束时补牌"""
+        seat = self.current
+        last, passes, round_winner, round_count = self.last, self.passes, self.round_winner, self.round_count
+        drawn: Sequence[int] = ()
+        if move is not None:
+            self._take(seat, move.ranks, move.width)
+            self.sizes[seat] -= move.size
+            self.last = move.key
+            self.round_winner = seat
+            self.passes = 0
+            if self.sizes[seat] == 0:
+                self.winner = seat
+                self.round_count += 1
+        else:
+            self.passes += 1
+
+        if self.winner < 0:
+            n = len(self.hands)
+            self.current = next_seat(seat, n)
+            if round_over(self.passes, n):
+                drawn = self._end_round()
+        self._history.append((move, seat, last, passes, round_winner, round_count, drawn))
+
+    def undo(self):
+        """撤销最近一次apply"""
+        move, seat, last, passes, round_winner, round_count, drawn = self._history.pop()
+        for drawn_seat in reversed(drawn):
+            self._take(drawn_seat, (self.deck_order[self.deck_size],), 1)
+            self.sizes[drawn_seat] -= 1
+            self.deck_size += 1
+        if move is not None:
+            self._take(seat, move.ranks, -move.width)
+            self.sizes[seat] += move.size
+        self.current = seat
+        self.last = last
+        self.passes = passes
+        self.round_winner = round_winner
+        self.round_count = round_count
+        self.winner = -1
+
+    def _take(self, seat: int, ranks: Sequence[int], width: int):
+        """从seat的手牌中每个牌点拿走width张（负数为放回），同时更新手牌哈希"""
+        counts = self.hands[seat]
+        table = _ZOBRIST[seat]
+        code = self.hand_hash
+        for rank_idx in ranks:
+            count = counts[rank_idx]
+            code ^= table[rank_idx][count] ^ table[rank_idx][count - width]
+            counts[rank_idx] = count - width
+        self.hand_hash = code
+
+    def _end_round(self) -> List[int]:
+        """轮次结束：补牌，由最后出牌者（无人出牌时为庄家）开始新一轮；返回补牌的座位"""
+        drawn = refill_seats(self.round_winner, self.sizes, self.deck_size)
+        for seat in drawn:
+            self.deck_size -= 1
+            self._take(seat, (self.deck_order[self.deck_size],), -1)
+            self.sizes[seat] += 1
+        self.last = None
+        self.current = next_leader(self.round_winner, self.dealer)
+        self.passes = 0
+        self.round_winner = -1
+        self.round_count += 1
+        return drawn
+
+    def scores(self) -> List[int]:
+        """对局结束后每个座位的得分，与NewGame._calculate_score一致"""
+        multiplier = pattern_multiplier(self.last[0]) if self.winner >= 0 and self.last else 1
+        return [penalty(remaining, self.base_score, multiplier) for remaining in self.sizes]
+
+    def play_out(self, strategies: Sequence[str]) -> List[int]:
+        """每个座位按给定策略打完本局，返回得分"""
+        while self.winner < 0:
+            self.apply(choose_move(self.hands[self.current], self.last, strategies[self.current]))
+        return self.scores()
+
+    @classmethod
+    def from_game(cls, game, seat: int, rng: random.Random) -> "GameState":
+        """从seat的视角对NewGame做一次确定化采样
+
+        seat的手牌、各家手牌数、牌堆张数、已出的牌都是已知的；
+        其余未见过的牌随机分给其他玩家和牌堆。
+        """
+        unseen = mask_to_indices(FULL_DECK_MASK & ~game.played_mask & ~game.players[seat].hand.mask)
+        rng.shuffle(unseen)
+
+        hands = []
+        for i, player in enumerate(game.players):
+            counts = [0] * NUM_RANKS
+            if i == seat:
+                counts = player.hand.counts[:]
+            else:
+                for _ in range(len(player.hand)):
+                    counts[CARD_RANK[unseen.pop()]] += 1
+            hands.append(counts)
+        deck = [CARD_RANK[index] for index in unseen[:len(game.deck)]]
+
+        state = cls(hands, deck, game.dealer_index, game.current_player_index, game.base_score)
+        state.last = pattern_key(game.last_pattern) if game.last_pattern else None
+        state.passes = game.consecutive_passes
+        state.round_winner = game.round_winner_index
+        state.round_count = game.round_count
+        return state
@@ -0,0 +1,71 @@
+"""新玩法游戏 - 手牌容器
+按牌点分桶保存手牌，增量维护牌点直方图和掩码，加牌/出牌都是O(1)。
+遍历顺序与原来"追加后排序"的列表一致：按牌点升序，同牌点按加入顺序。
+"""
+
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional
+from .card import Card
+from .card_mask import NUM_RANKS
+
+
+class Hand:
+    """手牌"""
+
+    def __init__(self, cards: Optional[Iterable[Card]] = None):
+        self.buckets: List[List[Card]] = [[] for _ in range(NUM_RANKS)]  # 牌点索引 -> 牌
+        self.counts: List[int] = [0] * NUM_RANKS  # 牌点直方图（只读）
+        self.mask = 0  # 整数编码的掩码（假定手牌来自同一副牌，没有重复的牌）
+        self._size = 0
+        if cards is not None:
+            for card in cards:
+                self.add(card)
+
+    def add(self, card: Card):
+        """加入一张牌"""
+        rank_idx = card.rank_value - 3
+        self.buckets[rank_idx].append(card)
+        self.counts[rank_idx] += 1
+        self.mask |= 1 << card.index
+        self._size += 1
+
+    def remove(self, card: Card) -> bool:
+        """移除一张牌，手牌中没有这张牌时返回False"""
+        rank_idx = card.rank_value - 3
+        bucket = self.buckets[rank_idx]
+        if card not in bucket:
+            return False
+        bucket.remove(card)
+        self.counts[rank_idx] -= 1
+        self.mask &= ~(1 << card.index)
+        self._size -= 1
+        return True
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Card]:
+        return chain.from_iterable(self.buckets)
+
+    def __contains__(self, card: object) -> bool:
+        if not isinstance(card, Card):
+            return False
+        return card in self.buckets[card.rank_value - 3]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("手牌索引超出范围")
+        for bucket in self.buckets:
+            if index < len(bucket):
+                return bucket[index]
+            index -= len(bucket)
+
+    def __str__(self) -> str:
+        return " ".join(str(card) for card in self)
+
+    def __repr__(self) -> str:
+        return f"Hand([{', '.join(str(card) for card in self)}])"
@@ -0,0 +1,141 @@
+"""新玩法游戏 - 信息集蒙特卡洛树搜索AI
+单观察者信息集MCTS（SO-ISMCTS）：每次迭代从自己的视角对未见过的牌做一次确定化采样
+（其他玩家的手牌和牌堆），在这次采样允许的出牌里按UCB选择/扩展，
+再用GameState按AIPlayer的策略快速打完本局，把得分回传到路径上的每个节点。
+"""
+
+import math
+import random
+import time
+from typing import Dict, List, Optional
+from .card import Card
+from .endgame import SearchLimitExceeded
+from .events import EventSink, GameEvent
+from .game_state import GameState
+from .move_generator import Move, move_cards
+from .pattern_analyzer import Pattern
+from .player import AIPlayer
+
+
+class _Node:
+    """搜索树节点，记录到达该节点的出牌及出牌的座位"""
+
+    __slots__ = ("move", "seat", "parent", "children", "visits", "available", "reward")
+
+    def __init__(self, move: Optional[Move] = None, seat: int = -1, parent: Optional["_Node"] = None):
+        self.move = move
+        self.seat = seat
+        self.parent = parent
+        self.children: Dict[Optional[Move], "_Node"] = {}
+        self.visits = 0
+        self.available = 0  # 该出牌在多少次采样中是合法的
+        self.reward = 0.0
+
+    def ucb(self, exploration: float) -> float:
+        return self.reward / self.visits + exploration * math.sqrt(math.log(self.available) / self.visits)
+
+
+class MCTSPlayer(AIPlayer):
+    """信息集MCTS AI
+
+    每步的搜索预算由iterations（迭代次数）和time_limit（秒）控制，先到者为准；
+    两者都为None时使用默认的迭代次数。只有一种出牌可选时不搜索。
+    """
+
+    DEFAULT_ITERATIONS = 200
+
+    def __init__(self, name: str, iterations: Optional[int] = None, time_limit: Optional[float] = None,
+                 rollout_strategy: str = "smart", exploration: float = 0.7, max_penalty: int = 40,
+                 sink: Optional[EventSink] = None, rng: Optional[random.Random] = None,
+                 endgame_cards: Optional[int] = None):
+        super().__init__(name, "mcts", sink=sink, rng=rng, endgame_cards=endgame_cards)
+        if iterations is None and time_limit is None:
+            iterations = self.DEFAULT_ITERATIONS
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.rollout_strategy = rollout_strategy
+        self.exploration = exploration
+        self.max_penalty = max_penalty  # 得分归一化到[0, 1]时的扣分上限
+        self.last_search_stats: Dict[str, float] = {}
+
+    def _decide(self, last_pattern: Optional[Pattern]) -> Optional[List[Card]]:
+        """选择一手出牌；不在对局中时退回启发式策略"""
+        if self.game is None:
+            return super()._decide(last_pattern)
+        self.sink.emit(GameEvent.AI_THINKING, player=self.name)
+        if self._in_endgame():
+            try:
+                return self._play_endgame()
+            except SearchLimitExceeded:
+                pass  # 超出节点上限，继续用MCTS
+        move = self.search()
+        if self.metrics is not None:
+            self.metrics.add_count("mcts_iterations", self.last_search_stats["iterations"])
+        if move is None:
+            return None
+        return move_cards(move, self.hand.buckets)
+
+    def search(self) -> Optional[Move]:
+        """在当前对局中为自己的座位搜索一手出牌"""
+        root_state = GameState.from_game(self.game, self.seat, self.rng)
+        legal = root_state.legal_moves()
+        if len(legal) == 1:
+            self.last_search_stats = {"iterations": 0, "elapsed": 0.0, "rollouts_per_second": 0.0}
+            return legal[0]
+
+        root = _Node()
+        start = time.perf_counter()
+        deadline = start + self.time_limit if self.time_limit is not None else None
+        iterations = 0
+        while True:
+            state = root_state if iterations == 0 else GameState.from_game(self.game, self.seat, self.rng)
+            self._iterate(root, state)
+            iterations += 1
+            if self.iterations is not None and iterations >= self.iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        elapsed = time.perf_counter() - start
+        self.last_search_stats = {
+            "iterations": iterations,
+            "elapsed": elapsed,
+            "rollouts_per_second": iterations / elapsed if elapsed > 0 else 0.0,
+        }
+        best = max(root.children.values(), key=lambda node: node.visits)
+        return best.move
+
+    def _iterate(self, root: _Node, state: GameState):
+        """一次迭代：选择、扩展、模拟、回传（state会被修改）"""
+        node = root
+        rng = self.rng
+        # 选择：当前采样中所有出牌都扩展过时按UCB下行
+        while not state.is_terminal:
+            legal = state.legal_moves()
+            untried = [move for move in legal if move not in node.children]
+            for move in legal:
+                child = node.children.get(move)
+                if child is not None:
+                    child.available += 1
+            if untried:
+                move = untried[rng.randrange(len(untried))]
+                child = _Node(move, state.current, node)
+                child.available = 1
+                node.children[move] = child
+                state.apply(move)
+                node = child
+                break
+            node = max((node.children[move] for move in legal), key=lambda c: c.ucb(self.exploration))
+            state.apply(node.move)
+
+        # 模拟：所有座位按同一策略打完
+        strategy = self.rollout_strategy
+        while not state.is_terminal:
+            state.apply(state.policy_move(strategy))
+
+        # 回传：每个节点记录出牌座位的归一化得分
+        rewards = [1.0 + max(score, -self.max_penalty) / self.max_penalty for score in state.scores()]
+        while node is not root:
+            node.visits += 1
+            node.reward += rewards[node.seat]
+            node = node.parent
+        root.visits += 1
@@ -0,0 +1,155 @@
+"""新玩法游戏 - 分阶段性能统计
+NewGame和AIPlayer在传入GameMetrics时记录各阶段的耗时、调用次数和AI候选出牌数，
+不传时只多一次is None判断。
+
+阶段：deal（发牌）、round（整轮，含AI思考）、analyze（牌型分析）、refill（补牌）、
+     output（事件输出，NullSink时不计）、results（结算）、ai_decision（AIPlayer.play_turn）。
+阶段之间可能嵌套（如refill中的事件输出也计入output）。
+
+MetricsHistogram把多局的统计汇总成每个阶段"每局耗时"的对数分桶直方图，
+可以跨进程合并，供批量模拟使用。
+"""
+
+import time
+from typing import Any, Dict, List
+from .events import EventSink
+
+
+PHASES = ("deal", "round", "analyze", "refill", "output", "results", "ai_decision")
+
+
+class GameMetrics:
+    """一局的统计"""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.counts: Dict[str, Dict[int, int]] = {}  # 计数名 -> {取值: 出现次数}
+
+    def add_time(self, phase: str, seconds: float):
+        """记录一次阶段耗时"""
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def add_count(self, name: str, value: int):
+        """记录一次计数（如一次决策的候选出牌数）"""
+        values = self.counts.setdefault(name, {})
+        values[value] = values.get(value, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        """导出本局的统计"""
+        counts = {}
+        for name, values in self.counts.items():
+            samples = sum(values.values())
+            counts[name] = {
+                "samples": samples,
+                "mean": sum(value * n for value, n in values.items()) / samples,
+                "max": max(values),
+            }
+        return {
+            "phases": {phase: {"seconds": self.seconds[phase], "calls": self.calls[phase]}
+                       for phase in self.seconds},
+            "counts": counts,
+        }
+
+
+class TimedSink(EventSink):
+    """包装事件接收器，把emit的耗时记为output阶段"""
+
+    def __init__(self, sink: EventSink, metrics: GameMetrics):
+        self.sink = sink
+        self.metrics = metrics
+
+    def emit(self, event: str, **data: Any):
+        start = time.perf_counter()
+        self.sink.emit(event, **data)
+        self.metrics.add_time("output", time.perf_counter() - start)
+
+
+_BUCKETS = 32  # 第i个桶为[2^(i-1), 2^i)微秒，第0个桶为不到1微秒
+
+
+def _bucket(seconds: float) -> int:
+    return min(int(seconds * 1e6).bit_length(), _BUCKETS - 1)
+
+
+class MetricsHistogram:
+    """多局统计的汇总：每个阶段每局耗时的直方图，以及各计数的分布"""
+
+    def __init__(self):
+        self.games = 0
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.histograms: Dict[str, List[int]] = {}
+        self.counts: Dict[str, Dict[int, int]] = {}
+
+    def add(self, metrics: GameMetrics):
+        """计入一局的统计"""
+        self.games += 1
+        for phase, seconds in metrics.seconds.items():
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+            self.calls[phase] = self.calls.get(phase, 0) + metrics.calls[phase]
+            self.histograms.setdefault(phase, [0] * _BUCKETS)[_bucket(seconds)] += 1
+        for name, values in metrics.counts.items():
+            merged = self.counts.setdefault(name, {})
+            for value, n in values.items():
+                merged[value] = merged.get(value, 0) + n
+
+    def merge(self, other: "MetricsHistogram"):
+        """合并另一份汇总"""
+        self.games += other.games
+        for phase, seconds in other.seconds.items():
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+            self.calls[phase] = self.calls.get(phase, 0) + other.calls[phase]
+            histogram = self.histograms.setdefault(phase, [0] * _BUCKETS)
+            for i, n in enumerate(other.histograms[phase]):
+                histogram[i] += n
+        for name, values in other.counts.items():
+            merged = self.counts.setdefault(name, {})
+            for value, n in values.items():
+                merged[value] = merged.get(value, 0) + n
+
+    def percentile(self, phase: str, fraction: float) -> float:
+        """某阶段每局耗时的分位数（秒，取所在桶的上界）"""
+        histogram = self.histograms.get(phase)
+        if not histogram:
+            return 0.0
+        target = fraction * sum(histogram)
+        seen = 0
+        for i, n in enumerate(histogram):
+            seen += n
+            if n and seen >= target:
+                return (1 << i) / 1e6
+        return (1 << (_BUCKETS - 1)) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出为可序列化的字典；直方图只保留非空的桶，键为桶的上界（微秒）"""
+        phases = {}
+        for phase in self.seconds:
+            phases[phase] = {
+                "seconds": self.seconds[phase],
+                "calls": self.calls[phase],
+                "mean_seconds_per_game": self.seconds[phase] / self.games,
+                "histogram_us": {str(1 << i): n for i, n in enumerate(self.histograms[phase]) if n},
+            }
+        return {
+            "games": self.games,
+            "phases": phases,
+            "counts": {name: {str(value): n for value, n in sorted(values.items())}
+                       for name, values in self.counts.items()},
+        }
+
+    def report(self) -> List[str]:
+        """文字报告，每个阶段一行"""
+        lines = []
+        for phase in sorted(self.seconds, key=lambda p: PHASES.index(p) if p in PHASES else len(PHASES)):
+            mean = self.seconds[phase] / self.games
+            lines.append(f"{phase:<12} 平均 {mean * 1000:8.3f} ms/局  "
+                         f"p50 ≤{self.percentile(phase, 0.5) * 1000:8.3f} ms  "
+                         f"p99 ≤{self.percentile(phase, 0.99) * 1000:8.3f} ms  "
+                         f"{self.calls[phase] / self.games:8.1f} 次/局")
+        for name, values in self.counts.items():
+            samples = sum(values.values())
+            mean = sum(value * n for value, n in values.items()) / samples
+            lines.append(f"{name:<12} 平均 {mean:.1f}，最多 {max(values)}（{samples} 次决策）")
+        return lines
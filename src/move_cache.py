@@ -0,0 +1,96 @@
+"""新玩法游戏 - 出牌生成缓存
+出牌只由牌点直方图和上家出牌决定，与花色、玩家、对局无关。
+同一进程内所有AIPlayer和GameState共用一个有容量上限的LRU缓存：
+键为(牌点直方图, 上家出牌的Move.key/None)，值为generate_moves或
+generate_responses_to_key结果的元组（顺序不变，调用方需要修改时自行复制）。
+
+测试或对比性能时可以用MOVE_CACHE.enabled = False关闭，关闭后直接调用生成器。
+GameServer在线程池中运行MCTS，和事件循环线程共用缓存，所以对条目的读写都加锁。
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+from .move_generator import Move, generate_moves, generate_responses_to_key
+
+
+class MoveCache:
+    """有容量上限的出牌缓存，满了以后淘汰最久未使用的条目"""
+
+    def __init__(self, max_entries: int = 100000, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, Tuple[Move, ...]]" = OrderedDict()
+        self.probes = 0
+        self.hits = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def moves(self, counts: Sequence[int], last_key: Optional[Tuple[str, int, int]] = None) -> Tuple[Move, ...]:
+        """last_key为None时返回所有出牌，否则返回能压过last_key的出牌"""
+        if not self.enabled:
+            return tuple(generate_moves(counts) if last_key is None else generate_responses_to_key(counts, last_key))
+        key = (tuple(counts), last_key)
+        entries = self._entries
+        with self._lock:
+            self.probes += 1
+            moves = entries.get(key)
+            if moves is not None:
+                self.hits += 1
+                entries.move_to_end(key)
+                return moves
+        moves = tuple(generate_moves(counts) if last_key is None else generate_responses_to_key(counts, last_key))
+        with self._lock:
+            entries[key] = moves
+            if len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.evictions += 1
+        return moves
+
+    def clear(self):
+        """清空条目和计数"""
+        with self._lock:
+            self._entries.clear()
+            self.probes = self.hits = self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    def memory_bytes(self) -> int:
+        """条目占用内存的估计值（键、值元组和字典槽位；Move对象是共享的，不计入）"""
+        with self._lock:
+            entries = self._entries
+            if not entries:
+                return sys.getsizeof(entries)
+            key, moves = next(iter(entries.items()))
+            per_key = sys.getsizeof(key) + sys.getsizeof(key[0])  # 直方图元组长度固定
+            total = sys.getsizeof(entries) + len(entries) * per_key
+            return total + sum(sys.getsizeof(moves) for moves in entries.values())
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "entries": len(self._entries),
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "memory_bytes": self.memory_bytes(),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+MOVE_CACHE = MoveCache()
+
+
+def cached_moves(counts: Sequence[int]) -> Tuple[Move, ...]:
+    """同generate_moves，经过进程内共享的缓存"""
+    return MOVE_CACHE.moves(counts)
+
+
+def cached_responses(counts: Sequence[int], last_key: Tuple[str, int, int]) -> Tuple[Move, ...]:
+    """同generate_responses_to_key，经过进程内共享的缓存"""
+    return MOVE_CACHE.moves(counts, last_key)
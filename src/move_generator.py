@@ -0,0 +1,212 @@
+"""新玩法游戏 - 出牌生成器
+从牌点直方图一次遍历生成所有出牌，PatternAnalyzer和AIPlayer共用。
+
+每一手合法出牌都可以看成一段连续牌点：以main结尾、连续length个牌点、
+每个牌点出width张。单牌/对子/炸弹/氢弹是length=1的特例，
+双王炸弹是小王、大王两个牌点各一张。
+"""
+
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Union
+from .card import Card, Suit
+from .hand import Hand
+from .card_mask import NUM_RANKS, RANKS, SMALL_JOKER_INDEX, BIG_JOKER_INDEX, TWO_INDEX
+from .pattern_analyzer import Pattern, PatternAnalyzer, PatternType
+
+
+_STRAIGHT_RANKS = TWO_INDEX  # 3..A 可以参与连牌/连队
+_SUITS = list(Suit)
+
+
+class Move(NamedTuple):
+    """一手出牌（只记录牌点，不区分花色）"""
+    pattern_type: str
+    main: int    # 最大牌点索引
+    length: int  # 连续牌点个数
+    width: int   # 每个牌点的张数
+
+    @property
+    def size(self) -> int:
+        """出牌张数"""
+        return self.length * self.width
+
+    @property
+    def ranks(self) -> range:
+        """涉及的牌点索引"""
+        return range(self.main - self.length + 1, self.main + 1)
+
+    @property
+    def key(self) -> Tuple[str, int, int]:
+        """比较大小用的键，与pattern_key一致"""
+        if self.pattern_type == PatternType.INVALID:
+            return (self.pattern_type, -1, self.size)
+        return (self.pattern_type, self.main, self.size)
+
+    @property
+    def rank_sum(self) -> int:
+        """所有牌的rank_value之和（AI策略用来比较大小）"""
+        return self.width * sum(i + 3 for i in self.ranks)
+
+
+def _build_moves() -> Dict[Tuple[int, int, int], Move]:
+    """预先构造所有出牌，牌型以PatternAnalyzer的判定为准"""
+    moves = {}
+
+    def add(main: int, length: int, width: int):
+        cards = [Card(suit, RANKS[i]) for i in range(main - length + 1, main + 1)
+                 for suit in _SUITS[:width]]
+        pattern = PatternAnalyzer.analyze_cards(cards)
+        if pattern.pattern_type != PatternType.INVALID:
+            moves[(main, length, width)] = Move(pattern.pattern_type, main, length, width)
+
+    for rank_idx in range(SMALL_JOKER_INDEX):
+        for width in range(1, 5):
+            add(rank_idx, 1, width)
+    add(BIG_JOKER_INDEX, 2, 1)
+    for end in range(_STRAIGHT_RANKS):
+        for length in range(2, end + 2):
+            add(end, length, 1)
+            add(end, length, 2)
+
+    return moves
+
+
+MOVES = _build_moves()
+_NO_SAME_TYPE = (PatternType.BOMB, PatternType.HYDROGEN_BOMB, PatternType.DOUBLE_JOKER, PatternType.INVALID)
+DOUBLE_JOKER_MOVE = MOVES[(BIG_JOKER_INDEX, 2, 1)]
+
+
+def generate_moves(counts: Sequence[int]) -> List[Move]:
+    """从牌点直方图生成所有出牌
+
+    顺序为：单牌、对子、炸弹、氢弹、双王炸弹、连牌、连队，同类按牌点升序。
+    """
+    moves = MOVES
+    singles, pairs, bombs, hydrogen = [], [], [], []
+    for rank_idx in range(SMALL_JOKER_INDEX):
+        count = counts[rank_idx]
+        if count:
+            singles.append(moves[(rank_idx, 1, 1)])
+            if count >= 2:
+                pairs.append(moves[(rank_idx, 1, 2)])
+                if count >= 3:
+                    bombs.append(moves[(rank_idx, 1, 3)])
+                    if count >= 4:
+                        hydrogen.append(moves[(rank_idx, 1, 4)])
+
+    result = singles + pairs + bombs + hydrogen
+    if counts[SMALL_JOKER_INDEX] and counts[BIG_JOKER_INDEX]:
+        result.append(DOUBLE_JOKER_MOVE)
+
+    # 连牌（≥3张）和连队（≥2对）：从每个起点向后延伸
+    straight_pairs = []
+    for start in range(_STRAIGHT_RANKS - 1):
+        end = start
+        while end < _STRAIGHT_RANKS and counts[end]:
+            length = end - start + 1
+            if length >= 3:
+                result.append(moves[(end, length, 1)])
+            end += 1
+        end = start
+        while end < _STRAIGHT_RANKS and counts[end] >= 2:
+            length = end - start + 1
+            if length >= 2:
+                straight_pairs.append(moves[(end, length, 2)])
+            end += 1
+    result.extend(straight_pairs)
+
+    return result
+
+
+def pattern_key(pattern: Pattern) -> Tuple[str, int, int]:
+    """Pattern -> 比较大小用的键 (牌型, 主牌点索引, 张数)，没有主牌点时为-1"""
+    main = pattern.main_rank.rank_value - 3 if pattern.main_rank else -1
+    return (pattern.pattern_type, main, pattern.size)
+
+
+def generate_responses(counts: Sequence[int], last_pattern: Pattern) -> List[Move]:
+    """只生成能压过last_pattern的出牌
+
+    与 [m for m in generate_moves(counts) if 能压过] 的结果和顺序相同，
+    但只检查Pattern.can_beat允许的几种情况：同牌型同张数且主牌点大1、
+    2压单牌/对子、炸弹/氢弹/双王炸弹。
+    """
+    return generate_responses_to_key(counts, pattern_key(last_pattern))
+
+
+def generate_responses_to_key(counts: Sequence[int], last_key: Tuple[str, int, int]) -> List[Move]:
+    """同generate_responses，上家出牌用pattern_key/Move.key表示"""
+    last_type, last_main, size = last_key
+    if last_type == PatternType.DOUBLE_JOKER:
+        if counts[SMALL_JOKER_INDEX] and counts[BIG_JOKER_INDEX]:
+            return [DOUBLE_JOKER_MOVE]
+        return []
+
+    moves = MOVES
+    same_type, runs = [], []
+    if last_type not in _NO_SAME_TYPE and last_main >= 0:
+        candidates = [last_main + 1]
+        if last_type in (PatternType.SINGLE, PatternType.PAIR) and last_main != TWO_INDEX:
+            candidates.append(TWO_INDEX)
+        for main in sorted(set(candidates)):
+            for width in (1, 2, 3, 4):
+                if size % width:
+                    continue
+                move = moves.get((main, size // width, width))
+                if (move is not None and move.pattern_type == last_type
+                        and all(counts[i] >= width for i in move.ranks)):
+                    (runs if move.length > 1 else same_type).append(move)
+
+    if last_type != PatternType.HYDROGEN_BOMB:
+        if last_type != PatternType.BOMB:
+            same_type.extend(moves[(i, 1, 3)] for i in range(SMALL_JOKER_INDEX) if counts[i] >= 3)
+        same_type.extend(moves[(i, 1, 4)] for i in range(SMALL_JOKER_INDEX) if counts[i] >= 4)
+    if counts[SMALL_JOKER_INDEX] and counts[BIG_JOKER_INDEX]:
+        same_type.append(DOUBLE_JOKER_MOVE)
+
+    return same_type + runs
+
+
+def rank_buckets(cards: Sequence[Card]) -> List[List[Card]]:
+    """按牌点索引分桶，桶内保持原顺序"""
+    buckets = [[] for _ in range(NUM_RANKS)]
+    for card in cards:
+        buckets[card.rank_value - 3].append(card)
+    return buckets
+
+
+def bucket_counts(buckets: Sequence[Sequence[Card]]) -> List[int]:
+    """分桶 -> 牌点直方图"""
+    return [len(bucket) for bucket in buckets]
+
+
+def move_cards(move: Move, buckets: Sequence[Sequence[Card]]) -> List[Card]:
+    """从分桶中取出一手出牌对应的牌（每个牌点取前width张）"""
+    cards = []
+    for rank_idx in move.ranks:
+        cards.extend(buckets[rank_idx][:move.width])
+    return cards
+
+
+def move_to_pattern(move: Move, buckets: Sequence[Sequence[Card]]) -> Pattern:
+    """把出牌落到具体的牌上，构造已分类的Pattern"""
+    return Pattern(move_cards(move, buckets), move.pattern_type, RANKS[move.main])
+
+
+def _buckets_and_counts(hand: Union[Hand, Sequence[Card]]) -> Tuple[List[List[Card]], List[int]]:
+    """Hand直接使用其增量维护的分桶和直方图，普通列表临时分桶"""
+    if isinstance(hand, Hand):
+        return hand.buckets, hand.counts
+    buckets = rank_buckets(hand)
+    return buckets, bucket_counts(buckets)
+
+
+def generate_patterns(hand: Union[Hand, Sequence[Card]]) -> List[Pattern]:
+    """生成手牌中所有出牌的Pattern"""
+    buckets, counts = _buckets_and_counts(hand)
+    return [move_to_pattern(move, buckets) for move in generate_moves(counts)]
+
+
+def generate_response_patterns(hand: Union[Hand, Sequence[Card]], last_pattern: Pattern) -> List[Pattern]:
+    """生成手牌中所有能压过last_pattern的Pattern"""
+    buckets, counts = _buckets_and_counts(hand)
+    return [move_to_pattern(move, buckets) for move in generate_responses(counts, last_pattern)]
@@ -6,6 +6,7 @@
 from typing import List, Dict, Optional, Tuple
 from collections import Counter
 from .card import Card, Rank
+from .card_mask import NUM_RANKS, RANKS, SMALL_JOKER_INDEX, BIG_JOKER_INDEX, TWO_INDEX, mask_to_cards
 
 
 class PatternType:
@@ -20,14 +21,38 @@ class PatternType:
     INVALID = "无效"
 
 
+# 牌型 -> 小整数编号，比较大小时只用编号
+PATTERN_TYPES: Tuple[str, ...] = (
+    PatternType.SINGLE, PatternType.PAIR, PatternType.STRAIGHT, PatternType.STRAIGHT_PAIRS,
+    PatternType.BOMB, PatternType.HYDROGEN_BOMB, PatternType.DOUBLE_JOKER, PatternType.INVALID,
+)
+PATTERN_TYPE_IDS: Dict[str, int] = {pattern_type: i for i, pattern_type in enumerate(PATTERN_TYPES)}
+
+
 class Pattern:
-    """牌型类"""
+    """牌型类
+
+    构造时复制传入的列表，cards在第一次读取时才排序（按大小）。
+    """
+    
+    __slots__ = ("_cards", "_sorted", "pattern_type", "main_rank", "size", "type_id", "beat_id")
     
     def __init__(self, cards: List[Card], pattern_type: str, main_rank: Optional[Rank] = None):
-        self.cards = sorted(cards)  # 按大小排序
+        self._cards = list(cards)
+        self._sorted = False
         self.pattern_type = pattern_type
         self.main_rank = main_rank  # 主要牌面（用于比较大小）
         self.size = len(cards)
+        self.type_id = PATTERN_TYPE_IDS.get(pattern_type)
+        self.beat_id = beat_id(self.type_id, self.size, main_rank.rank_value - 3 if main_rank else _NO_MAIN)
+    
+    @property
+    def cards(self) -> List[Card]:
+        """按大小排序的牌"""
+        if not self._sorted:
+            self._cards.sort()
+            self._sorted = True
+        return self._cards
     
     def __str__(self):
         cards_str = " ".join(str(card) for card in self.cards)
@@ -37,7 +62,15 @@ class Pattern:
         return self.__str__()
     
     def can_beat(self, other: 'Pattern') -> bool:
-        """判断是否能压过另一个牌型"""
+        """判断是否能压过另一个牌型（查压制表）"""
+        if not other:
+            return True
+        if self.beat_id is not None and other.beat_id is not None:
+            return _DOMINANCE[self.beat_id * _BEAT_COUNT + other.beat_id] == 1
+        return self._can_beat_rules(other)
+    
+    def _can_beat_rules(self, other: 'Pattern') -> bool:
+        """逐条判断能否压过另一个牌型（压制表的参照实现）"""
         if not other:
             return True
         
@@ -91,7 +124,28 @@ class PatternAnalyzer:
     
     @staticmethod
     def analyze_cards(cards: List[Card]) -> Pattern:
-        """分析给定牌组的牌型"""
+        """分析给定牌组的牌型（查表，未命中时走逐条判断）"""
+        if not cards:
+            return Pattern([], PatternType.INVALID)
+        
+        signature = 0
+        for card in cards:
+            signature += _RANK_WEIGHTS[card.rank_value]
+        
+        entry = _PATTERN_TABLE.get(signature * _SIZE_SLOTS + len(cards))
+        if entry is not None:
+            return Pattern(cards, entry[0], entry[1])
+        
+        return PatternAnalyzer._analyze_cards_slow(cards)
+    
+    @staticmethod
+    def lookup_counts(counts: List[int]) -> Optional[Tuple[str, Rank]]:
+        """按15格牌点计数向量查表，返回(牌型, 主牌点)，非法或超过12张返回None"""
+        return _PATTERN_TABLE.get(_signature(counts) * _SIZE_SLOTS + sum(counts))
+    
+    @staticmethod
+    def _analyze_cards_slow(cards: List[Card]) -> Pattern:
+        """逐条判断牌型（查表的参照实现）"""
         if not cards:
             return Pattern([], PatternType.INVALID)
         
@@ -133,6 +187,11 @@ class PatternAnalyzer:
         
         return Pattern(cards, PatternType.INVALID)
     
+    @staticmethod
+    def analyze_mask(mask: int) -> Pattern:
+        """分析掩码表示的牌组的牌型"""
+        return PatternAnalyzer.analyze_cards(mask_to_cards(mask))
+    
     @staticmethod
     def _is_straight(ranks: List[Rank]) -> bool:
         """检查是否为连牌（连续≥3张，不能有2和王）"""
@@ -174,172 +233,191 @@ class PatternAnalyzer:
     
     @staticmethod
     def find_all_patterns(hand: List[Card]) -> List[Pattern]:
-        """找出手牌中所有可能的牌型组合"""
-        patterns = []
-        hand = sorted(hand)
-        
-        # 单张
-        for card in hand:
-            pattern = PatternAnalyzer.analyze_cards([card])
-            if pattern.pattern_type != PatternType.INVALID:
-                patterns.append(pattern)
-        
-        # 对子
-        patterns.extend(PatternAnalyzer._find_pairs(hand))
-        
-        # 三张
-        patterns.extend(PatternAnalyzer._find_triples(hand))
-        
-        # 四张
-        patterns.extend(PatternAnalyzer._find_hydrogen_bombs(hand))
-        
-        # 双王炸弹
-        double_joker = PatternAnalyzer._find_double_joker(hand)
-        if double_joker:
-            patterns.append(double_joker)
-        
-        # 连牌
-        patterns.extend(PatternAnalyzer._find_straights(hand))
-        
-        # 连队
-        patterns.extend(PatternAnalyzer._find_straight_pairs(hand))
-        
-        return patterns
+        """找出手牌中所有可能的牌型组合（同牌点只取一种花色组合）
+        
+        连续的对子标成连队（与原来的枚举一致）；analyze_cards和出牌表把它们当作连牌，
+        实际出牌时按连牌比较大小。
+        """
+        from .move_generator import bucket_counts, generate_moves, rank_buckets
+        buckets = rank_buckets(hand)
+        return _listed_patterns(buckets, generate_moves(bucket_counts(buckets)))
     
     @staticmethod
-    def _find_pairs(hand: List[Card]) -> List[Pattern]:
-        """找出所有对子"""
-        pairs = []
-        rank_groups = PatternAnalyzer._group_by_rank(hand)
+    def find_valid_plays(hand: List[Card], last_pattern: Optional[Pattern] = None) -> List[Pattern]:
+        """找出可以出的牌型（能压过上家或首次出牌）
         
-        for rank, cards in rank_groups.items():
-            if len(cards) >= 2:
-                pairs.append(Pattern(cards[:2], PatternType.PAIR, rank))
+        与按can_beat过滤find_all_patterns的结果相同（连队的标注也相同）。
+        """
+        from .move_generator import bucket_counts, generate_responses_to_key, pattern_key, rank_buckets
         
-        return pairs
+        if not last_pattern:
+            # 首次出牌，可以出任意牌型
+            return PatternAnalyzer.find_all_patterns(hand)
+        
+        # 只生成能压过上家的牌型；出牌表里连队也按连牌生成，再只留下与上家标注相同的连续出牌
+        buckets = rank_buckets(hand)
+        last_type, last_main, size = pattern_key(last_pattern)
+        pairs = last_type == PatternType.STRAIGHT_PAIRS
+        if pairs:
+            last_type = PatternType.STRAIGHT
+        moves = generate_responses_to_key(bucket_counts(buckets), (last_type, last_main, size))
+        return _listed_patterns(buckets, [move for move in moves
+                                          if move.pattern_type != PatternType.STRAIGHT or (move.width == 2) == pairs])
+
+
+def _listed_patterns(buckets: List[List[Card]], moves) -> List[Pattern]:
+    """把出牌落到具体的牌上，每个牌点2张的连牌标成连队"""
+    from .move_generator import move_cards
+    patterns = []
+    for move in moves:
+        pattern_type = move.pattern_type
+        if pattern_type == PatternType.STRAIGHT and move.width == 2:
+            pattern_type = PatternType.STRAIGHT_PAIRS
+        patterns.append(Pattern(move_cards(move, buckets), pattern_type, RANKS[move.main]))
+    return patterns
+
+
+# ---------------------------------------------------------------------------
+# 牌型查找表
+# 以牌点计数向量的5进制编码（每个牌点最多4张）作为签名，再拼上张数作为键。
+# 张数一起参与编码，可以保证计数超过4导致的进位不会撞上合法键。
+# ---------------------------------------------------------------------------
+
+_SIZE_SLOTS = 64
+_RANK_WEIGHTS = [0, 0, 0] + [5 ** i for i in range(NUM_RANKS)]  # 按rank_value索引
+_RANK_LIMITS = [4] * TWO_INDEX + [4, 1, 1]
+_STRAIGHT_RANKS = TWO_INDEX  # 3..A 可以参与连牌/连队
+_MAX_TABLE_CARDS = 12        # 查表覆盖的最大出牌张数，更大的出牌走逐条判断
+
+
+def _signature(counts: List[int]) -> int:
+    """牌点计数向量 -> 5进制签名"""
+    signature = 0
+    for i, count in enumerate(counts):
+        signature += count * 5 ** i
+    return signature
+
+
+def _build_pattern_table() -> Dict[int, Tuple[str, Rank]]:
+    """枚举不超过12张的所有合法出牌，建立 签名 -> (牌型, 主牌点) 的表
     
-    @staticmethod
-    def _find_triples(hand: List[Card]) -> List[Pattern]:
-        """找出所有三张"""
-        triples = []
-        rank_groups = PatternAnalyzer._group_by_rank(hand)
-        
-        for rank, cards in rank_groups.items():
-            if len(cards) >= 3:
-                triples.append(Pattern(cards[:3], PatternType.BOMB, rank))
-        
-        return triples
+    与逐条判断保持一致：连牌只检查去重后的牌点是否连续，
+    所以3344、33345这类牌点连续的组合同样判为连牌。
+    """
+    table = {}
     
-    @staticmethod
-    def _find_hydrogen_bombs(hand: List[Card]) -> List[Pattern]:
-        """找出所有氢弹"""
-        hydrogen_bombs = []
-        rank_groups = PatternAnalyzer._group_by_rank(hand)
-        
-        for rank, cards in rank_groups.items():
-            if len(cards) == 4:
-                hydrogen_bombs.append(Pattern(cards, PatternType.HYDROGEN_BOMB, rank))
-        
-        return hydrogen_bombs
+    def add(counts: List[int], pattern_type: str, main_index: int):
+        key = _signature(counts) * _SIZE_SLOTS + sum(counts)
+        table[key] = (pattern_type, RANKS[main_index])
     
-    @staticmethod
-    def _find_double_joker(hand: List[Card]) -> Optional[Pattern]:
-        """找出双王炸弹"""
-        jokers = [card for card in hand if card.rank in [Rank.SMALL_JOKER, Rank.BIG_JOKER]]
-        if len(jokers) == 2:
-            return Pattern(jokers, PatternType.DOUBLE_JOKER, Rank.BIG_JOKER)
-        return None
+    # 单牌、对子、炸弹、氢弹（王不能单出，也凑不成对子）
+    for rank_idx in range(SMALL_JOKER_INDEX):
+        for count, pattern_type in ((1, PatternType.SINGLE), (2, PatternType.PAIR),
+                                    (3, PatternType.BOMB), (4, PatternType.HYDROGEN_BOMB)):
+            counts = [0] * NUM_RANKS
+            counts[rank_idx] = count
+            add(counts, pattern_type, rank_idx)
     
-    @staticmethod
-    def _find_straights(hand: List[Card]) -> List[Pattern]:
-        """找出所有连牌"""
-        straights = []
-        
-        # 过滤掉2和王
-        valid_cards = [card for card in hand if card.rank.can_be_in_straight()]
-        
-        if len(valid_cards) < 3:
-            return straights
-        
-        # 按牌点分组
-        rank_groups = PatternAnalyzer._group_by_rank(valid_cards)
-        available_ranks = sorted(rank_groups.keys(), key=lambda x: x.rank_value)
-        
-        # 寻找连续的牌点
-        for start_idx in range(len(available_ranks)):
-            for length in range(3, len(available_ranks) - start_idx + 1):
-                end_idx = start_idx + length
-                consecutive_ranks = available_ranks[start_idx:end_idx]
-                
-                # 检查是否连续
-                if PatternAnalyzer._is_straight(consecutive_ranks):
-                    # 构建连牌
-                    straight_cards = []
-                    for rank in consecutive_ranks:
-                        straight_cards.append(rank_groups[rank][0])  # 每个牌点取一张
-                    
-                    straights.append(Pattern(straight_cards, PatternType.STRAIGHT, max(consecutive_ranks)))
-        
-        return straights
+    # 双王炸弹
+    counts = [0] * NUM_RANKS
+    counts[SMALL_JOKER_INDEX] = counts[BIG_JOKER_INDEX] = 1
+    add(counts, PatternType.DOUBLE_JOKER, BIG_JOKER_INDEX)
     
-    @staticmethod
-    def _find_straight_pairs(hand: List[Card]) -> List[Pattern]:
-        """找出所有连队"""
-        straight_pairs = []
-        
-        # 过滤掉2和王
-        valid_cards = [card for card in hand if card.rank.can_be_in_straight()]
-        
-        if len(valid_cards) < 4:
-            return straight_pairs
-        
-        # 按牌点分组
-        rank_groups = PatternAnalyzer._group_by_rank(valid_cards)
-        
-        # 只考虑有对子的牌点
-        pair_ranks = [rank for rank, cards in rank_groups.items() if len(cards) >= 2]
-        pair_ranks = sorted(pair_ranks, key=lambda x: x.rank_value)
-        
-        # 寻找连续的对子
-        for start_idx in range(len(pair_ranks)):
-            for length in range(2, len(pair_ranks) - start_idx + 1):
-                end_idx = start_idx + length
-                consecutive_ranks = pair_ranks[start_idx:end_idx]
-                
-                # 检查是否连续
-                if PatternAnalyzer._is_straight(consecutive_ranks):
-                    # 构建连队
-                    straight_pair_cards = []
-                    for rank in consecutive_ranks:
-                        straight_pair_cards.extend(rank_groups[rank][:2])  # 每个牌点取两张
-                    
-                    straight_pairs.append(Pattern(straight_pair_cards, PatternType.STRAIGHT_PAIRS, max(consecutive_ranks)))
-        
-        return straight_pairs
+    # 连牌：至少两个连续牌点（3..A），每个牌点1~4张，合计≥3张
+    def extend_run(end: int, signature: int, total: int, run_length: int):
+        for count in range(1, 5):
+            if total + count > _MAX_TABLE_CARDS:
+                break
+            run_signature = signature + count * 5 ** end
+            if run_length >= 1 and total + count >= 3:
+                table[run_signature * _SIZE_SLOTS + total + count] = (PatternType.STRAIGHT, RANKS[end])
+            if end + 1 < _STRAIGHT_RANKS:
+                extend_run(end + 1, run_signature, total + count, run_length + 1)
     
-    @staticmethod
-    def _group_by_rank(cards: List[Card]) -> Dict[Rank, List[Card]]:
-        """按牌点分组"""
-        groups = {}
-        for card in cards:
-            if card.rank not in groups:
-                groups[card.rank] = []
-            groups[card.rank].append(card)
-        return groups
+    for start in range(_STRAIGHT_RANKS):
+        extend_run(start, 0, 0, 0)
     
-    @staticmethod
-    def find_valid_plays(hand: List[Card], last_pattern: Optional[Pattern] = None) -> List[Pattern]:
-        """找出可以出的牌型（能压过上家或首次出牌）"""
-        all_patterns = PatternAnalyzer.find_all_patterns(hand)
-        
-        if not last_pattern:
-            # 首次出牌，可以出任意牌型
-            return all_patterns
-        
-        # 找出能压过上家的牌型
-        valid_patterns = []
-        for pattern in all_patterns:
-            if pattern.can_beat(last_pattern):
-                valid_patterns.append(pattern)
-        
-        return valid_patterns
\ No newline at end of file
+    return table
+
+
+_PATTERN_TABLE = _build_pattern_table()
+
+
+# ---------------------------------------------------------------------------
+# 压制表
+# 把(牌型编号, 张数, 主牌点索引)驻留成连续的小整数，
+# 预先算好任意两个出牌之间能否压过，can_beat只需查一次表。
+# 没有主牌点（无效牌型）时主牌点索引记为_NO_MAIN。
+# ---------------------------------------------------------------------------
+
+_NO_MAIN = NUM_RANKS
+_INVALID_ID = PATTERN_TYPE_IDS[PatternType.INVALID]
+_MAX_STRAIGHT_CARDS = 4 * _STRAIGHT_RANKS
+
+
+def _beat_keys() -> List[Tuple[int, int, int]]:
+    """analyze_cards能给出的所有(牌型编号, 张数, 主牌点索引)"""
+    ids = PATTERN_TYPE_IDS
+    keys = []
+    for rank_idx in range(SMALL_JOKER_INDEX):
+        for size, pattern_type in ((1, PatternType.SINGLE), (2, PatternType.PAIR),
+                                   (3, PatternType.BOMB), (4, PatternType.HYDROGEN_BOMB)):
+            keys.append((ids[pattern_type], size, rank_idx))
+    keys.append((ids[PatternType.DOUBLE_JOKER], 2, BIG_JOKER_INDEX))
+    # 连牌：牌点连续、每个牌点1~4张、合计≥3张；连队：连续≥2对
+    for end in range(1, _STRAIGHT_RANKS):
+        for size in range(3, 4 * (end + 1) + 1):
+            keys.append((ids[PatternType.STRAIGHT], size, end))
+        for length in range(2, end + 2):
+            keys.append((ids[PatternType.STRAIGHT_PAIRS], 2 * length, end))
+    for size in range(_MAX_STRAIGHT_CARDS + 7):
+        keys.append((_INVALID_ID, size, _NO_MAIN))
+    return keys
+
+
+def _build_dominance(keys: List[Tuple[int, int, int]]) -> bytearray:
+    """按Pattern._can_beat_rules的规则逐行填表：table[a * N + b]表示a能否压过b"""
+    ids = PATTERN_TYPE_IDS
+    double_joker, hydrogen, bomb = ids[PatternType.DOUBLE_JOKER], ids[PatternType.HYDROGEN_BOMB], ids[PatternType.BOMB]
+    two_rule_types = (ids[PatternType.SINGLE], ids[PatternType.PAIR])
+    count = len(keys)
+
+    # 不同牌型之间只看牌型：每种牌型一行模板
+    bombs_above = {double_joker: (), hydrogen: (hydrogen, double_joker), bomb: (bomb, hydrogen, double_joker)}
+    rows = {}
+    for type_id in range(len(PATTERN_TYPES)):
+        if type_id in bombs_above:
+            row = bytes(0 if other[0] in bombs_above[type_id] else 1 for other in keys)
+        else:
+            row = bytes(count)
+        rows[type_id] = row
+
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    for i, (type_id, size, _) in enumerate(keys):
+        groups.setdefault((type_id, size), []).append(i)
+
+    table = bytearray(count * count)
+    for a, (type_id, size, main) in enumerate(keys):
+        table[a * count:(a + 1) * count] = rows[type_id]
+        if type_id in bombs_above or main == _NO_MAIN:
+            continue
+        # 相同牌型、相同张数：主牌点大1，或2压非2的单牌/对子
+        for b in groups[(type_id, size)]:
+            other_main = keys[b][2]
+            if other_main == _NO_MAIN:
+                continue
+            beats = main == other_main + 1 or (main == TWO_INDEX and other_main != TWO_INDEX
+                                               and type_id in two_rule_types)
+            table[a * count + b] = 1 if beats else 0
+    return table
+
+
+_BEAT_KEYS = _beat_keys()
+_BEAT_IDS: Dict[Tuple[int, int, int], int] = {key: i for i, key in enumerate(_BEAT_KEYS)}
+_BEAT_COUNT = len(_BEAT_KEYS)
+_DOMINANCE = _build_dominance(_BEAT_KEYS)
+
+
+def beat_id(type_id: int, size: int, main_index: int) -> Optional[int]:
+    """(牌型编号, 张数, 主牌点索引)在压制表中的编号，不在表中时返回None"""
+    return _BEAT_IDS.get((type_id, size, main_index))
@@ -1,9 +1,20 @@
 """玩家类 - 人类玩家和AI玩家"""
 
 import random
-from typing import List, Optional
+import time
+from typing import TYPE_CHECKING, List, Optional
 from .card import Card
-from .pattern_analyzer import PatternAnalyzer, Pattern
+from .card_mask import cards_to_mask
+from .hand import Hand
+from .pattern_analyzer import PatternAnalyzer, Pattern, PatternType
+from .events import EventSink, ConsoleSink, GameEvent
+from .move_generator import move_cards, pattern_key
+from .move_cache import cached_moves, cached_responses
+from .game_state import GameState
+from .endgame import EndgameSolver, SearchLimitExceeded
+
+if TYPE_CHECKING:  # book依赖env等模块，只在类型检查时导入
+    from .book import BookEntry, OpeningBook
 
 
 class Player:
@@ -11,22 +22,29 @@ class Player:
     
     def __init__(self, name: str):
         self.name = name
-        self.hand: List[Card] = []
+        self.hand = Hand()
+        self.game = None  # 所在的对局，由join设置
+        self.seat = -1
+        self.metrics = None  # 对局的分阶段性能统计，由join设置
+    
+    def join(self, game, seat: int):
+        """开局时由NewGame调用，记录所在的对局和座位"""
+        self.game = game
+        self.seat = seat
+        self.metrics = game.metrics
     
     def add_card(self, card: Card):
         """添加一张牌到手牌"""
-        self.hand.append(card)
-        self.hand.sort()
+        self.hand.add(card)
     
     def add_cards(self, cards: List[Card]):
         """添加多张牌到手牌"""
-        self.hand.extend(cards)
-        self.hand.sort()
+        for card in cards:
+            self.hand.add(card)
     
     def remove_card(self, card: Card):
         """从手牌中移除一张牌"""
-        if card in self.hand:
-            self.hand.remove(card)
+        self.hand.remove(card)
     
     def remove_cards(self, cards: List[Card]):
         """从手牌中移除多张牌"""
@@ -84,20 +102,9 @@ class HumanPlayer(Player):
                 # 获取选择的牌
                 selected_cards = [self.hand[i] for i in indices]
                 
-                # 检查王是否能单出
-                if len(selected_cards) == 1 and not selected_cards[0].can_be_single():
-                    print("王不能单出，请重新选择")
-                    continue
-                
-                # 分析牌型
-                pattern = PatternAnalyzer.analyze_cards(selected_cards)
-                if not pattern:
-                    print("无效的牌型，请重新选择")
-                    continue
-                
-                # 检查是否能压过上家
-                if last_pattern and not pattern.can_beat(last_pattern):
-                    print(f"无法压过上家的 {last_pattern}，请重新选择")
+                error = self.check_play(selected_cards, last_pattern)
+                if error:
+                    print(error)
                     continue
                 
                 return selected_cards
@@ -106,18 +113,72 @@ class HumanPlayer(Player):
                 print("输入格式错误，请输入数字索引")
             except Exception as e:
                 print(f"出现错误: {e}")
+    
+    @staticmethod
+    def check_play(selected_cards: List[Card], last_pattern: Optional[Pattern]) -> Optional[str]:
+        """检查选出的牌能否打出，不能时返回提示（终端和网络对局共用）"""
+        if not selected_cards:
+            return "请至少选择一张牌"
+        
+        # 检查王是否能单出
+        if len(selected_cards) == 1 and not selected_cards[0].can_be_single():
+            return "王不能单出，请重新选择"
+        
+        # 分析牌型
+        pattern = PatternAnalyzer.analyze_cards(selected_cards)
+        if not pattern or pattern.pattern_type == PatternType.INVALID:
+            return "无效的牌型，请重新选择"
+        
+        # 检查是否能压过上家
+        if last_pattern and not pattern.can_beat(last_pattern):
+            return f"无法压过上家的 {last_pattern}，请重新选择"
+        return None
 
 
 class AIPlayer(Player):
-    """AI玩家"""
+    """AI玩家
+    
+    endgame_cards不为None时，牌堆抽完且场上剩余总牌数不超过它就改用残局求解器；
+    多于两人时未见过的牌在对手间的分布未知，对endgame_samples次采样的结果求和。
+    book为开局库（人数相同时才使用），庄家的第一手和紧接着的第一次压牌先查库。
+    """
     
-    def __init__(self, name: str, strategy: str = "smart"):
+    def __init__(self, name: str, strategy: str = "smart", sink: Optional[EventSink] = None,
+                 rng: Optional[random.Random] = None, endgame_cards: Optional[int] = None,
+                 endgame_samples: int = 4, book: Optional["OpeningBook"] = None):
         super().__init__(name)
         self.strategy = strategy
+        self.sink = sink if sink is not None else ConsoleSink()
+        self.rng = rng if rng is not None else random.Random()
+        self.endgame_cards = endgame_cards
+        self.endgame_samples = endgame_samples
+        self.endgame_solver: Optional[EndgameSolver] = None
+        self.book = book
     
     def play_turn(self, last_pattern: Optional[Pattern]) -> Optional[List[Card]]:
-        """AI玩家出牌"""
-        print(f"\n{self.name} 思考中...")
+        """AI玩家出牌（对局有性能统计时记录决策耗时）"""
+        metrics = self.metrics
+        if metrics is None:
+            return self._decide(last_pattern)
+        start = time.perf_counter()
+        cards = self._decide(last_pattern)
+        metrics.add_time("ai_decision", time.perf_counter() - start)
+        return cards
+    
+    def _decide(self, last_pattern: Optional[Pattern]) -> Optional[List[Card]]:
+        """选择一手出牌"""
+        self.sink.emit(GameEvent.AI_THINKING, player=self.name)
+        
+        if self._in_endgame():
+            try:
+                return self._play_endgame()
+            except SearchLimitExceeded:
+                pass  # 超出节点上限，退回启发式策略
+        
+        if self.book is not None:
+            entry = self._book_entry(last_pattern)
+            if entry is not None:
+                return sorted(move_cards(entry.move, self.hand.buckets)) if entry.move is not None else None
         
         if last_pattern is None:
             # 首轮出牌，选择最小的牌
@@ -141,156 +202,80 @@ class AIPlayer(Player):
                 # 如果没有能单出的牌，出最小的对子
                 return self._find_smallest_pair() or [self.hand[0]]
     
+    def _book_entry(self, last_pattern: Optional[Pattern]) -> Optional["BookEntry"]:
+        """开局库中当前局面的记录：只查庄家的第一手和紧接着的第一次压牌"""
+        game = self.game
+        if game is None or game.round_count or game.player_count != self.book.player_count:
+            return None
+        if last_pattern is None:
+            return self.book.lookup(self.hand.counts) if not game.played_mask else None
+        if (game.consecutive_passes or game.last_player_index != game.dealer_index
+                or game.played_mask != cards_to_mask(last_pattern.cards)):
+            return None
+        return self.book.lookup(self.hand.counts, pattern_key(last_pattern))
+    
+    def _in_endgame(self) -> bool:
+        """是否改用残局求解器"""
+        game = self.game
+        if self.endgame_cards is None or game is None or game.deck:
+            return False
+        return sum(len(player.hand) for player in game.players) <= self.endgame_cards
+    
+    def _play_endgame(self) -> Optional[List[Card]]:
+        """残局求解：选总得分最高的出牌"""
+        if self.endgame_solver is None:
+            self.endgame_solver = EndgameSolver()
+        samples = 1 if len(self.game.players) == 2 else self.endgame_samples
+        totals = {}
+        for _ in range(samples):
+            state = GameState.from_game(self.game, self.seat, self.rng)
+            for move, value in self.endgame_solver.solve(state).items():
+                totals[move] = totals.get(move, 0) + value
+        move = max(totals, key=totals.get)
+        return move_cards(move, self.hand.buckets) if move is not None else None
+    
     def _find_smallest_pair(self) -> Optional[List[Card]]:
         """找到最小的对子"""
-        for i in range(len(self.hand)):
-            for j in range(i + 1, len(self.hand)):
-                if self.hand[i].rank == self.hand[j].rank:
-                    return [self.hand[i], self.hand[j]]
+        for bucket in self.hand.buckets:
+            if len(bucket) >= 2:
+                return bucket[:2]
         return None
     
     def _try_beat_pattern(self, last_pattern: Pattern) -> Optional[List[Card]]:
         """尝试压过指定牌型"""
         possible_plays = self._find_beating_patterns(last_pattern)
+        if self.metrics is not None:
+            self.metrics.add_count("response_candidates", len(possible_plays))
         
         if not possible_plays:
             return None  # 跳过
         
         if self.strategy == "conservative":
             # 保守策略：选择最小的能压过的牌
-            return min(possible_plays, key=lambda cards: sum(card.rank.rank_value for card in cards))
+            return min(possible_plays, key=lambda cards: sum(card.rank_value for card in cards))
         elif self.strategy == "aggressive":
             # 激进策略：选择最大的牌
-            return max(possible_plays, key=lambda cards: sum(card.rank.rank_value for card in cards))
+            return max(possible_plays, key=lambda cards: sum(card.rank_value for card in cards))
         else:
             # 智能策略：综合考虑
             return self._smart_choice(possible_plays, last_pattern)
     
     def _find_beating_patterns(self, last_pattern: Pattern) -> List[List[Card]]:
         """找出所有能压过指定牌型的组合"""
-        possible_plays = []
-        
-        # 生成所有可能的牌型组合
-        all_patterns = self._generate_all_patterns()
-        
-        for cards in all_patterns:
-            pattern = PatternAnalyzer.analyze_cards(cards)
-            if pattern and pattern.can_beat(last_pattern):
-                possible_plays.append(cards)
-        
-        return possible_plays
+        buckets = self.hand.buckets
+        return [sorted(move_cards(move, buckets))
+                for move in cached_responses(self.hand.counts, pattern_key(last_pattern))]
     
     def _generate_all_patterns(self) -> List[List[Card]]:
         """生成所有可能的牌型组合"""
-        patterns = []
-        
-        # 单牌（只有能单出的牌）
-        for card in self.hand:
-            if card.can_be_single():
-                patterns.append([card])
-        
-        # 对子
-        for i in range(len(self.hand)):
-            for j in range(i + 1, len(self.hand)):
-                if self.hand[i].rank == self.hand[j].rank:
-                    patterns.append([self.hand[i], self.hand[j]])
-        
-        # 三张
-        for i in range(len(self.hand)):
-            for j in range(i + 1, len(self.hand)):
-                for k in range(j + 1, len(self.hand)):
-                    if (self.hand[i].rank == self.hand[j].rank == self.hand[k].rank):
-                        patterns.append([self.hand[i], self.hand[j], self.hand[k]])
-        
-        # 氢弹（四张）
-        for i in range(len(self.hand)):
-            for j in range(i + 1, len(self.hand)):
-                for k in range(j + 1, len(self.hand)):
-                    for l in range(k + 1, len(self.hand)):
-                        if (self.hand[i].rank == self.hand[j].rank == 
-                            self.hand[k].rank == self.hand[l].rank):
-                            patterns.append([self.hand[i], self.hand[j], 
-                                           self.hand[k], self.hand[l]])
-        
-        # 连牌（顺子）
-        patterns.extend(self._find_straights())
-        
-        # 连队（连续对子）
-        patterns.extend(self._find_straight_pairs())
-        
-        # 双王炸弹
-        jokers = [card for card in self.hand if card.rank.name in ['SMALL_JOKER', 'BIG_JOKER']]
-        if len(jokers) == 2:
-            patterns.append(jokers)
-        
-        return patterns
-    
-    def _find_straights(self) -> List[List[Card]]:
-        """找出所有可能的连牌"""
-        straights = []
-        valid_cards = [card for card in self.hand if card.can_be_in_straight()]
-        
-        # 按点数分组
-        rank_groups = {}
-        for card in valid_cards:
-            rank = card.rank
-            if rank not in rank_groups:
-                rank_groups[rank] = []
-            rank_groups[rank].append(card)
-        
-        # 找连续的点数
-        sorted_ranks = sorted(rank_groups.keys(), key=lambda r: r.rank_value)
-        
-        for start_idx in range(len(sorted_ranks)):
-            for length in range(5, len(sorted_ranks) - start_idx + 1):  # 至少5张
-                consecutive_ranks = sorted_ranks[start_idx:start_idx + length]
-                
-                # 检查是否连续
-                if all(consecutive_ranks[i].rank_value == consecutive_ranks[i-1].rank_value + 1 
-                       for i in range(1, len(consecutive_ranks))):
-                    # 每个点数选一张牌
-                    straight_cards = [rank_groups[rank][0] for rank in consecutive_ranks]
-                    straights.append(straight_cards)
-        
-        return straights
-    
-    def _find_straight_pairs(self) -> List[List[Card]]:
-        """找出所有可能的连队"""
-        straight_pairs = []
-        valid_cards = [card for card in self.hand if card.can_be_in_straight()]
-        
-        # 按点数分组
-        rank_groups = {}
-        for card in valid_cards:
-            rank = card.rank
-            if rank not in rank_groups:
-                rank_groups[rank] = []
-            rank_groups[rank].append(card)
-        
-        # 只保留有对子的点数
-        pair_ranks = {rank: cards for rank, cards in rank_groups.items() if len(cards) >= 2}
-        
-        # 找连续的对子
-        sorted_ranks = sorted(pair_ranks.keys(), key=lambda r: r.rank_value)
-        
-        for start_idx in range(len(sorted_ranks)):
-            for length in range(3, len(sorted_ranks) - start_idx + 1):  # 至少3对
-                consecutive_ranks = sorted_ranks[start_idx:start_idx + length]
-                
-                # 检查是否连续
-                if all(consecutive_ranks[i].rank_value == consecutive_ranks[i-1].rank_value + 1 
-                       for i in range(1, len(consecutive_ranks))):
-                    # 每个点数选两张牌
-                    pair_cards = []
-                    for rank in consecutive_ranks:
-                        pair_cards.extend(pair_ranks[rank][:2])
-                    straight_pairs.append(pair_cards)
-        
-        return straight_pairs
+        buckets = self.hand.buckets
+        return [sorted(move_cards(move, buckets)) for move in cached_moves(self.hand.counts)]
     
     def _find_best_pattern(self) -> List[Card]:
         """找出最佳牌型"""
         all_patterns = self._generate_all_patterns()
+        if self.metrics is not None:
+            self.metrics.add_count("lead_candidates", len(all_patterns))
         
         if not all_patterns:
             # 如果没有有效牌型，出最小的能出的牌
@@ -300,13 +285,8 @@ class AIPlayer(Player):
             else:
                 return self._find_smallest_pair() or [self.hand[0]]
         
-        # 优先选择氢弹，然后是双王炸弹，三张，连牌，连队，对子，最后是单牌
-        for pattern_cards in sorted(all_patterns, key=lambda x: (-len(x), -sum(card.rank.rank_value for card in x))):
-            pattern = PatternAnalyzer.analyze_cards(pattern_cards)
-            if pattern:
-                return pattern_cards
-        
-        return [self.hand[0]]  # 兜底
+        # 优先选择张数多的牌型，同样张数时选择牌点大的
+        return min(all_patterns, key=lambda x: (-len(x), -sum(card.rank_value for card in x)))
     
     def _smart_choice(self, possible_plays: List[List[Card]], last_pattern: Pattern) -> List[Card]:
         """智能选择策略"""
@@ -315,8 +295,8 @@ class AIPlayer(Player):
         
         # 如果手牌很少，优先出大牌
         if len(self.hand) <= 3:
-            return max(possible_plays, key=lambda cards: sum(card.rank.rank_value for card in cards))
+            return max(possible_plays, key=lambda cards: sum(card.rank_value for card in cards))
         
         # 否则选择中等大小的牌
-        possible_plays.sort(key=lambda cards: sum(card.rank.rank_value for card in cards))
+        possible_plays.sort(key=lambda cards: sum(card.rank_value for card in cards))
         return possible_plays[len(possible_plays) // 2]
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""新玩法游戏 - 规则
+实时对局（NewGame）和搜索用的紧凑状态（GameState）共用的规则：
+发牌顺序、出牌顺序、轮次结束、补牌、新一轮的先出者和计分。
+两边都调用这里的函数，模拟对局与实际对局不会出现分歧。
+"""
+
+from typing import Dict, List, Sequence
+from .pattern_analyzer import PatternType
+
+
+DEALER_CARDS = 6  # 庄家起手张数
+HAND_CARDS = 5    # 其他人起手张数
+SPRING_CARDS = 5  # 结算时剩余这么多张牌扣分加倍（春天）
+
+PATTERN_MULTIPLIERS: Dict[str, int] = {
+    PatternType.DOUBLE_JOKER: 4,
+    PatternType.HYDROGEN_BOMB: 4,
+    PatternType.BOMB: 2,
+}
+
+
+def deal_order(player_count: int, dealer: int) -> List[int]:
+    """发牌顺序：每张牌发给的座位，依次从牌堆顶发（庄家6张，其他人按座位各5张）"""
+    seats = [dealer] * DEALER_CARDS
+    for seat in range(player_count):
+        if seat != dealer:
+            seats.extend([seat] * HAND_CARDS)
+    return seats
+
+
+def next_seat(seat: int, player_count: int) -> int:
+    """下一个出牌的座位（逆时针）"""
+    return (seat - 1) % player_count
+
+
+def round_over(passes: int, player_count: int) -> bool:
+    """除最后出牌者外其余人都跳过时本轮结束"""
+    return passes >= player_count - 1
+
+
+def refill_seats(round_winner: int, sizes: Sequence[int], deck_size: int) -> List[int]:
+    """轮次结束时依次补一张牌的座位
+
+    有人出牌时只有最后出牌者补牌；全部跳过时所有还有手牌的玩家按座位顺序补牌，
+    牌堆抽完为止。
+    """
+    if round_winner != -1:
+        return [round_winner] if deck_size and sizes[round_winner] else []
+    return [seat for seat in range(len(sizes)) if sizes[seat]][:deck_size]
+
+
+def next_leader(round_winner: int, dealer: int) -> int:
+    """新一轮的先出者：最后出牌者，无人出牌时为庄家"""
+    return round_winner if round_winner != -1 else dealer
+
+
+def pattern_multiplier(pattern_type: str) -> int:
+    """胜者最后一手牌型的倍率"""
+    return PATTERN_MULTIPLIERS.get(pattern_type, 1)
+
+
+def penalty(remaining: int, base_score: int, multiplier: int = 1) -> int:
+    """剩余remaining张牌的扣分（负数），出完牌为0"""
+    if not remaining:
+        return 0
+    score = base_score * remaining
+    if remaining == SPRING_CARDS:
+        score *= 2
+    return -score * multiplier
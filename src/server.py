@@ -0,0 +1,377 @@
+"""新玩法游戏 - 异步多桌对局服务器
+一个asyncio事件循环同时托管大量NewGame牌桌，客户端通过TCP收发按行分隔的JSON：
+
+    客户端 -> 服务器
+        {"op": "join", "players": 3, "humans": 1, "strategies": ["smart"], "table": "名字", "seed": 1}
+        {"op": "play", "cards": [牌的编号, ...]}      牌的编号与card_mask一致（0..53）
+        {"op": "pass"}
+    服务器 -> 客户端
+        {"type": "joined", "table": ..., "seat": ..., "name": ...}
+        {"type": "event", "event": ..., ...}        对局事件（别人补的牌不公开）
+        {"type": "turn", "hand": [...], "last": [牌型, 主牌点, 张数] 或 null, "timeout": 秒}
+        {"type": "error", "message": ...}
+        {"type": "game_over", "winner": 座位, "scores": [...]}
+
+join时给了table（字符串或整数）则与同名的人凑桌，人类座位坐满后开局；不给table则开一张新桌，
+只有一个人类座位时直接开局，否则joined消息里的桌名（"#编号"）可以发给别人来凑桌。
+人类座位限时等待网络输入，超时或断线（包括开局前断线）时代为出牌（首出出最小的牌，否则跳过）。
+AI座位中策略在offload里的（默认只有mcts）放到线程池里思考，慢的搜索不会卡住事件循环；
+其余启发式AI出牌只需几十微秒，直接在事件循环里执行。
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+from .card import Card
+from .card_mask import CARD_RANK, card_to_index
+from .events import EventSink, GameEvent
+from .game import NewGame
+from .move_generator import generate_moves, move_cards, pattern_key
+from .pattern_analyzer import Pattern
+from .player import AIPlayer, HumanPlayer, Player
+from .strategy import choose_move, junk_move
+
+
+_PRIVATE_SETUP_FIELDS = ("seed", "hands", "deck_order")
+
+
+def _jsonable(value: Any) -> Any:
+    """把事件数据转换成JSON可表示的值：牌 -> 编号，牌型 -> 牌型、牌和文字"""
+    if isinstance(value, Card):
+        return card_to_index(value)
+    if isinstance(value, Pattern):
+        return {"type": value.pattern_type, "cards": [card_to_index(card) for card in value.cards],
+                "text": str(value)}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+class Connection:
+    """一个客户端连接"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.moves: "asyncio.Queue[dict]" = asyncio.Queue()
+        self.table: Optional["Table"] = None
+        self.seat = -1
+        self.waiting = False  # 是否轮到它出牌
+        self.closed = False
+        self._buffer: List[bytes] = []
+
+    def send(self, message: dict):
+        """缓冲一条消息，flush时一次写出"""
+        if not self.closed:
+            self._buffer.append(json.dumps(message, ensure_ascii=False).encode())
+
+    def flush(self):
+        if self._buffer and not self.closed:
+            self._buffer.append(b"")
+            self.writer.write(b"\n".join(self._buffer))
+        self._buffer = []
+
+
+class TableSink(EventSink):
+    """把对局事件转发给桌上的人类玩家"""
+
+    def __init__(self, table: "Table"):
+        self.table = table
+
+    def emit(self, event: str, **data: Any):
+        if event == GameEvent.AI_THINKING:
+            return  # 线程池里的AI也会发这个事件，不能在那里碰连接
+        if event == GameEvent.SETUP:
+            data = {key: value for key, value in data.items() if key not in _PRIVATE_SETUP_FIELDS}
+        message = {"type": "event", "event": event}
+        message.update((key, _jsonable(value)) for key, value in data.items())
+        if event == GameEvent.REFILL:
+            public = dict(message, card=None)
+            for connection in self.table.connections.values():
+                mine = self.table.game.players[connection.seat].name == data["player"]
+                connection.send(message if mine else public)
+            return
+        for connection in self.table.connections.values():
+            connection.send(message)
+
+
+class Table:
+    """一张牌桌：人类座位是前humans个座位，其余由AI坐"""
+
+    def __init__(self, server: "GameServer", name: str, player_count: int, humans: int,
+                 strategies: Sequence[str], seed: Optional[int]):
+        self.server = server
+        self.name = name
+        self.humans = humans
+        self.strategies = list(strategies)
+        self.game = NewGame(player_count, sink=TableSink(self), seed=seed)
+        self.connections: Dict[int, Connection] = {}
+
+    @property
+    def full(self) -> bool:
+        return len(self.connections) == self.humans
+
+    def seat(self, connection: Connection) -> int:
+        """给连接安排下一个空的人类座位"""
+        seat = len(self.connections)
+        self.connections[seat] = connection
+        connection.table, connection.seat = self, seat
+        return seat
+
+    async def run(self):
+        """打完一局"""
+        game = self.game
+        game.setup_game(human_players=self.humans, ai_strategies=self.strategies)
+        loop = asyncio.get_running_loop()
+        turns = game.turns()
+        try:
+            player = next(turns)
+            while True:
+                if isinstance(player, HumanPlayer):
+                    cards = await self._human_turn(player)
+                elif isinstance(player, AIPlayer) and player.strategy in self.server.offload:
+                    self._flush()
+                    cards = await loop.run_in_executor(self.server.executor, player.play_turn, game.last_pattern)
+                else:
+                    cards = player.play_turn(game.last_pattern)
+                player = turns.send(cards)
+        except StopIteration:
+            pass
+        winner = game.players.index(game.winner) if game.winner is not None else -1
+        for connection in self.connections.values():
+            connection.send({"type": "game_over", "winner": winner, "scores": game.scores})
+            connection.table, connection.seat = None, -1
+        self._flush()
+
+    def _flush(self):
+        """把缓冲的消息写给所有人类玩家，每次挂起前调用"""
+        for connection in self.connections.values():
+            connection.flush()
+
+    async def _human_turn(self, player: Player) -> Optional[List[Card]]:
+        """等待人类座位的出牌，非法出牌提示后重试，超时或断线时代为出牌"""
+        connection = self.connections[player.seat]
+        last_pattern = self.game.last_pattern
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.server.turn_timeout
+        if not connection.closed:
+            connection.send({
+                "type": "turn",
+                "hand": [card_to_index(card) for card in player.hand],
+                "last": list(pattern_key(last_pattern)) if last_pattern else None,
+                "timeout": self.server.turn_timeout,
+            })
+        while not connection.moves.empty():
+            connection.moves.get_nowait()  # 丢掉上一手多发的消息
+        self._flush()
+        connection.waiting = True
+        try:
+            while not connection.closed:
+                try:
+                    message = await asyncio.wait_for(connection.moves.get(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    break
+                if connection.closed:
+                    break
+                cards, error = self._parse_move(player, message, last_pattern)
+                if error is None:
+                    return cards
+                connection.send({"type": "error", "message": error})
+                connection.flush()
+        finally:
+            connection.waiting = False
+        return _fallback_move(player, last_pattern)
+
+    @staticmethod
+    def _parse_move(player: Player, message: dict, last_pattern: Optional[Pattern]):
+        """把客户端消息换成手里的牌，返回(牌, 错误提示)"""
+        if message.get("op") == "pass":
+            if last_pattern is None:
+                return None, "首轮不能跳过，必须出牌"
+            return None, None
+        try:
+            indices = [int(index) for index in message.get("cards", ())]
+        except (TypeError, ValueError):
+            return None, "cards必须是牌的编号列表"
+        by_index = {card_to_index(card): card for card in player.hand}
+        if len(set(indices)) != len(indices) or not all(index in by_index for index in indices):
+            return None, "出的牌不在手中"
+        cards = [by_index[index] for index in indices]
+        if last_pattern is None and len(cards) == 1:
+            # 与AI相同：没有任何合法牌型时只能首出最小的一张牌（单张王）
+            counts = player.hand.counts
+            if not generate_moves(counts) and CARD_RANK[indices[0]] == junk_move(counts).main:
+                return cards, None
+        return cards, HumanPlayer.check_play(cards, last_pattern)
+
+
+def _fallback_move(player: Player, last_pattern: Optional[Pattern]) -> Optional[List[Card]]:
+    """代为出牌：首出按保守策略出最小的牌，否则跳过"""
+    if last_pattern is not None:
+        return None
+    move = choose_move(player.hand.counts, None, "conservative")
+    return move_cards(move, player.hand.buckets)
+
+
+class GameServer:
+    """多桌对局服务器
+
+    turn_timeout为人类座位每手的限时（秒）；offload中的AI策略在ai_workers个线程里思考。
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, turn_timeout: float = 30.0,
+                 offload: Sequence[str] = ("mcts",), ai_workers: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.turn_timeout = turn_timeout
+        self.offload = set(offload)
+        self.executor = ThreadPoolExecutor(max_workers=ai_workers)
+        self.waiting_tables: Dict[str, Table] = {}
+        self.tasks: set = set()
+        self._handlers: Dict[Connection, asyncio.Task] = {}
+        self.tables_started = 0
+        self.tables_finished = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._names = itertools.count(1)
+
+    async def start(self) -> int:
+        """开始监听，返回实际端口（port为0时由系统分配）"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """停止监听，等所有牌桌结束"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        handlers = list(self._handlers.values())
+        for connection in self._handlers:
+            connection.writer.close()  # 读到EOF后连接处理协程自行退出
+        if handlers:
+            await asyncio.gather(*handlers, return_exceptions=True)
+        self.executor.shutdown(wait=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = Connection(reader, writer)
+        self._handlers[connection] = asyncio.current_task()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ValueError
+                except ValueError:
+                    connection.send({"type": "error", "message": "每行必须是一个JSON对象"})
+                    connection.flush()
+                    continue
+                self._dispatch(connection, message)
+                connection.flush()
+                await writer.drain()
+        except (ConnectionError, ValueError):  # ValueError: 单行超过长度上限
+            pass
+        finally:
+            connection.closed = True
+            connection.moves.put_nowait({"op": "disconnect"})  # 唤醒正在等它出牌的牌桌
+            self._handlers.pop(connection, None)
+            table = connection.table
+            if (table is not None and self.waiting_tables.get(table.name) is table
+                    and all(other.closed for other in table.connections.values())):
+                del self.waiting_tables[table.name]  # 没坐满人就都走了，同名的下一位重新开桌
+            writer.close()
+
+    def _dispatch(self, connection: Connection, message: dict):
+        op = message.get("op")
+        if op == "join":
+            error = self._join(connection, message)
+            if error:
+                connection.send({"type": "error", "message": error})
+        elif op in ("play", "pass"):
+            if not connection.waiting:
+                connection.send({"type": "error", "message": "还没轮到你出牌"})
+            else:
+                connection.moves.put_nowait(message)
+        else:
+            connection.send({"type": "error", "message": f"未知操作: {op}"})
+
+    def _join(self, connection: Connection, message: dict) -> Optional[str]:
+        """入座，人类座位坐满时开局；出错时返回提示"""
+        if connection.table is not None:
+            return "已经在一张牌桌上"
+        name = message.get("table")
+        if name is not None:
+            if isinstance(name, bool) or not isinstance(name, (str, int)):
+                return "牌桌名必须是字符串或整数"
+            name = str(name)
+        table = self.waiting_tables.get(name) if name is not None else None
+        if table is None:
+            if name is None:
+                name = next(candidate for candidate in (f"#{i}" for i in self._names)
+                            if candidate not in self.waiting_tables)
+            try:
+                player_count = int(message.get("players", 3))
+                humans = int(message.get("humans", 1))
+                seed = message.get("seed")
+                table = Table(self, name, player_count, humans, message.get("strategies") or ["smart"],
+                              None if seed is None else int(seed))
+            except (TypeError, ValueError) as e:
+                return str(e)
+            if not 1 <= humans <= player_count:
+                return f"人类玩家数量必须在1-{player_count}之间"
+            self.waiting_tables[table.name] = table
+        seat = table.seat(connection)
+        connection.send({"type": "joined", "table": table.name, "seat": seat, "name": f"玩家{seat + 1}"})
+        if table.full:
+            self.waiting_tables.pop(table.name, None)
+            self._start(table)
+        return None
+
+    def _start(self, table: Table):
+        self.tables_started += 1
+        task = asyncio.create_task(table.run())
+        self.tasks.add(task)
+
+        def finished(done):
+            self.tasks.discard(done)
+            self.tables_finished += 1
+        task.add_done_callback(finished)
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口：启动服务器"""
+    parser = argparse.ArgumentParser(description="干瞪眼多桌对局服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=30.0, help="人类玩家每手的限时（秒）")
+    parser.add_argument("--ai-workers", type=int, default=None, help="AI思考线程数")
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.host, args.port, turn_timeout=args.timeout, ai_workers=args.ai_workers)
+
+    async def serve():
+        port = await server.start()
+        print(f"服务器已启动: {args.host}:{port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""新玩法游戏 - AI对战批量模拟器
+把大量AI对局按块分发到进程池，汇总每个座位的胜率和_calculate_score扣分。
+每局使用由种子创建的独立随机数生成器，任何一局都可以单独重放。
+
+复式模式（duplicate）下每副牌（同一个种子，洗牌和补牌顺序都相同）让各策略轮换坐遍所有座位，
+按副比较策略之间的平均得分差，发牌运气在配对差中抵消，报告配对差的置信区间。
+"""
+
+import argparse
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .aggregator import GameAggregator, PairedStats
+from .events import ConsoleSink, EventSink, NullSink
+from .game import NewGame
+from .metrics import GameMetrics, MetricsHistogram
+from .rules import SPRING_CARDS
+
+
+STRATEGIES = ("conservative", "aggressive", "smart", "mcts")
+
+
+class GameResult(NamedTuple):
+    """单局结果"""
+    seed: int
+    winner: int          # 获胜座位，-1表示无人获胜
+    scores: List[int]    # 每个座位的得分（负分为扣分）
+    rounds: int
+    springs: int = 0     # 春天（一张没出）的人数
+    multiplier: int = 1  # 胜者最后一手的牌型倍率
+    finish: Optional[str] = None  # 胜者最后一手的牌型
+
+
+class SimulationSummary:
+    """批量模拟的汇总结果，可以跨进程合并"""
+
+    def __init__(self, player_count: int, strategies: Sequence[str]):
+        self.player_count = player_count
+        self.strategies = list(strategies)
+        self.games = 0
+        self.wins = [0] * player_count
+        self.score_totals = [0] * player_count
+        self.total_rounds = 0
+        self.stats = GameAggregator(player_count)  # 轮数、春天、倍率和得分的分布
+        self.metrics: Optional[MetricsHistogram] = None  # 开启性能统计时的分阶段汇总
+
+    def add(self, result: GameResult):
+        """计入一局结果"""
+        self.games += 1
+        if result.winner >= 0:
+            self.wins[result.winner] += 1
+        for seat, score in enumerate(result.scores):
+            self.score_totals[seat] += score
+        self.total_rounds += result.rounds
+        self.stats.add(result.rounds, result.scores, result.springs, result.multiplier, result.finish)
+
+    def merge(self, other: "SimulationSummary"):
+        """合并另一份汇总"""
+        self.games += other.games
+        self.total_rounds += other.total_rounds
+        for seat in range(self.player_count):
+            self.wins[seat] += other.wins[seat]
+            self.score_totals[seat] += other.score_totals[seat]
+        self.stats.merge(other.stats)
+        if other.metrics is not None:
+            if self.metrics is None:
+                self.metrics = MetricsHistogram()
+            self.metrics.merge(other.metrics)
+
+    def win_rate(self, seat: int) -> float:
+        """某个座位的胜率"""
+        return self.wins[seat] / self.games if self.games else 0.0
+
+    def mean_score(self, seat: int) -> float:
+        """某个座位的平均得分"""
+        return self.score_totals[seat] / self.games if self.games else 0.0
+
+    def by_strategy(self) -> Dict[str, Dict[str, float]]:
+        """按策略汇总胜率和平均得分（同一策略坐多个座位时取平均）"""
+        result = {}
+        for strategy in dict.fromkeys(self.strategies):
+            seats = [i for i, s in enumerate(self.strategies) if s == strategy]
+            result[strategy] = {
+                "win_rate": sum(self.win_rate(i) for i in seats) / len(seats),
+                "mean_score": sum(self.mean_score(i) for i in seats) / len(seats),
+            }
+        return result
+
+    def to_dict(self) -> dict:
+        """导出为可序列化的字典"""
+        result = {
+            "player_count": self.player_count,
+            "strategies": self.strategies,
+            "games": self.games,
+            "wins": self.wins,
+            "score_totals": self.score_totals,
+            "mean_rounds": self.total_rounds / self.games if self.games else 0.0,
+            "stats": self.stats.to_dict(),
+        }
+        if self.metrics is not None:
+            result["metrics"] = self.metrics.to_dict()
+        return result
+
+
+MAX_SEED = 1 << 31  # game_seed要放进事件日志的有符号64位种子字段
+
+
+def game_seed(seed: int, game_index: int) -> int:
+    """第game_index局的种子"""
+    if not 0 <= seed < MAX_SEED:
+        raise ValueError(f"随机种子必须在0到{MAX_SEED - 1}之间: {seed}")
+    if not 0 <= game_index < 1 << 32:
+        raise ValueError(f"对局序号超出范围: {game_index}")
+    return (seed << 32) + game_index
+
+
+def seed_arg(text: str) -> int:
+    """命令行--seed参数的类型：超出game_seed的范围时给出参数错误"""
+    seed = int(text)
+    if not 0 <= seed < MAX_SEED:
+        raise argparse.ArgumentTypeError(f"随机种子必须在0到{MAX_SEED - 1}之间")
+    return seed
+
+
+def lineup(player_count: int, strategies: Sequence[str]) -> List[str]:
+    """把策略列表按座位展开（不足时循环使用）"""
+    if not strategies:
+        raise ValueError("至少需要一种AI策略")
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"未知的AI策略: {strategy}")
+    return [strategies[i % len(strategies)] for i in range(player_count)]
+
+
+def play_single_game(player_count: int, strategies: Sequence[str], seed: int,
+                     sink: Optional[EventSink] = None, metrics: Optional[GameMetrics] = None) -> GameResult:
+    """用指定种子完整地打一局AI对战"""
+    game = NewGame(player_count, sink=sink if sink is not None else NullSink(), seed=seed, metrics=metrics)
+    game.setup_game(human_players=0, ai_strategies=list(strategies))
+    game.play_game()
+    winner = game.players.index(game.winner) if game.winner else -1
+    springs = sum(1 for player in game.players if len(player.hand) == SPRING_CARDS)
+    finish = game.last_pattern if game.winner else None
+    return GameResult(seed, winner, list(game.scores), game.round_count, springs,
+                      finish.get_multiplier() if finish else 1, finish.pattern_type if finish else None)
+
+
+def _run_chunk(player_count: int, strategies: Sequence[str], seed: int,
+               start: int, stop: int, profile: bool = False) -> SimulationSummary:
+    """在工作进程中跑一块对局"""
+    summary = SimulationSummary(player_count, strategies)
+    if profile:
+        summary.metrics = MetricsHistogram()
+    for game_index in range(start, stop):
+        metrics = GameMetrics() if profile else None
+        summary.add(play_single_game(player_count, strategies, game_seed(seed, game_index), metrics=metrics))
+        if profile:
+            summary.metrics.add(metrics)
+    return summary
+
+
+def simulate(player_count: int, strategies: Sequence[str], games: int, seed: int = 0,
+             workers: Optional[int] = None, chunk_size: int = 500, profile: bool = False) -> SimulationSummary:
+    """批量模拟AI对战
+
+    workers为None时使用全部CPU核心，为1时在当前进程中运行。
+    结果只取决于参数和种子，与进程数、分块大小无关。
+    profile为True时统计各阶段耗时，汇总在summary.metrics中。
+    """
+    strategies = lineup(player_count, strategies)
+    workers = workers or os.cpu_count() or 1
+    chunks = [(start, min(start + chunk_size, games)) for start in range(0, games, chunk_size)]
+
+    summary = SimulationSummary(player_count, strategies)
+    tasks = [(player_count, strategies, seed, start, stop, profile) for start, stop in chunks]
+    for chunk in _chunk_results(_run_chunk, tasks, workers):
+        summary.merge(chunk)
+    return summary
+
+
+def _chunk_results(func, tasks: Sequence[tuple], workers: int):
+    """按顺序产出各块func(*task)的结果
+
+    多进程时最多同时提交2×workers块，合并过的结果不再保留，汇总占用的内存与局数无关；
+    调用方提前停止迭代时取消还没开始的块。
+    """
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield func(*task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = iter(tasks)
+        futures = deque(pool.submit(func, *task) for task in itertools.islice(pending, 2 * workers))
+        try:
+            while futures:
+                result = futures.popleft().result()
+                for task in itertools.islice(pending, 1):
+                    futures.append(pool.submit(func, *task))
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+class DuplicateSummary:
+    """复式模拟的汇总：每种策略每局的平均得分，以及策略两两之间按副配对的得分差"""
+
+    def __init__(self, player_count: int, strategies: Sequence[str]):
+        self.player_count = player_count
+        self.strategies = list(dict.fromkeys(strategies))  # 去重，保持顺序
+        self.deals = 0
+        self.score_totals = {strategy: 0 for strategy in self.strategies}
+        self.seat_games = {strategy: 0 for strategy in self.strategies}
+        self.pairs: Dict[Tuple[str, str], PairedStats] = {
+            pair: PairedStats() for pair in itertools.combinations(self.strategies, 2)}
+
+    def add_deal(self, lineups: Sequence[Sequence[str]], results: Sequence[GameResult]):
+        """计入一副牌的所有座位轮换"""
+        totals = dict.fromkeys(self.strategies, 0)
+        counts = dict.fromkeys(self.strategies, 0)
+        for seats, result in zip(lineups, results):
+            for strategy, score in zip(seats, result.scores):
+                totals[strategy] += score
+                counts[strategy] += 1
+        means = {strategy: totals[strategy] / counts[strategy] for strategy in self.strategies}
+        for (a, b), stats in self.pairs.items():
+            stats.add(means[a] - means[b])
+        for strategy in self.strategies:
+            self.score_totals[strategy] += totals[strategy]
+            self.seat_games[strategy] += counts[strategy]
+        self.deals += 1
+
+    def merge(self, other: "DuplicateSummary"):
+        """合并另一份汇总"""
+        self.deals += other.deals
+        for strategy in self.strategies:
+            self.score_totals[strategy] += other.score_totals[strategy]
+            self.seat_games[strategy] += other.seat_games[strategy]
+        for pair, stats in self.pairs.items():
+            stats.merge(other.pairs[pair])
+
+    @property
+    def games(self) -> int:
+        return self.deals * self.player_count
+
+    def mean_score(self, strategy: str) -> float:
+        """某种策略每局的平均得分"""
+        games = self.seat_games[strategy]
+        return self.score_totals[strategy] / games if games else 0.0
+
+    def max_half_width(self, confidence: float = 0.95) -> float:
+        """所有配对差中最宽的置信区间半宽"""
+        return max((stats.half_width(confidence) for stats in self.pairs.values()), default=0.0)
+
+    def to_dict(self, confidence: float = 0.95) -> dict:
+        """导出为可序列化的字典"""
+        return {
+            "player_count": self.player_count,
+            "deals": self.deals,
+            "games": self.games,
+            "mean_scores": {strategy: self.mean_score(strategy) for strategy in self.strategies},
+            "confidence": confidence,
+            "differences": [{"a": a, "b": b, "mean": stats.mean, "half_width": stats.half_width(confidence)}
+                            for (a, b), stats in self.pairs.items()],
+        }
+
+
+def rotations(seats: Sequence[str]) -> List[List[str]]:
+    """座位轮换：每种排法让每个座位上的策略整体挪一位"""
+    seats = list(seats)
+    return [seats[i:] + seats[:i] for i in range(len(seats))]
+
+
+def _run_duplicate_chunk(player_count: int, strategies: Sequence[str], seed: int,
+                         start: int, stop: int) -> DuplicateSummary:
+    """在工作进程中跑一块复式对局（每副牌打player_count局）"""
+    summary = DuplicateSummary(player_count, strategies)
+    lineups = rotations(strategies)
+    for deal_index in range(start, stop):
+        deal_seed = game_seed(seed, deal_index)
+        summary.add_deal(lineups, [play_single_game(player_count, seats, deal_seed) for seats in lineups])
+    return summary
+
+
+def duplicate(player_count: int, strategies: Sequence[str], max_deals: int, seed: int = 0,
+              workers: Optional[int] = None, chunk_size: int = 100, target: Optional[float] = None,
+              confidence: float = 0.95, min_deals: int = 50) -> DuplicateSummary:
+    """复式模拟：最多max_deals副牌，每副牌按座位轮换打player_count局
+
+    target不为None时，每合并一块就检查一次，所有配对差的置信区间半宽都不超过target
+    （且至少打了min_deals副）就提前停止。块按顺序合并，结果与进程数无关。
+    """
+    strategies = lineup(player_count, strategies)
+    if len(set(strategies)) < 2:
+        raise ValueError("复式模拟至少需要两种策略")
+    workers = workers or os.cpu_count() or 1
+    chunks = [(start, min(start + chunk_size, max_deals)) for start in range(0, max_deals, chunk_size)]
+
+    def done(summary: DuplicateSummary) -> bool:
+        return (target is not None and summary.deals >= min_deals
+                and summary.max_half_width(confidence) <= target)
+
+    summary = DuplicateSummary(player_count, strategies)
+    tasks = [(player_count, strategies, seed, start, stop) for start, stop in chunks]
+    for chunk in _chunk_results(_run_duplicate_chunk, tasks, workers):
+        summary.merge(chunk)
+        if done(summary):
+            break
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="AI对战批量模拟")
+    parser.add_argument("-p", "--players", type=int, default=3, help="玩家数量 (2-6)")
+    parser.add_argument("-s", "--strategies", default="conservative,aggressive,smart",
+                        help="按座位排列的AI策略，逗号分隔")
+    parser.add_argument("-n", "--games", type=int, default=1000, help="对局数")
+    parser.add_argument("--seed", type=seed_arg, default=0, help="随机种子")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="进程数（默认全部核心）")
+    parser.add_argument("--chunk-size", type=int, default=500, help="每个任务包含的对局数")
+    parser.add_argument("--replay", type=int, default=None, metavar="INDEX",
+                        help="在控制台重放第INDEX局")
+    parser.add_argument("--profile", action="store_true", help="统计并输出各阶段耗时")
+    parser.add_argument("--duplicate", action="store_true",
+                        help="复式模式：每副牌轮换座位，-n为最多的副数，报告策略间配对得分差")
+    parser.add_argument("--target", type=float, default=None,
+                        help="复式模式下配对差置信区间半宽达到该值时提前停止")
+    parser.add_argument("--confidence", type=float, default=0.95, help="置信水平")
+    args = parser.parse_args(argv)
+
+    strategies = lineup(args.players, args.strategies.split(","))
+    if args.replay is not None:
+        play_single_game(args.players, strategies, game_seed(args.seed, args.replay), sink=ConsoleSink())
+        return
+
+    if args.duplicate:
+        summary = duplicate(args.players, strategies, args.games, args.seed, args.workers,
+                            args.chunk_size, args.target, args.confidence)
+        print(f"共 {summary.deals} 副牌、{summary.games} 局（每副牌轮换 {args.players} 个座位）")
+        for strategy in summary.strategies:
+            print(f"  {strategy}: 平均得分 {summary.mean_score(strategy):.3f}")
+        print(f"配对得分差（{args.confidence:.0%}置信区间）:")
+        for (a, b), stats in summary.pairs.items():
+            half = stats.half_width(args.confidence)
+            verdict = "显著" if abs(stats.mean) > half else "不显著"
+            print(f"  {a} - {b}: {stats.mean:+.3f} ± {half:.3f}  {verdict}")
+        return
+
+    summary = simulate(args.players, strategies, args.games, args.seed, args.workers, args.chunk_size,
+                       args.profile)
+    print(f"共模拟 {summary.games} 局，平均 {summary.to_dict()['mean_rounds']:.1f} 轮")
+    for seat, strategy in enumerate(summary.strategies):
+        print(f"  座位{seat + 1} ({strategy}): 胜率 {summary.win_rate(seat):.2%}，"
+              f"平均得分 {summary.mean_score(seat):.2f}")
+    for line in summary.stats.report():
+        print(f"  {line}")
+    if summary.metrics is not None:
+        print("各阶段耗时:")
+        for line in summary.metrics.report():
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
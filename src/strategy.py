@@ -0,0 +1,59 @@
+"""新玩法游戏 - 出牌层面的AI策略
+在牌点直方图上复现AIPlayer的三种策略（conservative/aggressive/smart），
+不构造Card/Pattern，供搜索类AI的模拟对局（rollout）使用。
+选出的出牌与AIPlayer在同样手牌下的选择相同（只差花色）。
+"""
+
+from typing import List, Optional, Sequence, Tuple
+from .card_mask import SMALL_JOKER_INDEX
+from .move_generator import MOVES, Move
+from .move_cache import cached_moves, cached_responses
+from .pattern_analyzer import PatternType
+
+
+def junk_move(counts: Sequence[int]) -> Move:
+    """没有合法牌型时只能出最小的一张牌（单张王，牌型无效）"""
+    rank_idx = next(i for i, count in enumerate(counts) if count)
+    return Move(PatternType.INVALID, rank_idx, 1, 1)
+
+
+def lead_moves(counts: Sequence[int]) -> List[Move]:
+    """首出时可以出的牌"""
+    return list(cached_moves(counts)) or [junk_move(counts)]
+
+
+def _smallest_lead(counts: Sequence[int]) -> Move:
+    """最小的单牌（王不能单出），只剩王时出最小的一张牌"""
+    for rank_idx in range(SMALL_JOKER_INDEX):
+        if counts[rank_idx]:
+            return MOVES[(rank_idx, 1, 1)]
+    return junk_move(counts)
+
+
+def choose_lead(counts: Sequence[int], strategy: str) -> Move:
+    """首出，对应AIPlayer._play_first_turn"""
+    if strategy == "aggressive":
+        moves = cached_moves(counts)
+        if moves:
+            return min(moves, key=lambda move: (-move.size, -move.rank_sum))
+    return _smallest_lead(counts)
+
+
+def choose_response(counts: Sequence[int], last_key: Tuple[str, int, int], strategy: str) -> Optional[Move]:
+    """压牌，对应AIPlayer._try_beat_pattern；压不过时返回None（跳过）"""
+    moves = cached_responses(counts, last_key)
+    if not moves:
+        return None
+    if strategy == "conservative":
+        return min(moves, key=lambda move: move.rank_sum)
+    if strategy == "aggressive" or sum(counts) <= 3:
+        return max(moves, key=lambda move: move.rank_sum)
+    moves = sorted(moves, key=lambda move: move.rank_sum)
+    return moves[len(moves) // 2]
+
+
+def choose_move(counts: Sequence[int], last_key: Optional[Tuple[str, int, int]], strategy: str) -> Optional[Move]:
+    """按策略选择一手出牌，last_key为None表示首出"""
+    if last_key is None:
+        return choose_lead(counts, strategy)
+    return choose_response(counts, last_key, strategy)
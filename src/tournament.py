@@ -0,0 +1,360 @@
+"""新玩法游戏 - 锦标赛
+在注册的玩家实现之间安排循环赛或瑞士轮，在进程池上运行，按结果流增量更新Elo等级分。
+
+同一组参赛者的每副牌都让他们轮换坐遍所有座位（0号座位是庄家，多发一张牌），
+各轮换用同一个种子，发牌运气对每位参赛者相同。
+等级分按对局编号顺序更新：进程池先完成的后面的对局会先暂存，
+因此结果只取决于参数和种子，与进程数无关。
+检查点记录赛程和已完成对局的结果，恢复时只打还没打完的对局。
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import pickle
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .events import EventSink, NullSink
+from .game import NewGame
+from .player import AIPlayer, Player
+
+
+CHECKPOINT_VERSION = 1
+FORMATS = ("round_robin", "swiss")
+
+PlayerFactory = Callable[[str, EventSink, random.Random], Player]
+
+
+def _ai_factory(strategy: str) -> PlayerFactory:
+    def make(name: str, sink: EventSink, rng: random.Random) -> Player:
+        return AIPlayer(name, strategy, sink=sink, rng=rng)
+    return make
+
+
+def _mcts_factory(name: str, sink: EventSink, rng: random.Random) -> Player:
+    from .mcts import MCTSPlayer
+    return MCTSPlayer(name, sink=sink, rng=rng)
+
+
+PLAYER_FACTORIES: Dict[str, PlayerFactory] = {
+    "conservative": _ai_factory("conservative"),
+    "aggressive": _ai_factory("aggressive"),
+    "smart": _ai_factory("smart"),
+    "mcts": _mcts_factory,
+}
+_BUILTIN_PLAYERS = frozenset(PLAYER_FACTORIES)
+
+
+def register_player(name: str, factory: PlayerFactory):
+    """注册一种参赛的玩家实现：factory(玩家名, 事件接收器, 随机数生成器) -> Player
+
+    多进程运行时，参赛的自定义实现在进程池启动时传给每个工作进程：
+    fork下直接继承，spawn/forkserver下要能pickle（模块级的函数或类），否则报错。
+    """
+    PLAYER_FACTORIES[name] = factory
+
+
+def unregister_player(name: str):
+    """取消注册（内置的实现不能取消）"""
+    if name in _BUILTIN_PLAYERS:
+        raise ValueError(f"不能取消内置的玩家实现: {name}")
+    PLAYER_FACTORIES.pop(name, None)
+
+
+def _install_players(factories: Dict[str, PlayerFactory]):
+    """工作进程的初始化：装入主进程注册的自定义实现"""
+    PLAYER_FACTORIES.update(factories)
+
+
+class ScheduledGame(NamedTuple):
+    """赛程中的一局：lineup[i]坐i号座位"""
+    index: int
+    lineup: Tuple[str, ...]
+    seed: int
+
+
+class MatchResult(NamedTuple):
+    """一局的结果"""
+    index: int
+    scores: List[int]
+    rounds: int
+
+
+class EloRatings:
+    """多人局的Elo等级分
+
+    每局拆成座位两两之间的比赛（得分高者胜，相同为平），
+    每人的变化为 k/(人数-1) × Σ(实际 - 期望)，同一局内的变化同时生效。
+    同一实现坐了多个座位时，它们之间的比较不计入。
+    """
+
+    def __init__(self, entrants: Sequence[str], k: float = 16.0, initial: float = 1500.0):
+        self.k = k
+        self.ratings: Dict[str, float] = {name: initial for name in entrants}
+        self.games: Dict[str, int] = {name: 0 for name in entrants}
+        self.score_totals: Dict[str, int] = {name: 0 for name in entrants}
+        self.wins: Dict[str, int] = {name: 0 for name in entrants}
+
+    def update(self, lineup: Sequence[str], scores: Sequence[int]):
+        """计入一局的结果"""
+        ratings = self.ratings
+        scale = self.k / (len(lineup) - 1)
+        deltas = [0.0] * len(lineup)
+        for i, j in itertools.combinations(range(len(lineup)), 2):
+            if lineup[i] == lineup[j]:
+                continue
+            expected = 1.0 / (1.0 + 10 ** ((ratings[lineup[j]] - ratings[lineup[i]]) / 400))
+            actual = 1.0 if scores[i] > scores[j] else 0.5 if scores[i] == scores[j] else 0.0
+            deltas[i] += scale * (actual - expected)
+            deltas[j] -= scale * (actual - expected)
+        best = max(scores)
+        for seat, name in enumerate(lineup):
+            ratings[name] += deltas[seat]
+            self.games[name] += 1
+            self.score_totals[name] += scores[seat]
+            if scores[seat] == best:
+                self.wins[name] += 1
+
+    def standings(self) -> List[Tuple[str, float]]:
+        """按等级分从高到低排列"""
+        return sorted(self.ratings.items(), key=lambda item: (-item[1], item[0]))
+
+    def to_dict(self) -> dict:
+        return {name: {"rating": self.ratings[name], "games": self.games[name],
+                       "wins": self.wins[name], "score_total": self.score_totals[name]}
+                for name, _ in self.standings()}
+
+
+def _lineups(entrants: Sequence[str], seats: int) -> List[Tuple[str, ...]]:
+    """一个座位数下的所有参赛组合；参赛者不够坐满时允许同一实现坐多个座位"""
+    if len(entrants) >= seats:
+        return list(itertools.combinations(entrants, seats))
+    return [combo for combo in itertools.combinations_with_replacement(entrants, seats)
+            if len(set(combo)) > 1]
+
+
+def _rotations(lineup: Sequence[str]) -> List[Tuple[str, ...]]:
+    """让每位参赛者轮流坐庄家座位"""
+    return [tuple(lineup[i:]) + tuple(lineup[:i]) for i in range(len(lineup))]
+
+
+MAX_SEED = 1 << 23  # deal_seed要放进事件日志的有符号64位种子字段
+
+
+def deal_seed(seed: int, round_index: int, table: int, deal: int) -> int:
+    """一副牌的种子，同一副牌的各个座位轮换共用"""
+    return (seed << 40) + (round_index << 28) + (table << 12) + deal
+
+
+def play_match(game: ScheduledGame) -> MatchResult:
+    """打一局"""
+    lineup = game.lineup
+    new_game = NewGame(len(lineup), sink=NullSink(), seed=game.seed)
+    players = [PLAYER_FACTORIES[name](f"{name}#{seat + 1}", new_game.sink, new_game.rng)
+               for seat, name in enumerate(lineup)]
+    new_game.setup_game(players=players)
+    new_game.play_game()
+    return MatchResult(game.index, list(new_game.scores), new_game.round_count)
+
+
+def _play_chunk(games: Sequence[ScheduledGame]) -> List[MatchResult]:
+    """在工作进程中打一块对局"""
+    return [play_match(game) for game in games]
+
+
+class Tournament:
+    """锦标赛
+
+    seat_counts为参加的座位数（2~6，可以多个）。循环赛一轮打完所有组合；
+    瑞士轮每轮按当前等级分从高到低分桌，剩下坐不满一桌的参赛者轮空，
+    多个座位数时各轮依次使用。每一桌（组合）打deals副牌，每副牌轮换所有座位。
+    """
+
+    def __init__(self, entrants: Sequence[str], seat_counts: Sequence[int] = (3,), fmt: str = "round_robin",
+                 rounds: int = 1, deals: int = 2, seed: int = 0, k: float = 16.0,
+                 workers: Optional[int] = None, chunk_size: int = 20, checkpoint: Optional[str] = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"未知的赛制: {fmt}")
+        if len(set(entrants)) != len(entrants) or len(entrants) < 2:
+            raise ValueError("至少需要两种参赛的玩家实现，且不能重复")
+        for name in entrants:
+            if name not in PLAYER_FACTORIES:
+                raise ValueError(f"未注册的玩家实现: {name}")
+        if not 0 <= seed < MAX_SEED:
+            raise ValueError(f"随机种子必须在0到{MAX_SEED - 1}之间")
+        for seats in seat_counts:
+            if not 2 <= seats <= 6:
+                raise ValueError("座位数必须在2-6之间")
+            if fmt == "swiss" and seats > len(entrants):
+                raise ValueError("瑞士轮的座位数不能超过参赛者数")
+        self.entrants = list(entrants)
+        self.seat_counts = list(seat_counts)
+        self.fmt = fmt
+        self.rounds = 1 if fmt == "round_robin" else rounds
+        self.deals = deals
+        self.seed = seed
+        self.k = k
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.checkpoint = checkpoint
+
+        self.schedule: List[ScheduledGame] = []
+        self.round_ends: List[int] = []  # 每轮赛程结束的对局编号
+        self.results: Dict[int, MatchResult] = {}
+        self.ratings = EloRatings(self.entrants, k)
+        self.applied = 0  # 已计入等级分的对局数（按编号连续）
+
+    @property
+    def finished(self) -> bool:
+        return len(self.round_ends) == self.rounds and self.applied == len(self.schedule)
+
+    def _schedule_round(self):
+        """按当前等级分排出下一轮"""
+        round_index = len(self.round_ends)
+        if self.fmt == "round_robin":
+            tables = [lineup for seats in self.seat_counts for lineup in _lineups(self.entrants, seats)]
+        else:
+            seats = self.seat_counts[round_index % len(self.seat_counts)]
+            ranked = [name for name, _ in self.ratings.standings()]
+            tables = [tuple(ranked[i:i + seats]) for i in range(0, len(ranked) - seats + 1, seats)]
+        for table, lineup in enumerate(tables):
+            for deal in range(self.deals):
+                seed = deal_seed(self.seed, round_index, table, deal)
+                for rotation in _rotations(lineup):
+                    self.schedule.append(ScheduledGame(len(self.schedule), rotation, seed))
+        self.round_ends.append(len(self.schedule))
+
+    def _record(self, result: MatchResult, on_result: Optional[Callable[[ScheduledGame, MatchResult], None]]):
+        """保存结果，并按编号顺序把能计入的结果计入等级分"""
+        self.results[result.index] = result
+        while self.applied < len(self.schedule) and self.applied in self.results:
+            done = self.results[self.applied]
+            game = self.schedule[self.applied]
+            self.ratings.update(game.lineup, done.scores)
+            self.applied += 1
+            if on_result is not None:
+                on_result(game, done)
+
+    def run(self, max_games: Optional[int] = None,
+            on_result: Optional[Callable[[ScheduledGame, MatchResult], None]] = None) -> EloRatings:
+        """运行到结束（或本次打满max_games局），每完成一块对局保存一次检查点"""
+        played = 0
+        while not self.finished:
+            if self.applied == len(self.schedule):
+                self._schedule_round()
+                self._save()
+            end = self.round_ends[self._current_round()]
+            pending = [game for game in self.schedule[self.applied:end] if game.index not in self.results]
+            if max_games is not None:
+                pending = pending[:max_games - played]
+                if not pending:
+                    break
+            chunks = [pending[i:i + self.chunk_size] for i in range(0, len(pending), self.chunk_size)]
+            if self.workers == 1 or len(chunks) <= 1:
+                for chunk in chunks:
+                    for result in _play_chunk(chunk):
+                        self._record(result, on_result)
+                    self._save()
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers, initializer=_install_players,
+                                         initargs=(self._custom_players(),)) as pool:
+                    futures = {pool.submit(_play_chunk, chunk) for chunk in chunks}
+                    while futures:
+                        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            for result in future.result():
+                                self._record(result, on_result)
+                        self._save()
+            played += len(pending)
+        return self.ratings
+
+    def _custom_players(self) -> Dict[str, PlayerFactory]:
+        """参赛的自定义实现；非fork的启动方式下检查它们能否传给工作进程"""
+        factories = {name: PLAYER_FACTORIES[name] for name in self.entrants if name not in _BUILTIN_PLAYERS}
+        if factories and multiprocessing.get_start_method() != "fork":
+            try:
+                pickle.dumps(factories)
+            except (pickle.PicklingError, AttributeError, TypeError) as error:
+                raise ValueError(f"自定义玩家实现不能传给{multiprocessing.get_start_method()}启动的工作进程"
+                                 f"（需要模块级的函数或类），或者使用workers=1: {error}") from error
+        return factories
+
+    def _current_round(self) -> int:
+        """第一个还有对局没计入等级分的轮次"""
+        return next(i for i, end in enumerate(self.round_ends) if end > self.applied)
+
+    def state(self) -> dict:
+        """检查点内容"""
+        return {
+            "version": CHECKPOINT_VERSION,
+            "config": {"entrants": self.entrants, "seat_counts": self.seat_counts, "fmt": self.fmt,
+                       "rounds": self.rounds, "deals": self.deals, "seed": self.seed, "k": self.k},
+            "schedule": [[list(game.lineup), game.seed] for game in self.schedule],
+            "round_ends": self.round_ends,
+            "results": [[result.index, result.scores, result.rounds]
+                        for _, result in sorted(self.results.items())],
+        }
+
+    def _save(self):
+        """写检查点（先写临时文件再改名，中断时不会留下半个文件）"""
+        if self.checkpoint is None:
+            return
+        temp = self.checkpoint + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.state(), f, ensure_ascii=False)
+        os.replace(temp, self.checkpoint)
+
+    @classmethod
+    def resume(cls, checkpoint: str, workers: Optional[int] = None, chunk_size: int = 20) -> "Tournament":
+        """从检查点恢复：已完成的对局不再重打，等级分按保存的结果重新计算"""
+        with open(checkpoint, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"不支持的检查点版本: {state.get('version')}")
+        tournament = cls(**state["config"], workers=workers, chunk_size=chunk_size, checkpoint=checkpoint)
+        tournament.schedule = [ScheduledGame(i, tuple(lineup), seed)
+                               for i, (lineup, seed) in enumerate(state["schedule"])]
+        tournament.round_ends = state["round_ends"]
+        for index, scores, rounds in state["results"]:
+            tournament._record(MatchResult(index, scores, rounds), None)
+        return tournament
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="AI锦标赛（Elo等级分）")
+    parser.add_argument("-e", "--entrants", default="conservative,aggressive,smart",
+                        help="参赛的玩家实现，逗号分隔")
+    parser.add_argument("-p", "--players", default="3", help="座位数，逗号分隔（2-6）")
+    parser.add_argument("--format", default="round_robin", choices=FORMATS, help="赛制")
+    parser.add_argument("--rounds", type=int, default=3, help="瑞士轮的轮数")
+    parser.add_argument("--deals", type=int, default=10, help="每个组合打几副牌（每副牌轮换所有座位）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="进程数（默认全部核心）")
+    parser.add_argument("--checkpoint", default=None, help="检查点文件；文件已存在时从它恢复")
+    args = parser.parse_args(argv)
+
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        tournament = Tournament.resume(args.checkpoint, workers=args.workers)
+        print(f"从检查点恢复：已完成 {len(tournament.results)}/{len(tournament.schedule)} 局")
+    else:
+        tournament = Tournament(args.entrants.split(","), [int(n) for n in args.players.split(",")],
+                                args.format, args.rounds, args.deals, args.seed,
+                                workers=args.workers, checkpoint=args.checkpoint)
+    ratings = tournament.run()
+    print(f"共 {len(tournament.schedule)} 局")
+    for place, (name, rating) in enumerate(ratings.standings(), start=1):
+        games = ratings.games[name]
+        if not games:  # 瑞士轮轮空，还没有打过对局
+            print(f"  {place}. {name:<14} Elo {rating:7.1f}  0 局（轮空）")
+            continue
+        print(f"  {place}. {name:<14} Elo {rating:7.1f}  {games} 局，"
+              f"胜 {ratings.wins[name] / games:.1%}，平均得分 {ratings.score_totals[name] / games:.2f}")
+
+
+if __name__ == "__main__":
+    main()
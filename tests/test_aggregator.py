@@ -0,0 +1,106 @@
+"""流式统计测试"""
+
+import sys
+import os
+import io
+import json
+import random
+from contextlib import redirect_stdout
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.aggregator import GameAggregator, Histogram, PairedStats, QuantileSketch, RunningStats
+from src.simulator import game_seed, main, play_single_game, simulate
+
+
+def _exact_quantile(values, fraction):
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+def test_sketches():
+    """直方图分位数精确，草图的相对误差不超过精度，合并与一次累加相同，桶数有上限"""
+    rng = random.Random(3)
+    values = [int(rng.expovariate(0.05)) for _ in range(5000)]
+    histogram, stats = Histogram(limit=1000), RunningStats()
+    for value in values:
+        histogram.add(value)
+        stats.add(value)
+    assert histogram.quantile(0.5) == sorted(values)[2499]
+    assert stats.n == 5000 and stats.min == min(values) and stats.max == max(values)
+    mean = sum(values) / len(values)
+    assert abs(stats.variance - sum((v - mean) ** 2 for v in values) / 4999) < 1e-6
+
+    samples = [rng.lognormvariate(0, 2) for _ in range(20000)]
+    whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(samples):
+        whole.add(value)
+        (left if i % 3 else right).add(value)
+    left.merge(right)
+    for fraction in (0.01, 0.5, 0.9, 0.99):
+        exact = _exact_quantile(samples, fraction)
+        assert abs(whole.quantile(fraction) - exact) <= 0.011 * exact
+        assert left.quantile(fraction) == whole.quantile(fraction)
+
+    small = QuantileSketch(max_buckets=200)
+    for value in samples:
+        small.add(value)
+    assert len(small.buckets) <= 200 < len(whole.buckets)
+    assert abs(small.quantile(0.99) - _exact_quantile(samples, 0.99)) <= 0.011 * _exact_quantile(samples, 0.99)
+
+
+def test_game_aggregator():
+    """模拟汇总中的春天、倍率、得分统计与逐局结果一致"""
+    summary = simulate(4, ["conservative", "aggressive", "smart"], 300, seed=4, workers=1, chunk_size=64)
+    results = [play_single_game(4, summary.strategies, game_seed(4, i)) for i in range(300)]
+    expected = GameAggregator(4)
+    for result in results:
+        expected.add(result.rounds, result.scores, result.springs, result.multiplier, result.finish)
+    stats = summary.stats
+    assert stats.to_dict() == expected.to_dict()
+    assert stats.games == 300
+    assert stats.spring_players == sum(result.springs for result in results)
+    assert sum(stats.multipliers.values()) == 300
+    assert stats.score_totals == summary.score_totals
+    assert stats.rounds.total == summary.total_rounds
+    assert len(stats.rounds_histogram.counts) == 257
+    for line in stats.report():
+        assert line
+
+
+def test_paired_stats_float_precision():
+    """均值远大于标准差的浮点数：PairedStats的方差没有相消误差，分块合并结果相同"""
+    rng = random.Random(5)
+    values = [1e8 + rng.gauss(0, 1) / 3 for _ in range(3000)]
+    mean = sum(values) / len(values)
+    exact = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+    whole, left, right = PairedStats(), PairedStats(), PairedStats()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i < 1000 else right).add(value)
+    left.merge(right)
+    for stats in (whole, left):
+        assert stats.n == 3000
+        assert abs(stats.variance - exact) < 1e-6 * exact
+        assert abs(stats.mean - mean) < 1e-6
+    assert PairedStats().half_width() == float("inf")
+
+
+def test_empty_run():
+    """0局时报告和导出都不出错，命令行照常输出"""
+    stats = GameAggregator(3)
+    assert stats.report() == ["没有对局"]
+    exported = json.loads(json.dumps(stats.to_dict()))
+    assert exported["games"] == 0 and exported["penalty_quantiles"]["0.5"] is None
+    assert exported["rounds"]["max"] is None
+    output = io.StringIO()
+    with redirect_stdout(output):
+        main(["-n", "0", "-w", "1"])
+    assert "共模拟 0 局" in output.getvalue() and "没有对局" in output.getvalue()
+
+
+if __name__ == "__main__":
+    test_sketches()
+    test_game_aggregator()
+    test_paired_stats_float_precision()
+    test_empty_run()
+    print("所有测试完成！")
@@ -0,0 +1,51 @@
+"""向量化批量对局引擎测试（需要numpy）"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.batch_engine import BatchEngine
+from src.card_mask import CARD_RANK
+from src.events import NullSink
+from src.game import NewGame
+
+
+def test_matches_object_engine():
+    """同一副牌，批量引擎与NewGame的胜者、得分、轮数完全一致"""
+    strategies = ["conservative", "aggressive", "smart"]
+    for player_count in range(2, 7):
+        decks, expected = [], []
+        for seed in range(60):
+            game = NewGame(player_count, sink=NullSink(), rng=random.Random(seed))
+            game.setup_game(human_players=0, ai_strategies=strategies)
+            decks.append([CARD_RANK[i] for i in game.deck_order])
+            game.play_game()
+            expected.append((game.players.index(game.winner), game.scores, game.round_count))
+        result = BatchEngine(player_count, strategies, decks=np.array(decks)).run()
+        for i, (winner, scores, rounds) in enumerate(expected):
+            assert result.winners[i] == winner
+            assert result.scores[i].tolist() == scores
+            assert result.rounds[i] == rounds
+
+
+def test_random_decks():
+    """批量洗牌：每副牌都是完整的一副，所有对局都能结束"""
+    decks = BatchEngine.shuffled_decks(100, seed=1)
+    assert decks.shape == (100, 54)
+    assert (np.sort(decks, axis=1) == np.sort(decks[0])).all()
+    engine = BatchEngine(4, ["aggressive", "conservative"], 500, seed=2)
+    result = engine.run()
+    assert (result.winners >= 0).all()
+    assert (result.scores[np.arange(500), result.winners] == 0).all()
+    assert (result.scores <= 0).all()
+
+
+if __name__ == "__main__":
+    test_matches_object_engine()
+    test_random_decks()
+    print("所有测试完成！")
@@ -0,0 +1,96 @@
+"""开局库测试"""
+
+import sys
+import os
+import itertools
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.book import LEAD, OpeningBook, _deal, build_book
+from src.card_mask import rank_counts, unpack_counts
+from src.events import NullSink
+from src.game import NewGame
+from src.move_generator import pattern_key
+from src.player import AIPlayer
+from src.simulator import game_seed
+
+
+def _move_counts(move):
+    counts = [0] * 15
+    for rank_idx in move.ranks:
+        counts[rank_idx] += move.width
+    return counts
+
+
+def test_build_and_lookup():
+    """库按键排序，每条记录都能二分查到，期望得分不低于原选择；不在库中的局面查不到"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "book.bin")
+        counts = build_book(path, 3, games=60, samples=4, seed=1, workers=1)
+        book = OpeningBook(path)
+        assert book._view is None
+        assert len(book) == counts["opening_records"] + counts["response_records"] > 0
+        assert book.player_count == 3 and book.samples == 4
+
+        keys = [key for key, _ in book.entries()]
+        assert keys == sorted(keys)
+        openings = 0
+        for key, entry in book.entries():
+            assert entry.value >= entry.baseline
+            hand = unpack_counts(key >> 8)
+            if key & 0xFF == LEAD:
+                openings += 1
+                assert sum(hand) == 6
+                assert book.lookup(hand) == entry
+            else:
+                assert sum(hand) == 5
+                assert entry.move is None or entry.move.size <= 5
+        assert openings == counts["opening_records"]
+        assert book.lookup([0] * 10 + [4, 1, 0, 1, 0]) is None
+        book.close()
+
+
+def test_ai_player_uses_book():
+    """庄家的第一手和第一次压牌按库出牌，之后回到原策略；人数不同时不用库"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "book.bin")
+        build_book(path, 3, games=40, samples=2, seed=2, workers=1)
+        book = OpeningBook(path)
+        responses = 0
+        for index in range(40):
+            game = NewGame(3, sink=NullSink(), seed=game_seed(2, index))
+            players = [AIPlayer(f"AI{seat + 1}", "smart", sink=NullSink(), rng=game.rng, book=book)
+                       for seat in range(3)]
+            game.setup_game(players=players)
+            assert _deal(game_seed(2, index), 3)[0] == players[0].hand.counts
+            turns = game.turns()
+            player = next(turns)
+            entry = book.lookup(player.hand.counts)
+            cards = player.play_turn(None)
+            assert rank_counts(cards) == _move_counts(entry.move)
+            try:
+                for turn in itertools.count(1):
+                    player = turns.send(cards)
+                    entry = player._book_entry(game.last_pattern)
+                    if turn == 1:
+                        assert entry == book.lookup(player.hand.counts, pattern_key(game.last_pattern))
+                        responses += entry is not None
+                    else:
+                        assert entry is None
+                    cards = player.play_turn(game.last_pattern)
+            except StopIteration:
+                pass
+            assert game.winner is not None
+        assert responses > 0
+
+        two = NewGame(2, sink=NullSink(), seed=0)
+        two.setup_game(players=[AIPlayer(f"AI{seat + 1}", sink=NullSink(), book=book) for seat in range(2)])
+        two.players[0].join(two, 0)
+        assert two.players[0]._book_entry(None) is None
+        book.close()
+
+
+if __name__ == "__main__":
+    test_build_and_lookup()
+    test_ai_player_uses_book()
+    print("所有测试完成！")
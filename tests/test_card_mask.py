@@ -0,0 +1,99 @@
+"""整数/位掩码编码测试"""
+
+import sys
+import os
+import copy
+import pickle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card import Card, Rank, Suit, create_deck
+from src.card_mask import (
+    NUM_CARDS, NUM_RANKS, CARD_RANK, RANK_MASKS, FULL_DECK_MASK,
+    card_to_index, index_to_card, create_int_deck, cards_to_mask,
+    mask_to_cards, mask_to_indices, mask_size, mask_rank_counts, rank_counts,
+)
+from src.pattern_analyzer import PatternAnalyzer, PatternType
+
+
+def test_deck_round_trip():
+    """测试编号与create_deck()双向转换"""
+    deck = create_deck()
+    assert create_int_deck() == list(range(NUM_CARDS))
+    for i, card in enumerate(deck):
+        assert card_to_index(card) == i
+        assert index_to_card(i) == card
+        assert CARD_RANK[i] == card.rank.rank_value - 3
+    assert cards_to_mask(deck) == FULL_DECK_MASK
+
+
+def test_joker_suit_ignored():
+    """测试王的花色不影响编码"""
+    assert card_to_index(Card(Suit.CLUBS, Rank.SMALL_JOKER)) == 52
+    assert card_to_index(Card(Suit.DIAMONDS, Rank.BIG_JOKER)) == 53
+
+
+def test_cards_are_interned():
+    """测试同一张牌只有一个不可修改的实例，复制和序列化后仍是它"""
+    deck = create_deck()
+    assert all(a is b for a, b in zip(deck, create_deck()))
+    assert Card(Suit.HEARTS, Rank.SEVEN) is deck[card_to_index(Card(Suit.HEARTS, Rank.SEVEN))]
+    assert index_to_card(5) is deck[5]
+    assert copy.deepcopy(deck) == deck and copy.deepcopy(deck)[0] is deck[0]
+    assert pickle.loads(pickle.dumps(deck[-1])) is deck[-1]
+    assert len({card for card in deck}) == NUM_CARDS
+    try:
+        deck[0].rank = Rank.TWO
+        assert False, "Card应不可修改"
+    except AttributeError:
+        pass
+    assert deck[0].rank == Rank.THREE
+
+    pattern = PatternAnalyzer.analyze_cards([deck[7], deck[5], deck[6]])
+    assert not hasattr(pattern, "__dict__")
+    assert [card.rank_value for card in pattern.cards] == [8, 9, 10]
+
+    played = [deck[7], deck[5], deck[6]]
+    pattern = PatternAnalyzer.analyze_cards(played)
+    played.clear()
+    assert played == [] and [card.rank_value for card in pattern.cards] == [8, 9, 10]
+
+
+def test_mask_and_counts():
+    """测试掩码与牌点计数向量"""
+    cards = [
+        Card(Suit.HEARTS, Rank.SEVEN),
+        Card(Suit.SPADES, Rank.SEVEN),
+        Card(Suit.CLUBS, Rank.TWO),
+        Card(Suit.HEARTS, Rank.SMALL_JOKER),
+    ]
+    mask = cards_to_mask(cards)
+    assert mask_size(mask) == 4
+    assert len(mask_to_indices(mask)) == 4
+    assert sorted(mask_to_cards(mask), key=card_to_index) == sorted(cards, key=card_to_index)
+    assert [c.rank for c in mask_to_cards(mask)] == [Rank.SEVEN, Rank.SEVEN, Rank.TWO, Rank.SMALL_JOKER]
+
+    counts = mask_rank_counts(mask)
+    assert counts == rank_counts(cards)
+    assert len(counts) == NUM_RANKS
+    assert counts[Rank.SEVEN.rank_value - 3] == 2
+    assert sum(counts) == 4
+
+    for rank_idx, rank_mask in enumerate(RANK_MASKS):
+        expected = 1 if rank_idx >= 13 else 4
+        assert mask_size(rank_mask) == expected
+
+
+def test_analyze_mask():
+    """测试直接分析掩码"""
+    mask = cards_to_mask([Card(Suit.HEARTS, Rank.SMALL_JOKER), Card(Suit.SPADES, Rank.BIG_JOKER)])
+    assert PatternAnalyzer.analyze_mask(mask).pattern_type == PatternType.DOUBLE_JOKER
+    assert PatternAnalyzer.analyze_mask(RANK_MASKS[0]).pattern_type == PatternType.HYDROGEN_BOMB
+
+
+if __name__ == "__main__":
+    test_deck_round_trip()
+    test_joker_suit_ignored()
+    test_cards_are_interned()
+    test_mask_and_counts()
+    test_analyze_mask()
+    print("所有测试完成！")
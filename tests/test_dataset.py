@@ -0,0 +1,75 @@
+"""对局轨迹数据集测试（需要numpy）"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.card_mask import pack_counts, unpack_counts
+from src.dataset import COLUMNS, export_games, iter_batches, read_manifest, unpack_hands
+from src.env import ACTIONS, PASS_ACTION
+from src.simulator import game_seed, play_single_game
+
+
+STRATEGIES = ["conservative", "aggressive", "smart", "smart"]
+
+
+def _read_all(path, batch_rows):
+    batches = list(iter_batches(path, batch_rows))
+    return {name: np.concatenate([batch[name] for batch in batches]) for name in COLUMNS}, batches
+
+
+def test_export_matches_new_game():
+    """每局的最终得分与同种子的NewGame相同；实际出牌都在合法出牌中；分片流式读回"""
+    with tempfile.TemporaryDirectory() as directory:
+        compressed = os.path.join(directory, "npz")
+        mapped = os.path.join(directory, "npy")
+        manifest = export_games(compressed, 4, STRATEGIES, 30, seed=3, workers=1, chunk_size=7, shard_rows=200)
+        export_games(mapped, 4, STRATEGIES, 30, seed=3, workers=2, chunk_size=11, shard_rows=500,
+                     compress=False)
+        assert manifest["games"] == 30 and len(manifest["shards"]) > 1
+        assert read_manifest(mapped)["rows"] == manifest["rows"]
+
+        rows, batches = _read_all(compressed, 64)
+        other, _ = _read_all(mapped, 1000)
+        for name in COLUMNS:
+            assert np.array_equal(rows[name], other[name])
+        assert len(rows["game"]) == manifest["rows"]
+        assert all(len(batch["game"]) <= 64 for batch in batches)
+
+        for game_index in range(30):
+            result = play_single_game(4, STRATEGIES, game_seed(3, game_index))
+            picked = rows["game"] == game_index
+            for seat in range(4):
+                assert set(rows["score"][picked & (rows["seat"] == seat)]) <= {result.scores[seat]}
+
+        first = rows["game"] == 0
+        hands = unpack_hands(rows["hand"][first])
+        assert hands[0].sum() == 6 and rows["last"][0] == -1 and rows["action"][0] != PASS_ACTION
+        assert (rows["sizes"][first][:, 0] == hands.sum(axis=1)).all()
+        for batch in batches:
+            offsets = batch["legal_offsets"]
+            assert offsets[0] == 0 and offsets[-1] == len(batch["legal"])
+            for i, action in enumerate(batch["action"]):
+                legal = batch["legal"][offsets[i]:offsets[i + 1]]
+                assert action in legal
+                assert (PASS_ACTION in legal) == (batch["last"][i] >= 0)
+
+
+def test_hand_encoding():
+    """手牌打包成整数后可以按列还原"""
+    counts = [4, 0, 3, 1, 2, 0, 0, 4, 1, 0, 0, 2, 3, 1, 1]
+    packed = np.array([pack_counts(counts), pack_counts([0] * 15)], dtype=np.uint64)
+    assert unpack_hands(packed).tolist() == [counts, [0] * 15]
+    assert unpack_counts(pack_counts(counts)) == counts
+    assert ACTIONS[-1] is None
+
+
+if __name__ == "__main__":
+    test_export_matches_new_game()
+    test_hand_encoding()
+    print("所有测试完成！")
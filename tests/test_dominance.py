@@ -0,0 +1,52 @@
+"""压制表测试"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card import Card, Rank, Suit
+from src.card_mask import RANKS
+from src.pattern_analyzer import (PATTERN_TYPES, Pattern, PatternAnalyzer, PatternType,
+                                  _BEAT_KEYS, _NO_MAIN, _PATTERN_TABLE, _SIZE_SLOTS)
+
+
+def _pattern(type_id, size, main):
+    cards = [Card(Suit.SPADES, Rank.THREE)] * size
+    return Pattern(cards, PATTERN_TYPES[type_id], RANKS[main] if main != _NO_MAIN else None)
+
+
+def test_table_matches_rules():
+    """任意两个驻留的出牌之间，查表结果与逐条判断完全一致"""
+    patterns = [_pattern(*key) for key in _BEAT_KEYS]
+    for a in patterns:
+        assert a.beat_id is not None
+        assert a.can_beat(None)
+        for b in patterns:
+            assert a.can_beat(b) == a._can_beat_rules(b), (a, b)
+
+
+def test_all_analyzed_patterns_are_interned():
+    """analyze_cards能给出的牌型都在压制表中"""
+    for key, (pattern_type, main_rank) in _PATTERN_TABLE.items():
+        cards = [Card(Suit.SPADES, Rank.THREE)] * (key % _SIZE_SLOTS)
+        assert Pattern(cards, pattern_type, main_rank).beat_id is not None
+    long_straight = [Card(suit, rank) for rank in RANKS[:12] for suit in Suit]
+    assert PatternAnalyzer.analyze_cards(long_straight).beat_id is not None
+    assert PatternAnalyzer.analyze_cards([Card(Suit.HEARTS, Rank.BIG_JOKER)]).beat_id is not None
+
+
+def test_fallback_for_unknown_patterns():
+    """手工构造的、不在表中的出牌仍按规则判断"""
+    odd = Pattern([Card(Suit.HEARTS, Rank.FIVE)] * 7, PatternType.PAIR, Rank.FIVE)
+    other = Pattern([Card(Suit.HEARTS, Rank.FOUR)] * 7, PatternType.PAIR, Rank.FOUR)
+    assert odd.beat_id is None
+    assert odd.can_beat(other)
+    bomb = Pattern([Card(Suit.HEARTS, Rank.SIX)] * 3, PatternType.BOMB, Rank.SIX)
+    assert bomb.can_beat(odd) and not odd.can_beat(bomb)
+
+
+if __name__ == "__main__":
+    test_table_matches_rules()
+    test_all_analyzed_patterns_are_interned()
+    test_fallback_for_unknown_patterns()
+    print("所有测试完成！")
@@ -0,0 +1,108 @@
+"""残局求解器测试"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card_mask import CARD_RANK, FULL_DECK_MASK, NUM_RANKS
+from src.endgame import EndgameSolver, SearchLimitExceeded, TranspositionTable
+from src.events import NullSink
+from src.game import NewGame
+from src.game_state import GameState
+
+
+def _random_endgame(rng, player_count, cards):
+    deck = list(range(54))
+    rng.shuffle(deck)
+    hands = []
+    for _ in range(player_count):
+        counts = [0] * NUM_RANKS
+        for _ in range(cards):
+            counts[CARD_RANK[deck.pop()]] += 1
+        hands.append(counts)
+    return GameState(hands, [], dealer=rng.randrange(player_count))
+
+
+def _minimax(state, seat):
+    """不剪枝、不查表的偏执极小化极大"""
+    if state.is_terminal:
+        return state.scores()[seat]
+    values = []
+    for move in state.legal_moves():
+        child = state.copy()
+        child.apply(move)
+        values.append(_minimax(child, seat))
+    return max(values) if state.current == seat else min(values)
+
+
+def test_matches_plain_minimax():
+    """alpha-beta加置换表与朴素极小化极大的结果相同"""
+    rng = random.Random(3)
+    solver = EndgameSolver(max_nodes=None)
+    for player_count, cards in ((2, 4), (2, 5), (3, 3)):
+        for _ in range(15):
+            state = _random_endgame(rng, player_count, cards)
+            values = solver.solve(state)
+            for move, value in values.items():
+                child = state.copy()
+                child.apply(move)
+                assert value == _minimax(child, state.current)
+
+
+def test_small_table_evicts():
+    """置换表满了会淘汰旧条目，结果不受影响"""
+    rng = random.Random(8)
+    small = EndgameSolver(max_entries=50, max_nodes=None)
+    large = EndgameSolver(max_nodes=None)
+    for _ in range(10):
+        state = _random_endgame(rng, 2, 6)
+        assert small.solve(state) == large.solve(state)
+    assert len(small.table) <= 50 and small.table.evictions > 0
+    stats = large.stats()
+    assert stats["nodes"] > 0 and stats["nodes_per_second"] > 0 and 0 < stats["hit_rate"] < 1
+
+    table = TranspositionTable(max_entries=2)
+    table.store("a", 1, 0)
+    table.store("b", 2, 0)
+    table.get("a")
+    table.store("c", 3, 0)
+    assert table.get("b") is None and table.get("a") == (1, 0)
+
+
+def test_node_limit():
+    """超过节点上限时抛出异常"""
+    state = _random_endgame(random.Random(1), 3, 6)
+    try:
+        EndgameSolver(max_nodes=10).solve(state)
+    except SearchLimitExceeded:
+        pass
+    else:
+        assert False
+
+
+def test_ai_switches_to_solver():
+    """牌堆抽完且剩余牌数不超过阈值时AI改用求解器，两人局的必胜残局一定赢"""
+    for seed in range(20):
+        game = NewGame(2, sink=NullSink(), rng=random.Random(seed))
+        game.setup_game(human_players=0, ai_strategies=["smart", "aggressive"], endgame_cards=12)
+        for player in game.players:
+            while len(player.hand) > 5:
+                player.remove_card(player.hand[-1])
+        game.deck = []
+        game.played_mask = FULL_DECK_MASK & ~(game.players[0].hand.mask | game.players[1].hand.mask)
+        state = GameState([player.hand.counts for player in game.players], [], game.dealer_index)
+        _, value = EndgameSolver(max_nodes=None).best_move(state)
+        dealer = game.players[game.dealer_index]
+        game.play_game()
+        assert dealer.endgame_solver is not None
+        if value == 0:
+            assert game.winner is dealer
+
+
+if __name__ == "__main__":
+    test_matches_plain_minimax()
+    test_small_table_evicts()
+    test_node_limit()
+    test_ai_switches_to_solver()
+    print("所有测试完成！")
@@ -0,0 +1,91 @@
+"""强化学习环境测试（需要numpy）"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.env import ACTIONS, NUM_ACTIONS, OBS_SIZE, PASS_ACTION, DengYanEnv, VectorEnv
+from src.events import NullSink
+from src.game import NewGame
+from src.strategy import choose_move
+
+
+def test_policy_agent_reproduces_new_game():
+    """学习座位按smart策略出牌时，结果与同种子的NewGame相同"""
+    for seed in range(20):
+        env = DengYanEnv(3, seat=0, opponents=["aggressive", "conservative"])
+        obs, info = env.reset(seed)
+        terminated = False
+        while not terminated:
+            assert obs.shape == (OBS_SIZE,)
+            state = env.state
+            move = choose_move(state.hands[0], state.last, "smart")
+            action = ACTIONS.index(move)
+            assert info["action_mask"][action]
+            obs, reward, terminated, _, info = env.step(action)
+
+        game = NewGame(3, sink=NullSink(), rng=random.Random(seed))
+        game.setup_game(human_players=0, ai_strategies=["smart", "aggressive", "conservative"])
+        game.play_game()
+        assert info["scores"] == game.scores
+        assert reward == game.scores[0]
+
+
+def test_mask_and_observation():
+    """首出不能跳过，压牌时可以跳过；非法动作报错"""
+    env = DengYanEnv(4, seat=2)
+    obs, info = env.reset(7)
+    mask = info["action_mask"]
+    assert mask.shape == (NUM_ACTIONS,) and mask.any()
+    assert obs[:15].sum() == 5
+    assert (obs[15:18] > 0).all() and (obs[18:20] == 0).all()
+    if env.state.last is None:
+        assert not mask[PASS_ACTION]
+    else:
+        assert mask[PASS_ACTION]
+    illegal = int(np.flatnonzero(~mask)[0])
+    with pytest.raises(ValueError):
+        env.step(illegal)
+
+
+def test_reset_skips_finished_deals():
+    """对手庄家第一手就出完时重新发牌，reset后总有合法动作"""
+    env = DengYanEnv(2, seat=1, opponents=["aggressive"])
+    obs, info = env.reset(701)
+    assert not env.state.is_terminal and info["action_mask"].any()
+    env.step(int(np.flatnonzero(info["action_mask"])[0]))
+    with VectorEnv(2, workers=0, player_count=2, seat=1, opponents=["aggressive"]) as envs:
+        _, masks = envs.reset(seed=700)
+        assert masks.any(axis=1).all()
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_vector_env(workers):
+    """向量化环境：随机合法动作跑完多局，结束的环境自动重开"""
+    rng = np.random.default_rng(0)
+    with VectorEnv(4, workers=workers, player_count=3) as envs:
+        obs, masks = envs.reset(seed=1)
+        assert obs.shape == (4, OBS_SIZE) and masks.shape == (4, NUM_ACTIONS)
+        finished = 0
+        for _ in range(200):
+            actions = [rng.choice(np.flatnonzero(mask)) for mask in masks]
+            obs, rewards, terminated, truncated, masks, infos = envs.step(actions)
+            for done, reward, info in zip(terminated, rewards, infos):
+                if done:
+                    finished += 1
+                    assert reward == info["final_info"]["scores"][0]
+        assert finished > 0
+
+
+if __name__ == "__main__":
+    test_policy_agent_reproduces_new_game()
+    test_mask_and_observation()
+    test_reset_skips_finished_deals()
+    test_vector_env(0)
+    test_vector_env(2)
+    print("所有测试完成！")
@@ -0,0 +1,85 @@
+"""二进制事件日志与重放测试"""
+
+import sys
+import os
+import io
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card_mask import cards_to_mask
+from src.event_log import BinaryLogSink, read_games, replay, state_at
+from src.events import LogSink
+from src.game import NewGame
+
+
+class _TeeSink(BinaryLogSink):
+    """同时保留结构化记录，用来对照"""
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.log = LogSink()
+
+    def emit(self, event, **data):
+        super().emit(event, **data)
+        self.log.emit(event, **data)
+
+
+def _play(sink, seed, player_count=3):
+    game = NewGame(player_count, sink=sink, seed=seed)
+    game.setup_game(human_players=0)
+    game.play_game()
+    return game
+
+
+def test_round_trip():
+    """写入多局再读出：种子、发牌、出牌、补牌、得分都能还原，最终局面与对局一致"""
+    with tempfile.TemporaryFile() as stream:
+        sink = _TeeSink(stream)
+        games = [_play(sink, seed, 2 + seed % 5) for seed in range(30)]
+        stream.seek(0)
+        records = list(read_games(stream, chunk_size=64))
+
+    assert len(records) == len(games)
+    plays = [r for r in sink.log.records if r["event"] == "play"]
+    logged_plays = [mask for record in records for tag, _, mask in record.events if tag == 0x02]
+    assert logged_plays == [cards_to_mask(r["pattern"].cards) for r in plays]
+    for record, game in zip(records, games):
+        assert record.complete and record.seed == game.seed
+        assert record.scores == game.scores
+        assert record.rounds == game.round_count
+        assert record.winner == game.players.index(game.winner)
+        final = list(replay(record))[-1]
+        assert list(final.hands) == [player.hand.mask for player in game.players]
+        assert final.deck_size == len(game.deck)
+        assert state_at(record, 0).hands == tuple(record.hands)
+
+
+def test_truncated_log():
+    """日志在对局中途被截断时，前面的完整对局照常读出，最后一局标记为未结束"""
+    buffer = io.BytesIO()
+    sink = BinaryLogSink(buffer)
+    _play(sink, 1)
+    _play(sink, 2)
+    data = buffer.getvalue()
+    records = list(read_games(io.BytesIO(data[:-20])))
+    assert len(records) == 2
+    assert records[0].complete and not records[1].complete
+    list(replay(records[1]))
+
+
+def test_rejects_oversized_seed():
+    """放不进有符号64位字段的种子直接报错，不写出半条记录"""
+    buffer = io.BytesIO()
+    try:
+        _play(BinaryLogSink(buffer), 1 << 63)
+    except ValueError:
+        assert buffer.getvalue() == b""
+        return
+    raise AssertionError("应当拒绝超过64位的种子")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_truncated_log()
+    test_rejects_oversized_seed()
+    print("所有测试完成！")
@@ -0,0 +1,75 @@
+"""事件输出/无界面模式测试"""
+
+import sys
+import os
+import io
+import random
+from contextlib import redirect_stdout
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card import Card, Rank, Suit
+from src.events import ConsoleSink, GameEvent, LogSink, NullSink
+from src.game import NewGame
+from src.pattern_analyzer import PatternAnalyzer
+from src.player import AIPlayer
+
+
+def _play(sink, seed=3):
+    game = NewGame(3, sink=sink, rng=random.Random(seed))
+    game.setup_game(human_players=0)
+    game.play_game()
+    return game
+
+
+def test_null_sink_is_silent():
+    """无界面模式不产生任何输出"""
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        game = _play(NullSink())
+    assert buffer.getvalue() == ""
+    assert game.game_over and game.winner is not None
+
+
+def test_log_sink_records_events():
+    """结构化日志记录完整的事件流"""
+    sink = LogSink()
+    game = _play(sink)
+    events = [record["event"] for record in sink.records]
+    assert events[0] == GameEvent.SETUP
+    assert events[1] == GameEvent.GAME_START
+    assert GameEvent.PLAY in events and GameEvent.AI_THINKING in events
+    assert events.count(GameEvent.RESULT) == game.player_count
+    assert events.count(GameEvent.ROUND_START) == game.round_count
+
+    stream = io.StringIO()
+    _play(LogSink(stream))
+    assert len(stream.getvalue().splitlines()) == len(sink.records)
+
+
+def test_console_sink_matches_headless_rules():
+    """控制台输出与无界面模式走的是同一套规则"""
+    buffer = io.StringIO()
+    console_game = _play(ConsoleSink(buffer), seed=9)
+    headless_game = _play(NullSink(), seed=9)
+    assert console_game.winner.name == headless_game.winner.name
+    assert console_game.round_count == headless_game.round_count
+    assert "=== 游戏结束 ===" in buffer.getvalue()
+
+
+def test_score_events():
+    """春天和倍率通过事件输出"""
+    buffer = io.StringIO()
+    game = NewGame(2, sink=ConsoleSink(buffer))
+    player = AIPlayer("AI1", sink=NullSink())
+    player.add_cards([Card(Suit.HEARTS, rank) for rank in (Rank.THREE, Rank.FIVE, Rank.SEVEN, Rank.NINE, Rank.JACK)])
+    bomb = PatternAnalyzer.analyze_cards([Card(suit, Rank.KING) for suit in (Suit.HEARTS, Suit.SPADES, Suit.CLUBS)])
+    assert game._calculate_score(player, bomb) == -20
+    assert buffer.getvalue() == "  AI1 春天！扣分翻倍\n  胜利者使用炸弹，扣分 x2\n"
+
+
+if __name__ == "__main__":
+    test_null_sink_is_silent()
+    test_log_sink_records_events()
+    test_console_sink_matches_headless_rules()
+    test_score_events()
+    print("所有测试完成！")
@@ -0,0 +1,71 @@
+"""紧凑对局状态apply/undo及共用规则测试"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card_mask import CARD_RANK, NUM_RANKS, shuffled_int_deck
+from src.game_state import GameState
+from src.rules import deal_order, refill_seats
+
+
+def _deal(rng, player_count):
+    deck = [CARD_RANK[i] for i in shuffled_int_deck(rng)]
+    hands = [[0] * NUM_RANKS for _ in range(player_count)]
+    for seat in deal_order(player_count, 0):
+        hands[seat][deck.pop()] += 1
+    return GameState(hands, deck)
+
+
+def _snapshot(state):
+    return (tuple(map(tuple, state.hands)), tuple(state.sizes), state.deck_size, state.current, state.last,
+            state.passes, state.round_winner, state.winner, state.round_count, state.key())
+
+
+def test_apply_undo_round_trip():
+    """随机打完一局后逐步undo，每一步都回到apply之前的局面，哈希与重新计算的一致"""
+    rng = random.Random(5)
+    for game in range(40):
+        state = _deal(rng, 2 + game % 5)
+        snapshots = []
+        while not state.is_terminal:
+            snapshots.append(_snapshot(state))
+            moves = state.legal_moves()
+            state.apply(moves[rng.randrange(len(moves))])
+            fresh = GameState(state.hands, state.deck)
+            assert state.hand_hash == fresh.hand_hash
+        assert state.depth == len(snapshots)
+        while snapshots:
+            state.undo()
+            assert _snapshot(state) == snapshots.pop()
+        assert state.depth == 0
+
+
+def test_key_distinguishes_positions():
+    """同一局面的键相同，手牌或轮次状态不同则键不同"""
+    rng = random.Random(8)
+    state = _deal(rng, 3)
+    other = state.copy()
+    assert other.key() == state.key()
+    move = state.legal_moves()[0]
+    other.apply(move)
+    assert other.key() != state.key()
+    other.undo()
+    assert other.key() == state.key()
+
+
+def test_refill_seats():
+    """补牌：有人出牌时只有最后出牌者，全部跳过时按座位补到牌堆抽完"""
+    assert refill_seats(2, [3, 4, 5], 10) == [2]
+    assert refill_seats(2, [3, 4, 5], 0) == []
+    assert refill_seats(-1, [3, 4, 5], 10) == [0, 1, 2]
+    assert refill_seats(-1, [3, 4, 5], 2) == [0, 1]
+    assert deal_order(3, 1) == [1] * 6 + [0] * 5 + [2] * 5
+
+
+if __name__ == "__main__":
+    test_apply_undo_round_trip()
+    test_key_distinguishes_positions()
+    test_refill_seats()
+    print("所有测试完成！")
@@ -0,0 +1,65 @@
+"""手牌容器测试"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card import Card, Rank, Suit, create_deck
+from src.card_mask import cards_to_mask, rank_counts
+from src.hand import Hand
+from src.player import AIPlayer
+
+
+def test_matches_sorted_list():
+    """随机加牌/出牌后，与"追加后排序"的列表保持一致"""
+    rng = random.Random(5)
+    deck = create_deck()
+    rng.shuffle(deck)
+    hand, reference = Hand(), []
+    for step in range(300):
+        if deck and (not reference or rng.random() < 0.6):
+            card = deck.pop()
+            hand.add(card)
+            reference.append(card)
+            reference.sort()
+        else:
+            card = rng.choice(reference)
+            assert hand.remove(Card(card.suit, card.rank))
+            reference.remove(card)
+            deck.append(card)
+        assert list(hand) == reference
+        assert len(hand) == len(reference)
+        assert hand.counts == rank_counts(reference)
+        assert hand.mask == cards_to_mask(reference)
+        if reference:
+            assert hand[0] == reference[0] and hand[-1] == reference[-1]
+            assert hand[len(reference) // 2] == reference[len(reference) // 2]
+
+
+def test_missing_card():
+    """移除不存在的牌不报错"""
+    hand = Hand([Card(Suit.HEARTS, Rank.FIVE)])
+    assert not hand.remove(Card(Suit.SPADES, Rank.FIVE))
+    assert Card(Suit.HEARTS, Rank.FIVE) in hand
+    assert Card(Suit.SPADES, Rank.FIVE) not in hand
+    assert str(hand) == "♥5"
+
+
+def test_player_uses_hand():
+    """玩家的手牌就是Hand，最小对子直接从分桶中取"""
+    ai = AIPlayer("测试AI")
+    ai.add_cards([Card(Suit.HEARTS, Rank.NINE), Card(Suit.SPADES, Rank.SIX),
+                  Card(Suit.CLUBS, Rank.NINE), Card(Suit.HEARTS, Rank.SIX)])
+    assert isinstance(ai.hand, Hand)
+    assert ai.show_hand() == "♠6 ♥6 ♥9 ♣9"
+    assert ai._find_smallest_pair() == [Card(Suit.SPADES, Rank.SIX), Card(Suit.HEARTS, Rank.SIX)]
+    ai.remove_cards([Card(Suit.SPADES, Rank.SIX)])
+    assert ai._find_smallest_pair() == [Card(Suit.HEARTS, Rank.NINE), Card(Suit.CLUBS, Rank.NINE)]
+
+
+if __name__ == "__main__":
+    test_matches_sorted_list()
+    test_missing_card()
+    test_player_uses_hand()
+    print("所有测试完成！")
@@ -0,0 +1,120 @@
+"""信息集MCTS AI及紧凑对局状态测试"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card import create_deck
+from src.card_mask import CARD_RANK, card_to_index
+from src.events import NullSink
+from src.game import NewGame
+from src.game_state import GameState
+from src.mcts import MCTSPlayer
+from src.pattern_analyzer import PatternAnalyzer
+from src.player import AIPlayer
+from src.strategy import choose_move
+
+
+def _new_game(seed, strategies, player_count=3):
+    game = NewGame(player_count, sink=NullSink(), rng=random.Random(seed))
+    game.setup_game(human_players=0, ai_strategies=strategies)
+    return game
+
+
+def test_state_replays_headless_games():
+    """GameState按AIPlayer的策略打完，与NewGame的胜者、得分、轮数完全一致"""
+    for seed in range(60):
+        player_count = 2 + seed % 5
+        strategies = ["conservative", "aggressive", "smart"]
+        game = _new_game(seed, strategies, player_count)
+        hands = [player.hand.counts for player in game.players]
+        deck = [CARD_RANK[card_to_index(card)] for card in game.deck]
+        state = GameState(hands, deck, game.dealer_index)
+        scores = state.play_out([strategies[i % 3] for i in range(player_count)])
+        game.play_game()
+        assert state.winner == game.players.index(game.winner)
+        assert scores == game.scores
+        assert state.round_count == game.round_count
+
+
+def test_strategy_matches_ai_player():
+    """出牌层面的策略与AIPlayer的选择相同"""
+    rng = random.Random(11)
+    for _ in range(400):
+        deck = create_deck()
+        rng.shuffle(deck)
+        hand = deck[:rng.randint(1, 12)]
+        last = None
+        if rng.random() < 0.7:
+            last = PatternAnalyzer.analyze_cards(deck[20:20 + rng.choice([1, 1, 2, 3, 4])])
+        for strategy in ("conservative", "aggressive", "smart"):
+            ai = AIPlayer("AI", strategy, sink=NullSink())
+            ai.add_cards(hand)
+            cards = ai.play_turn(last)
+            key = (last.pattern_type, last.main_rank.rank_value - 3 if last.main_rank else -1, last.size) if last else None
+            move = choose_move(ai.hand.counts, key, strategy)
+            if move is None:
+                assert cards is None
+            else:
+                assert sorted(card.rank.rank_value - 3 for card in cards) == \
+                    sorted(i for i in move.ranks for _ in range(move.width))
+
+
+def test_determinization_keeps_public_information():
+    """确定化采样保留自己的手牌、各家张数和牌堆张数，且不会发出已出过的牌"""
+    game = _new_game(4, ["smart"])
+    for seat, player in enumerate(game.players):
+        player.join(game, seat)
+    game.current_player_index = 1
+    rng = random.Random(0)
+    for _ in range(20):
+        state = GameState.from_game(game, 1, rng)
+        assert state.hands[1] == game.players[1].hand.counts
+        assert state.sizes == [len(player.hand) for player in game.players]
+        assert len(state.deck) == len(game.deck)
+        assert sum(state.sizes) + len(state.deck) == 54
+
+
+def test_mcts_plays_legal_games():
+    """MCTS AI在迭代/时间预算内完成整局，每一手都在legal_moves()中，并记录搜索统计"""
+    for seed in range(3):
+        game = NewGame(3, sink=NullSink(), rng=random.Random(seed))
+        game.setup_game(human_players=0, ai_strategies=["mcts", "smart", "conservative"])
+        mcts = game.players[0]
+        assert isinstance(mcts, MCTSPlayer)
+        mcts.iterations = 30
+        turns = game.turns()
+        moves = 0
+        try:
+            player = next(turns)
+            while True:
+                legal = None
+                if player is mcts:
+                    legal = GameState.from_game(game, 0, random.Random(0)).legal_moves()
+                cards = player.play_turn(game.last_pattern)
+                if legal is not None:
+                    played = None if cards is None else sorted(CARD_RANK[card_to_index(card)] for card in cards)
+                    assert played in [None if move is None else sorted(i for i in move.ranks for _ in range(move.width))
+                                      for move in legal]
+                    moves += 1
+                player = turns.send(cards)
+        except StopIteration:
+            pass
+        assert game.game_over and game.winner is not None and moves > 0
+        assert "rollouts_per_second" in mcts.last_search_stats
+
+    timed = MCTSPlayer("M", time_limit=0.02, sink=NullSink(), rng=random.Random(1))
+    game = _new_game(2, ["smart"])
+    timed.add_cards(list(game.players[0].hand))
+    game.players[0] = timed
+    game.play_game()
+    assert game.game_over and timed.last_search_stats
+
+
+if __name__ == "__main__":
+    test_state_replays_headless_games()
+    test_strategy_matches_ai_player()
+    test_determinization_keeps_public_information()
+    test_mcts_plays_legal_games()
+    print("所有测试完成！")
@@ -0,0 +1,64 @@
+"""分阶段性能统计测试"""
+
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.events import GameEvent, LogSink, NullSink
+from src.game import NewGame
+from src.metrics import GameMetrics, MetricsHistogram
+from src.simulator import simulate
+
+
+def _play(seed, sink, metrics=None):
+    game = NewGame(3, sink=sink, seed=seed, metrics=metrics)
+    game.setup_game(human_players=0)
+    game.play_game()
+    return game
+
+
+def test_game_metrics_phases():
+    """各阶段的调用次数与对局过程一致，开启统计不改变对局结果"""
+    for seed in range(10):
+        sink = LogSink()
+        metrics = GameMetrics()
+        game = _play(seed, sink, metrics)
+        plain = _play(seed, NullSink())
+        assert game.scores == plain.scores and game.round_count == plain.round_count
+
+        events = [record["event"] for record in sink.records]
+        assert metrics.calls["deal"] == 1
+        assert metrics.calls["results"] == 1
+        assert metrics.calls["round"] == game.round_count
+        assert metrics.calls["analyze"] == events.count(GameEvent.PLAY)
+        assert metrics.calls["output"] == len(events)
+        assert metrics.calls["ai_decision"] == events.count(GameEvent.AI_THINKING)
+        decisions = sum(sum(values.values()) for values in metrics.counts.values())
+        assert 0 < decisions <= metrics.calls["ai_decision"]
+        summary = metrics.summary()
+        assert summary["phases"]["round"]["seconds"] >= summary["phases"]["analyze"]["seconds"]
+        json.dumps(summary)
+
+
+def test_histograms_merge():
+    """汇总可以合并，且与进程数无关；NullSink时不计output阶段"""
+    single = simulate(3, ["smart"], 60, seed=1, workers=1, chunk_size=20, profile=True)
+    assert single.metrics.games == 60
+    assert "output" not in single.metrics.seconds
+    assert sum(single.metrics.histograms["round"]) == 60
+    assert single.metrics.calls["round"] == single.total_rounds
+
+    merged = MetricsHistogram()
+    for seed in range(3):
+        part = simulate(3, ["smart"], 20, seed=seed, workers=1, profile=True)
+        merged.merge(part.metrics)
+    assert merged.games == 60
+    assert merged.percentile("round", 0.5) <= merged.percentile("round", 0.99)
+    json.dumps(single.to_dict())
+
+
+if __name__ == "__main__":
+    test_game_metrics_phases()
+    test_histograms_merge()
+    print("所有测试完成！")
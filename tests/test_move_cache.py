@@ -0,0 +1,96 @@
+"""出牌缓存测试"""
+
+import sys
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card_mask import mask_rank_counts
+from src.events import NullSink
+from src.game import NewGame
+from src.move_cache import MOVE_CACHE, MoveCache
+from src.move_generator import MOVES, generate_moves, generate_responses_to_key
+
+
+def test_cache_matches_generator():
+    """缓存结果与生成器相同；容量满后淘汰最久未使用的条目"""
+    rng = random.Random(5)
+    cache = MoveCache(max_entries=50)
+    keys = [None] + [move.key for move in MOVES.values()]
+    for _ in range(2000):
+        counts = mask_rank_counts(rng.getrandbits(54) & rng.getrandbits(54))
+        last_key = rng.choice(keys)
+        expected = generate_moves(counts) if last_key is None else generate_responses_to_key(counts, last_key)
+        assert list(cache.moves(counts, last_key)) == expected
+        assert list(cache.moves(counts, last_key)) == expected
+    assert len(cache) == 50 and cache.evictions > 0
+    assert cache.hits >= 2000 and 0.5 <= cache.hit_rate < 1
+    assert cache.memory_bytes() > 0
+
+    cache.enabled = False
+    cache.clear()
+    assert list(cache.moves([1] * 15)) == generate_moves([1] * 15)
+    assert cache.probes == 0 and len(cache) == 0
+
+
+def test_games_unchanged_without_cache():
+    """关闭共享缓存后对局结果不变"""
+    results = []
+    for enabled in (True, False):
+        MOVE_CACHE.enabled = enabled
+        try:
+            scores = []
+            for seed in range(20):
+                game = NewGame(2 + seed % 5, sink=NullSink(), seed=seed)
+                game.setup_game(human_players=0, ai_strategies=["conservative", "aggressive", "smart"])
+                game.play_game()
+                scores.append((game.scores, game.round_count))
+            results.append(scores)
+        finally:
+            MOVE_CACHE.enabled = True
+    assert results[0] == results[1]
+
+
+class _YieldingDict(OrderedDict):
+    """查到条目后让出GIL，放大"查到后、移到末尾前被别的线程淘汰"的窗口"""
+
+    def get(self, key, default=None):
+        value = super().get(key, default)
+        time.sleep(0)
+        return value
+
+
+def test_cache_thread_safe():
+    """多个线程共用一个很小的缓存：淘汰与命中交错时结果仍然正确、不抛异常"""
+    cache = MoveCache(max_entries=8)
+    cache._entries = _YieldingDict()
+    hands = [mask_rank_counts(random.Random(seed).getrandbits(54) & random.Random(-seed).getrandbits(54))
+             for seed in range(10)]
+    expected = [generate_moves(counts) for counts in hands]
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(2000):
+                index = (i * 7 + offset) % len(hands)
+                assert list(cache.moves(hands[index])) == expected[index]
+        except Exception as error:  # 线程里的异常交给主线程断言
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(cache) <= 8 and cache.probes == 8000
+
+
+if __name__ == "__main__":
+    test_cache_matches_generator()
+    test_games_unchanged_without_cache()
+    test_cache_thread_safe()
+    print("所有测试完成！")
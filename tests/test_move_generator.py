@@ -0,0 +1,130 @@
+"""出牌生成器测试"""
+
+import sys
+import os
+import random
+from itertools import product
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card import Card, Rank, Suit, create_deck
+from src.card_mask import rank_counts
+from src.pattern_analyzer import PatternAnalyzer, PatternType
+from src.move_generator import (
+    MOVES, generate_moves, generate_patterns, generate_responses, generate_response_patterns,
+    rank_buckets, move_cards, move_to_pattern,
+)
+from src.player import AIPlayer
+
+
+def _brute_force_moves(counts):
+    """穷举手牌的所有子多重集，保留每个牌点张数相同的连续牌点组合"""
+    expected = set()
+    for sub in product(*(range(c + 1) for c in counts)):
+        used = [i for i, c in enumerate(sub) if c]
+        if not used:
+            continue
+        widths = {sub[i] for i in used}
+        if len(widths) != 1 or used[-1] - used[0] + 1 != len(used):
+            continue
+        entry = PatternAnalyzer.lookup_counts(list(sub))
+        if entry is not None:
+            expected.add((entry[0], used[-1], len(used), widths.pop()))
+    return expected
+
+
+def test_generate_moves_matches_brute_force():
+    """随机手牌上与穷举结果一致"""
+    rng = random.Random(2024)
+    deck = create_deck()
+    for _ in range(200):
+        hand = rng.sample(deck, rng.randint(1, 9))
+        moves = generate_moves(rank_counts(hand))
+        assert len(set(moves)) == len(moves)
+        assert set(tuple(m) for m in moves) == _brute_force_moves(rank_counts(hand))
+
+
+def test_patterns_are_classified():
+    """生成的Pattern与analyze_cards的判定一致，且取的是手牌中的牌"""
+    rng = random.Random(7)
+    deck = create_deck()
+    for size in (5, 17, 40):
+        hand = sorted(rng.sample(deck, size))
+        buckets = rank_buckets(hand)
+        for pattern in generate_patterns(hand):
+            analyzed = PatternAnalyzer.analyze_cards(pattern.cards)
+            assert (analyzed.pattern_type, analyzed.main_rank) == (pattern.pattern_type, pattern.main_rank)
+            assert all(card in hand for card in pattern.cards)
+        for move in generate_moves(rank_counts(hand)):
+            assert len(move_cards(move, buckets)) == move.size
+            assert move.rank_sum == sum(card.rank.rank_value for card in move_cards(move, buckets))
+
+
+def test_ai_uses_generator():
+    """AI的候选与生成器一致，允许出3张的连牌"""
+    ai = AIPlayer("测试AI", "conservative")
+    ai.add_cards([Card(Suit.HEARTS, Rank.FIVE), Card(Suit.SPADES, Rank.SIX),
+                  Card(Suit.CLUBS, Rank.SEVEN), Card(Suit.HEARTS, Rank.SMALL_JOKER),
+                  Card(Suit.SPADES, Rank.BIG_JOKER)])
+    patterns = [PatternAnalyzer.analyze_cards(cards) for cards in ai._generate_all_patterns()]
+    types = [p.pattern_type for p in patterns]
+    assert types.count(PatternType.SINGLE) == 3
+    assert PatternType.STRAIGHT in types
+    assert PatternType.DOUBLE_JOKER in types
+
+    last = PatternAnalyzer.analyze_cards([Card(Suit.CLUBS, Rank.THREE), Card(Suit.CLUBS, Rank.FOUR),
+                                          Card(Suit.CLUBS, Rank.FIVE)])
+    plays = ai._find_beating_patterns(last)
+    assert [PatternAnalyzer.analyze_cards(cards).pattern_type for cards in plays] == [PatternType.DOUBLE_JOKER]
+
+
+def _last_patterns():
+    """所有可能的上家出牌：生成器能产生的全部出牌，再加上无效牌和多张同点的连牌"""
+    full = rank_buckets(create_deck())
+    patterns = [move_to_pattern(move, full) for move in MOVES.values()]
+    patterns.append(PatternAnalyzer.analyze_cards([Card(Suit.HEARTS, Rank.SMALL_JOKER)]))
+    patterns.append(PatternAnalyzer.analyze_cards([Card(Suit.HEARTS, Rank.THREE), Card(Suit.SPADES, Rank.THREE),
+                                                   Card(Suit.CLUBS, Rank.THREE), Card(Suit.HEARTS, Rank.FOUR),
+                                                   Card(Suit.HEARTS, Rank.FIVE)]))
+    return patterns
+
+
+def test_responses_match_filtered_moves():
+    """定向生成与"全部生成再用can_beat过滤"的结果和顺序完全一致"""
+    rng = random.Random(11)
+    deck = create_deck()
+    last_patterns = _last_patterns()
+    last_patterns += [p for p in PatternAnalyzer.find_all_patterns(deck) if p.pattern_type == PatternType.STRAIGHT_PAIRS]
+    for size in (1, 5, 6, 17, 40):
+        for _ in range(10):
+            hand = sorted(rng.sample(deck, size))
+            listed = PatternAnalyzer.find_all_patterns(hand)
+            for last in last_patterns:
+                expected = [p for p in generate_patterns(hand) if p.can_beat(last)]
+                actual = generate_response_patterns(hand, last)
+                assert [(p.pattern_type, p.main_rank, p.cards) for p in actual] == \
+                    [(p.pattern_type, p.main_rank, p.cards) for p in expected], (hand, last)
+                assert len(generate_responses(rank_counts(hand), last)) == len(expected)
+                valid = PatternAnalyzer.find_valid_plays(hand, last)
+                assert [(p.pattern_type, p.main_rank, p.cards) for p in valid] == \
+                    [(p.pattern_type, p.main_rank, p.cards) for p in listed if p.can_beat(last)], (hand, last)
+
+
+def test_find_all_patterns_labels_straight_pairs():
+    """find_all_patterns把连续的对子标成连队；出牌时analyze_cards仍按连牌比较"""
+    hand = [Card(Suit.HEARTS, Rank.THREE), Card(Suit.SPADES, Rank.THREE),
+            Card(Suit.HEARTS, Rank.FOUR), Card(Suit.SPADES, Rank.FOUR)]
+    labelled = [p for p in PatternAnalyzer.find_all_patterns(hand) if p.size == 4]
+    assert [(p.pattern_type, p.main_rank) for p in labelled] == [(PatternType.STRAIGHT_PAIRS, Rank.FOUR)]
+    assert [p.cards for p in PatternAnalyzer.find_valid_plays(hand)] == \
+        [p.cards for p in PatternAnalyzer.find_all_patterns(hand)]
+    assert PatternAnalyzer.analyze_cards(hand).pattern_type == PatternType.STRAIGHT
+    assert [p.pattern_type for p in generate_patterns(hand) if p.size == 4] == [PatternType.STRAIGHT]
+
+
+if __name__ == "__main__":
+    test_generate_moves_matches_brute_force()
+    test_patterns_are_classified()
+    test_ai_uses_generator()
+    test_responses_match_filtered_moves()
+    test_find_all_patterns_labels_straight_pairs()
+    print("所有测试完成！")
@@ -0,0 +1,90 @@
+"""牌型查找表测试"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card import Card, Rank, Suit
+from src.card_mask import NUM_RANKS, RANKS
+from src.pattern_analyzer import PatternAnalyzer, PatternType, _PATTERN_TABLE, _SIZE_SLOTS, _RANK_LIMITS
+
+SUITS = list(Suit)
+
+
+def _cards_from_counts(counts):
+    """按计数向量构造一组牌"""
+    cards = []
+    for rank_idx, count in enumerate(counts):
+        for k in range(count):
+            cards.append(Card(SUITS[k], RANKS[rank_idx]))
+    return cards
+
+
+def _iter_counts(max_cards):
+    """枚举这副牌中所有不超过max_cards张的牌点计数向量"""
+    counts = [0] * NUM_RANKS
+
+    def walk(rank_idx, remaining):
+        if rank_idx == NUM_RANKS:
+            yield list(counts)
+            return
+        for count in range(min(_RANK_LIMITS[rank_idx], remaining) + 1):
+            counts[rank_idx] = count
+            yield from walk(rank_idx + 1, remaining - count)
+        counts[rank_idx] = 0
+
+    return walk(0, max_cards)
+
+
+def _assert_same(cards):
+    fast = PatternAnalyzer.analyze_cards(cards)
+    slow = PatternAnalyzer._analyze_cards_slow(cards)
+    assert fast.pattern_type == slow.pattern_type, cards
+    assert fast.main_rank == slow.main_rank, cards
+    assert fast.size == slow.size
+    assert fast.cards == slow.cards
+
+
+def test_table_entries_match_slow_path():
+    """表中每个合法出牌都与逐条判断的结果一致"""
+    for key, (pattern_type, main_rank) in _PATTERN_TABLE.items():
+        signature, size = divmod(key, _SIZE_SLOTS)
+        counts = []
+        for _ in range(NUM_RANKS):
+            signature, count = divmod(signature, 5)
+            counts.append(count)
+        assert sum(counts) == size
+        cards = _cards_from_counts(counts)
+        slow = PatternAnalyzer._analyze_cards_slow(cards)
+        assert (slow.pattern_type, slow.main_rank) == (pattern_type, main_rank)
+        assert PatternAnalyzer.lookup_counts(counts) == (pattern_type, main_rank)
+
+
+def test_all_small_inputs_match_slow_path():
+    """所有不超过6张的牌点组合都与逐条判断的结果一致
+
+    未命中的输入直接走逐条判断，所以表项和小规模穷举一起覆盖了全部输入。
+    """
+    checked = 0
+    for counts in _iter_counts(6):
+        _assert_same(_cards_from_counts(counts))
+        valid = PatternAnalyzer._analyze_cards_slow(_cards_from_counts(counts)).pattern_type != PatternType.INVALID
+        assert (PatternAnalyzer.lookup_counts(counts) is not None) == (valid and sum(counts) > 0)
+        checked += 1
+    assert checked == 46440
+
+
+def test_out_of_deck_inputs():
+    """超出一副牌的输入（重复牌、两张小王）也保持原有结果"""
+    five_threes = [Card(Suit.HEARTS, Rank.THREE)] * 5
+    _assert_same(five_threes)
+    _assert_same([Card(Suit.HEARTS, Rank.SMALL_JOKER), Card(Suit.SPADES, Rank.SMALL_JOKER)])
+    _assert_same([Card(Suit.HEARTS, Rank.FOUR)] * 8)
+    assert PatternAnalyzer.lookup_counts([5] + [0] * (NUM_RANKS - 1)) is None
+
+
+if __name__ == "__main__":
+    test_table_entries_match_slow_path()
+    test_all_small_inputs_match_slow_path()
+    test_out_of_deck_inputs()
+    print("所有测试完成！")
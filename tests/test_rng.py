@@ -0,0 +1,46 @@
+"""可注入随机数生成器测试"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card_mask import card_to_index, shuffled_int_deck
+from src.events import LogSink, NullSink
+from src.game import NewGame
+
+
+def _play(seed):
+    sink = LogSink()
+    game = NewGame(4, sink=sink, rng=random.Random(seed))
+    game.setup_game(human_players=0)
+    game.play_game()
+    return game, sink.records
+
+
+def test_same_seed_same_game():
+    """同一种子逐事件重放一致，且不受全局random影响"""
+    random.seed(1)
+    first, first_events = _play(123)
+    random.seed(2)
+    second, second_events = _play(123)
+    assert first.deck_order == second.deck_order
+    assert [str(r) for r in first_events] == [str(r) for r in second_events]
+    assert first.scores == second.scores
+
+
+def test_deck_follows_int_order():
+    """牌堆与整数牌序一一对应"""
+    game = NewGame(3, sink=NullSink(), rng=random.Random(9))
+    game.setup_game(human_players=0)
+    assert sorted(game.deck_order) == list(range(54))
+    dealt = 6 + 5 * 2
+    assert [card_to_index(card) for card in game.deck] == game.deck_order[:54 - dealt]
+    assert game.deck_order == shuffled_int_deck(random.Random(9))
+    assert all(player.rng is game.rng for player in game.players)
+
+
+if __name__ == "__main__":
+    test_same_seed_same_game()
+    test_deck_follows_int_order()
+    print("所有测试完成！")
@@ -0,0 +1,180 @@
+"""异步多桌服务器测试"""
+
+import sys
+import os
+import asyncio
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.card_mask import CARD_RANK, NUM_RANKS
+from src.move_generator import generate_moves
+from src.pattern_analyzer import PatternType
+from src.server import GameServer
+from src.strategy import choose_move
+
+
+async def _send(writer, message):
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+async def _receive(reader):
+    return json.loads(await reader.readline())
+
+
+def _answer(message):
+    """按smart策略应答一次turn消息"""
+    hand = message["hand"]
+    counts = [0] * NUM_RANKS
+    for index in hand:
+        counts[CARD_RANK[index]] += 1
+    move = choose_move(counts, tuple(message["last"]) if message["last"] else None, "smart")
+    if move is not None and move.pattern_type == PatternType.INVALID and generate_moves(counts):
+        move = generate_moves(counts)[0]
+    if move is None:
+        return {"op": "pass"}
+    cards = []
+    for rank_idx in move.ranks:
+        cards += [index for index in hand if CARD_RANK[index] == rank_idx][:move.width]
+    return {"op": "play", "cards": cards}
+
+
+async def _play(reader, writer, join, on_turn=_answer):
+    """打完一局，返回收到的所有消息（join为None时已经入座）"""
+    if join is not None:
+        await _send(writer, join)
+    messages = []
+    while True:
+        message = await _receive(reader)
+        messages.append(message)
+        if message["type"] == "turn":
+            reply = on_turn(message)
+            if reply is not None:
+                await _send(writer, reply)
+        elif message["type"] == "game_over":
+            return messages
+
+
+def test_concurrent_tables_and_shared_table():
+    """多张私人桌并发打完；两个连接凑同一张桌，别人补的牌不公开"""
+    async def scenario():
+        server = GameServer(port=0, turn_timeout=5.0)
+        port = await server.start()
+        connections = [await asyncio.open_connection("127.0.0.1", port) for _ in range(6)]
+        joins = [{"op": "join", "players": 3, "seed": i} for i in range(4)]
+        joins += [{"op": "join", "players": 4, "humans": 2, "table": "shared", "seed": 9}] * 2
+        results = await asyncio.gather(*(_play(reader, writer, join)
+                                         for (reader, writer), join in zip(connections, joins)))
+        for _, writer in connections:
+            writer.close()
+        await server.close()
+        return results, server
+
+    results, server = asyncio.run(scenario())
+    assert server.tables_started == server.tables_finished == 5
+    for messages in results:
+        over = messages[-1]
+        assert over["winner"] >= 0 and over["scores"][over["winner"]] == 0
+        assert not any(message["type"] == "error" for message in messages)
+    seats = [next(m for m in messages if m["type"] == "joined") for messages in results[4:]]
+    assert {joined["table"] for joined in seats} == {"shared"}
+    assert sorted(joined["seat"] for joined in seats) == [0, 1]
+    for messages, joined in zip(results[4:], seats):
+        for message in messages:
+            if message["type"] == "event" and message["event"] == "refill":
+                assert (message["card"] is not None) == (message["player"] == joined["name"])
+            assert not (message["type"] == "event" and message["event"] == "setup" and "hands" in message)
+
+
+def test_invalid_moves_and_timeout():
+    """非法出牌收到错误提示后可以重试；超时由服务器代为出牌"""
+    async def scenario():
+        server = GameServer(port=0, turn_timeout=0.05)
+        port = await server.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        state = {"turns": 0}
+
+        def on_turn(message):
+            state["turns"] += 1
+            if state["turns"] == 1:
+                return {"op": "play", "cards": [index for index in range(54) if index not in message["hand"]][:1]}
+            return None  # 之后一直不应答，等超时
+
+        messages = await _play(reader, writer, {"op": "join", "players": 2, "seed": 3}, on_turn)
+        writer.close()
+        await server.close()
+        return messages
+
+    messages = asyncio.run(scenario())
+    errors = [message["message"] for message in messages if message["type"] == "error"]
+    assert errors == ["出的牌不在手中"]
+    assert messages[-1]["type"] == "game_over"
+    plays = [message for message in messages if message["type"] == "event" and message["event"] in ("play", "pass")]
+    assert any(message["player"] == "玩家1" for message in plays)
+
+
+def test_abandoned_waiting_table():
+    """等人的桌上所有连接都断开后，桌子被移除，同名加入会开一张新桌"""
+    async def scenario():
+        server = GameServer(port=0, turn_timeout=5.0)
+        port = await server.start()
+        join = {"op": "join", "players": 3, "humans": 2, "table": "lobby", "seed": 4}
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await _send(writer, join)
+        first = await _receive(reader)
+        abandoned = server.waiting_tables["lobby"]
+        writer.close()
+        for _ in range(200):
+            if "lobby" not in server.waiting_tables:
+                break
+            await asyncio.sleep(0.01)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await _send(writer, join)
+        second = await _receive(reader)
+        replaced = server.waiting_tables["lobby"]
+        writer.close()
+        await server.close()
+        return first, second, abandoned, replaced, server
+
+    first, second, abandoned, replaced, server = asyncio.run(scenario())
+    assert first["seat"] == second["seat"] == 0
+    assert replaced is not abandoned and server.tables_started == 0
+
+
+def test_join_table_names():
+    """不给桌名的多人桌用返回的"#编号"凑桌；整数桌名与字符串同名；其他类型的桌名报错"""
+    async def scenario():
+        server = GameServer(port=0, turn_timeout=5.0)
+        port = await server.start()
+        connections = [await asyncio.open_connection("127.0.0.1", port) for _ in range(5)]
+        (reader, writer), joiner = connections[0], connections[1]
+        await _send(writer, {"op": "join", "players": 3, "humans": 2, "seed": 1})
+        opened = await _receive(reader)
+        results = await asyncio.wait_for(asyncio.gather(
+            _play(reader, writer, None),
+            _play(*joiner, {"op": "join", "table": opened["table"]})), timeout=30)
+        replies = []
+        for (reader, writer), name in zip(connections[2:], (7, "7", ["x"])):
+            await _send(writer, {"op": "join", "players": 3, "humans": 3, "table": name})
+            replies.append(await _receive(reader))
+        waiting = sorted(server.waiting_tables)
+        for _, writer in connections:
+            writer.close()
+        await server.close()
+        return opened, results, replies, waiting, server
+
+    opened, results, replies, waiting, server = asyncio.run(scenario())
+    assert opened["type"] == "joined" and opened["table"].startswith("#")
+    assert server.tables_started == server.tables_finished == 1
+    assert all(messages[-1]["type"] == "game_over" for messages in results)
+    assert [reply.get("table") for reply in replies[:2]] == ["7", "7"]
+    assert [reply.get("seat") for reply in replies[:2]] == [0, 1]
+    assert replies[2]["type"] == "error" and waiting == ["7"]
+
+
+if __name__ == "__main__":
+    test_concurrent_tables_and_shared_table()
+    test_invalid_moves_and_timeout()
+    test_abandoned_waiting_table()
+    test_join_table_names()
+    print("所有测试完成！")
@@ -0,0 +1,100 @@
+"""批量模拟器测试"""
+
+import sys
+import os
+import io
+import random
+from contextlib import redirect_stderr
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.aggregator import PairedStats
+from src.event_log import BinaryLogSink, read_games
+from src.simulator import MAX_SEED, duplicate, game_seed, lineup, main, play_single_game, rotations, simulate
+
+
+def test_single_game_reproducible():
+    """同一个种子重放得到完全相同的结果"""
+    strategies = lineup(4, ["smart", "aggressive"])
+    assert strategies == ["smart", "aggressive", "smart", "aggressive"]
+    first = play_single_game(4, strategies, game_seed(7, 3))
+    second = play_single_game(4, strategies, game_seed(7, 3))
+    assert first == second
+    assert first.winner >= 0 and first.scores[first.winner] == 0
+    assert all(score <= 0 for score in first.scores)
+
+
+def test_summary_independent_of_workers_and_chunks():
+    """汇总结果与进程数、分块大小无关"""
+    serial = simulate(3, ["conservative", "aggressive", "smart"], 40, seed=1, workers=1, chunk_size=7)
+    parallel = simulate(3, ["conservative", "aggressive", "smart"], 40, seed=1, workers=2, chunk_size=15)
+    assert serial.to_dict() == parallel.to_dict()
+    assert serial.games == 40
+    assert sum(serial.wins) == 40
+    assert abs(sum(serial.win_rate(i) for i in range(3)) - 1.0) < 1e-9
+    assert set(serial.by_strategy()) == {"conservative", "aggressive", "smart"}
+
+
+def test_duplicate_deals():
+    """复式模拟：结果与进程数无关，置信区间够窄时提前停止；配对统计可以合并"""
+    serial = duplicate(3, ["conservative", "aggressive", "smart"], 30, seed=2, workers=1, chunk_size=7)
+    parallel = duplicate(3, ["conservative", "aggressive", "smart"], 30, seed=2, workers=2, chunk_size=7)
+    assert serial.to_dict() == parallel.to_dict()
+    assert serial.deals == 30 and serial.games == 90
+    assert all(seat_games == 90 for seat_games in serial.seat_games.values())
+    assert rotations(["a", "b", "c"]) == [["a", "b", "c"], ["b", "c", "a"], ["c", "a", "b"]]
+
+    stopped = duplicate(4, ["smart", "aggressive"], 1000, seed=2, workers=1, chunk_size=10,
+                        target=100.0, min_deals=20)
+    assert stopped.deals == 20
+    assert stopped.max_half_width() <= 100.0
+
+    rng = random.Random(0)
+    values = [rng.gauss(0, 1) for _ in range(101)]
+    whole, left, right = PairedStats(), PairedStats(), PairedStats()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i < 40 else right).add(value)
+    left.merge(right)
+    assert left.n == whole.n
+    assert abs(left.mean - whole.mean) < 1e-12 and abs(left.variance - whole.variance) < 1e-9
+
+
+def test_rejects_unknown_strategy():
+    """未知策略直接报错"""
+    try:
+        lineup(3, ["smart", "random"])
+    except ValueError:
+        return
+    raise AssertionError("应当拒绝未知策略")
+
+
+def test_seed_range():
+    """最大的种子和对局序号也能写进事件日志；超出范围的种子给出明确的错误"""
+    seed = game_seed(MAX_SEED - 1, (1 << 32) - 1)
+    stream = io.BytesIO()
+    play_single_game(3, lineup(3, ["smart"]), seed, sink=BinaryLogSink(stream))
+    stream.seek(0)
+    assert [record.seed for record in read_games(stream)] == [seed]
+    for bad in (MAX_SEED, -1):
+        try:
+            game_seed(bad, 0)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("应当拒绝超出范围的种子")
+        try:
+            with redirect_stderr(io.StringIO()):
+                main(["-n", "1", "--seed", str(bad)])
+        except SystemExit as error:
+            assert error.code == 2
+        else:
+            raise AssertionError("命令行应当拒绝超出范围的种子")
+
+
+if __name__ == "__main__":
+    test_single_game_reproducible()
+    test_summary_independent_of_workers_and_chunks()
+    test_duplicate_deals()
+    test_rejects_unknown_strategy()
+    test_seed_range()
+    print("所有测试完成！")
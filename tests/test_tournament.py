@@ -0,0 +1,83 @@
+"""锦标赛测试"""
+
+import sys
+import os
+import io
+import tempfile
+from contextlib import redirect_stdout
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.player import AIPlayer
+from src.tournament import MAX_SEED, PLAYER_FACTORIES, Tournament, main, register_player, unregister_player
+
+
+def _aggressive2(name, sink, rng):
+    """模块级的工厂，spawn启动的工作进程也能拿到"""
+    return AIPlayer(name, "aggressive", sink=sink, rng=rng)
+
+
+def test_round_robin_schedule():
+    """循环赛打完所有组合，同一副牌轮换所有座位，每人坐庄的次数相同"""
+    tournament = Tournament(["conservative", "aggressive", "smart", "mcts"], seat_counts=(2, 3), deals=1,
+                            workers=1)
+    tournament._schedule_round()
+    assert len(tournament.schedule) == 6 * 2 + 4 * 3
+    dealers = {}
+    for game in tournament.schedule:
+        dealers[game.lineup[0]] = dealers.get(game.lineup[0], 0) + 1
+        rotations = [other.lineup for other in tournament.schedule if other.seed == game.seed]
+        assert len(rotations) == len(game.lineup)
+        assert {rotation[0] for rotation in rotations} == set(game.lineup)
+    assert len(set(dealers.values())) == 1
+    try:
+        Tournament(["smart", "aggressive"], seed=MAX_SEED)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("应当拒绝超出范围的种子")
+
+
+def test_resume_and_workers():
+    """中断后从检查点恢复，只打剩下的对局；结果与进程数无关"""
+    register_player("aggressive2", _aggressive2)
+    try:
+        args = (["smart", "aggressive2", "conservative"], (2, 3), "swiss", 3, 2)
+        full = Tournament(*args, seed=5, workers=2, chunk_size=3).run()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tournament.json")
+            first = Tournament(*args, seed=5, workers=1, checkpoint=path)
+            first.run(max_games=7)
+            assert len(first.results) == 7 and not first.finished
+
+            resumed = Tournament.resume(path, workers=1)
+            assert resumed.applied == 7
+            played = []
+            ratings = resumed.run(on_result=lambda game, result: played.append(game.index))
+            assert resumed.finished
+            assert played == list(range(7, len(resumed.schedule)))
+    finally:
+        unregister_player("aggressive2")
+
+    assert ratings.to_dict() == full.to_dict()
+    assert sum(ratings.games.values()) == sum(len(game.lineup) for game in resumed.schedule)
+    assert abs(sum(ratings.ratings.values()) - 1500 * 3) < 1e-6
+    assert "aggressive2" not in PLAYER_FACTORIES
+
+
+def test_cli_swiss_bye():
+    """瑞士轮有人轮空时命令行正常输出排名"""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        main(["-e", "conservative,aggressive,smart", "-p", "2", "--format", "swiss", "--rounds", "1",
+              "--deals", "1", "-w", "1"])
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 4
+    assert sum("轮空" in line for line in lines) == 1
+
+
+if __name__ == "__main__":
+    test_round_robin_schedule()
+    test_resume_and_workers()
+    test_cli_swiss_bye()
+    print("所有测试完成！")